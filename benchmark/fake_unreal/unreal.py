@@ -0,0 +1,486 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+'''
+In-memory stand-in for the parts of the Unreal Python API used by the
+integration, for running the benchmarks outside of the editor.
+
+Assets live in a dictionary of object path to :class:`Object`, the asset
+registry broadcasts its added, removed, renamed and updated delegates as
+assets change, and imports create assets in memory. Every API call is
+counted, see :data:`CALL_COUNTS`, and can be slowed down to mimic a real
+editor with :func:`set_latency`.
+'''
+
+import os
+import tempfile
+import time
+from functools import wraps
+
+PROJECT_DIR_ENV = 'FTRACK_UNREAL_BENCHMARK_PROJECT'
+'''Environment variable giving the folder of the fake Unreal project'''
+
+CALL_COUNTS = {}
+'''Number of calls of each API function'''
+
+_assets = {}
+_latency = {'call': 0.0, 'per_asset': 0.0}
+_tick_callbacks = {}
+_project_dir = os.environ.get(PROJECT_DIR_ENV) or tempfile.mkdtemp(
+    prefix='fake_unreal_project_'
+)
+
+
+def set_latency(call=0.0, per_asset=0.0):
+    '''
+    Make each API call take *call* seconds, and calls listing or scanning
+    assets take an extra *per_asset* seconds per asset in the project.
+    '''
+    _latency['call'] = call
+    _latency['per_asset'] = per_asset
+
+
+def reset_call_counts():
+    '''Reset :data:`CALL_COUNTS`.'''
+    CALL_COUNTS.clear()
+
+
+def _api(scans=False):
+    '''
+    Decorator counting calls of an API function and applying the latency,
+    scaled by the project size if *scans* is True.
+    '''
+
+    def decorator(function):
+        name = function.__qualname__
+
+        @wraps(function)
+        def decorated(*args, **kwargs):
+            CALL_COUNTS[name] = CALL_COUNTS.get(name, 0) + 1
+            delay = _latency['call']
+            if scans:
+                delay += _latency['per_asset'] * len(_assets)
+            if delay > 0:
+                time.sleep(delay)
+            return function(*args, **kwargs)
+
+        return decorated
+
+    return decorator
+
+
+def _object_path(path):
+    '''Return *path*, a package name or object path, as an object path'''
+    path = str(path)
+    asset_name = path.rsplit('/', 1)[-1]
+    if '.' in asset_name:
+        return path
+    return '{}.{}'.format(path, asset_name)
+
+
+# Objects
+
+
+class Class(object):
+    '''Class of an Unreal object'''
+
+    def __init__(self, name):
+        self._name = name
+
+    def get_name(self):
+        return self._name
+
+
+class Object(object):
+    '''Unreal asset object'''
+
+    def __init__(self, object_path):
+        self._object_path = object_path
+        self.metadata = {}
+        self.dirty = True
+
+    def get_name(self):
+        return self._object_path.rsplit('.', 1)[-1]
+
+    def get_path_name(self):
+        return self._object_path
+
+    def get_class(self):
+        return Class(self.__class__.__name__)
+
+
+class StaticMesh(Object):
+    pass
+
+
+class SkeletalMesh(Object):
+    pass
+
+
+class Skeleton(Object):
+    pass
+
+
+class AnimSequence(Object):
+    pass
+
+
+class GeometryCache(Object):
+    pass
+
+
+class ObjectRedirector(Object):
+    pass
+
+
+ASSET_CLASSES = dict(
+    (asset_class.__name__, asset_class)
+    for asset_class in [
+        StaticMesh,
+        SkeletalMesh,
+        Skeleton,
+        AnimSequence,
+        GeometryCache,
+        ObjectRedirector,
+    ]
+)
+'''Asset classes by name'''
+
+
+class TopLevelAssetPath(object):
+    '''Path of a class, "/Script/Package.Class"'''
+
+    def __init__(self, package_name, asset_name):
+        self.package_name = package_name
+        self.asset_name = asset_name
+
+
+class AssetData(object):
+    '''Asset registry entry of an asset'''
+
+    def __init__(self, asset):
+        object_path = asset.get_path_name()
+        self._asset = asset
+        self.package_name, self.asset_name = object_path.rsplit('.', 1)
+        self.package_path = self.package_name.rsplit('/', 1)[0]
+        self.object_path = object_path
+        self.asset_class = asset.__class__.__name__
+
+    def get_asset(self):
+        return self._asset
+
+    def get_class(self):
+        return self._asset.get_class()
+
+
+def add_asset(object_path, class_name='StaticMesh', metadata=None):
+    '''
+    Create an asset of *class_name* at *object_path* with *metadata* tags,
+    without broadcasting it, to populate the project. Returns the asset.
+    '''
+    asset = ASSET_CLASSES[class_name](_object_path(object_path))
+    asset.metadata.update(metadata or {})
+    asset.dirty = False
+    _assets[asset.get_path_name()] = asset
+    return asset
+
+
+def clear_assets():
+    '''Remove all assets, without broadcasting it.'''
+    _assets.clear()
+
+
+def find_object(outer, name):
+    '''Return the loaded object *name*, or None'''
+    return _assets.get(_object_path(name))
+
+
+# Asset registry
+
+
+class MulticastDelegate(object):
+    '''Delegate calling all bound Python callables on broadcast'''
+
+    def __init__(self):
+        self._callables = []
+
+    def add_callable(self, callable_):
+        self._callables.append(callable_)
+
+    def remove_callable(self, callable_):
+        if callable_ in self._callables:
+            self._callables.remove(callable_)
+
+    def broadcast(self, *args):
+        for callable_ in list(self._callables):
+            callable_(*args)
+
+
+class AssetRegistry(object):
+    '''Asset registry of the project'''
+
+    def __init__(self):
+        self.on_asset_added = MulticastDelegate()
+        self.on_asset_removed = MulticastDelegate()
+        self.on_asset_renamed = MulticastDelegate()
+        self.on_asset_updated = MulticastDelegate()
+
+    @_api()
+    def get_assets_by_package_name(self, package_name, **kwargs):
+        asset = _assets.get(_object_path(package_name))
+        return [AssetData(asset)] if asset is not None else []
+
+    @_api(scans=True)
+    def get_assets_by_class(self, class_name, **kwargs):
+        if isinstance(class_name, TopLevelAssetPath):
+            class_name = class_name.asset_name
+        return [
+            AssetData(asset)
+            for asset in _assets.values()
+            if asset.__class__.__name__ == str(class_name)
+        ]
+
+    @_api(scans=True)
+    def get_all_assets(self, **kwargs):
+        return [AssetData(asset) for asset in _assets.values()]
+
+
+_asset_registry = AssetRegistry()
+
+
+class AssetRegistryHelpers(object):
+    @staticmethod
+    @_api()
+    def get_asset_registry():
+        return _asset_registry
+
+
+# Editor asset library
+
+
+class EditorAssetLibrary(object):
+    @staticmethod
+    @_api(scans=True)
+    def list_assets(directory_path, recursive=True, include_folder=False):
+        prefix = str(directory_path).rstrip('/') + '/'
+        return [
+            object_path
+            for object_path in _assets
+            if object_path.startswith(prefix)
+            and (recursive or '/' not in object_path[len(prefix) :])
+        ]
+
+    @staticmethod
+    @_api()
+    def does_asset_exist(asset_path):
+        return _object_path(asset_path) in _assets
+
+    @staticmethod
+    @_api()
+    def find_asset_data(asset_path):
+        asset = _assets.get(_object_path(asset_path))
+        return AssetData(asset) if asset is not None else None
+
+    @staticmethod
+    @_api()
+    def load_asset(asset_path):
+        return _assets.get(_object_path(asset_path))
+
+    @staticmethod
+    @_api()
+    def rename_asset(source_asset_path, destination_asset_path):
+        source_path = _object_path(source_asset_path)
+        destination_path = _object_path(destination_asset_path)
+        if source_path not in _assets or destination_path in _assets:
+            return False
+        asset = _assets.pop(source_path)
+        asset._object_path = destination_path
+        asset.dirty = True
+        _assets[destination_path] = asset
+        _asset_registry.on_asset_renamed.broadcast(
+            AssetData(asset), source_path
+        )
+        return True
+
+    @staticmethod
+    @_api()
+    def delete_asset(asset_path_to_delete):
+        asset = _assets.pop(_object_path(asset_path_to_delete), None)
+        if asset is None:
+            return False
+        _asset_registry.on_asset_removed.broadcast(AssetData(asset))
+        return True
+
+    @staticmethod
+    @_api()
+    def delete_loaded_assets(assets_to_delete):
+        for asset in assets_to_delete:
+            if _assets.pop(asset.get_path_name(), None) is not None:
+                _asset_registry.on_asset_removed.broadcast(AssetData(asset))
+        return True
+
+    @staticmethod
+    @_api()
+    def save_asset(asset_to_save, only_if_is_dirty=True):
+        asset = _assets.get(_object_path(asset_to_save))
+        if asset is None:
+            return False
+        if asset.dirty or not only_if_is_dirty:
+            asset.dirty = False
+            _asset_registry.on_asset_updated.broadcast(AssetData(asset))
+        return True
+
+    @staticmethod
+    @_api()
+    def save_loaded_assets(assets_to_save, only_if_is_dirty=True):
+        for asset in assets_to_save:
+            if asset.dirty or not only_if_is_dirty:
+                asset.dirty = False
+                _asset_registry.on_asset_updated.broadcast(AssetData(asset))
+        return True
+
+    @staticmethod
+    @_api()
+    def get_metadata_tag(object, tag):
+        return object.metadata.get(str(tag), '')
+
+    @staticmethod
+    @_api()
+    def set_metadata_tag(object, tag, value):
+        object.metadata[str(tag)] = str(value)
+        object.dirty = True
+
+    @staticmethod
+    @_api()
+    def remove_metadata_tag(object, tag):
+        object.metadata.pop(str(tag), None)
+        object.dirty = True
+
+    @staticmethod
+    @_api()
+    def consolidate_assets(asset_to_consolidate_to, assets_to_consolidate):
+        # The consolidated assets are left as redirectors
+        for asset in assets_to_consolidate:
+            object_path = asset.get_path_name()
+            redirector = ObjectRedirector(object_path)
+            _assets[object_path] = redirector
+            _asset_registry.on_asset_updated.broadcast(AssetData(redirector))
+        return True
+
+    @staticmethod
+    @_api()
+    def sync_browser_to_objects(asset_paths):
+        pass
+
+
+# Asset tools
+
+
+class AssetImportTask(object):
+    '''Import of a file, creating a static mesh named after the task'''
+
+    def __init__(self):
+        self.filename = ''
+        self.destination_path = ''
+        self.destination_name = ''
+        self.replace_existing = False
+        self.automated = False
+        self.save = False
+        self.options = None
+        self.imported_object_paths = []
+
+
+class AssetTools(object):
+    @_api()
+    def import_asset_tasks(self, import_tasks):
+        for import_task in import_tasks:
+            asset = StaticMesh(
+                _object_path(
+                    '{}/{}'.format(
+                        import_task.destination_path.rstrip('/'),
+                        import_task.destination_name,
+                    )
+                )
+            )
+            _assets[asset.get_path_name()] = asset
+            _asset_registry.on_asset_added.broadcast(AssetData(asset))
+            if import_task.save:
+                asset.dirty = False
+            import_task.imported_object_paths = [asset.get_path_name()]
+
+    @_api()
+    def fixup_referencers(self, assets_to_fixup, **kwargs):
+        for asset in assets_to_fixup:
+            if _assets.pop(asset.get_path_name(), None) is not None:
+                _asset_registry.on_asset_removed.broadcast(AssetData(asset))
+
+
+_asset_tools = AssetTools()
+
+
+class AssetToolsHelpers(object):
+    @staticmethod
+    @_api()
+    def get_asset_tools():
+        return _asset_tools
+
+
+# Project and editor
+
+
+class Paths(object):
+    @staticmethod
+    def project_dir():
+        return _project_dir + '/'
+
+    @staticmethod
+    def project_content_dir():
+        return os.path.join(_project_dir, 'Content') + '/'
+
+    @staticmethod
+    def project_saved_dir():
+        return os.path.join(_project_dir, 'Saved') + '/'
+
+
+class SystemLibrary(object):
+    @staticmethod
+    def get_project_directory():
+        return Paths.project_dir()
+
+    @staticmethod
+    def get_project_content_directory():
+        return Paths.project_content_dir()
+
+    @staticmethod
+    def get_project_saved_directory():
+        return Paths.project_saved_dir()
+
+    @staticmethod
+    def get_system_path(object):
+        package_name = object.get_path_name().rsplit('.', 1)[0]
+        return os.path.join(
+            Paths.project_content_dir(),
+            package_name[len('/Game/') :] + '.uasset',
+        )
+
+
+class EditorUtilityLibrary(object):
+    @staticmethod
+    def get_current_content_browser_path():
+        return None
+
+
+def register_slate_post_tick_callback(callable_):
+    '''Call *callable_* with the delta time on each :func:`tick`'''
+    handle = object()
+    _tick_callbacks[handle] = callable_
+    return handle
+
+
+def unregister_slate_post_tick_callback(handle):
+    _tick_callbacks.pop(handle, None)
+
+
+def tick(delta_seconds=1.0 / 60):
+    '''Run one editor tick.'''
+    for callable_ in list(_tick_callbacks.values()):
+        callable_(delta_seconds)
@@ -0,0 +1,594 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+'''
+Benchmarks of the asset management hot paths of the Unreal integration, run
+outside of the editor against the in-memory stand-in of the Unreal Python
+API in fake_unreal.
+
+Run all project sizes and store the results::
+
+    python benchmark/run_benchmarks.py --output results.json
+
+Compare with earlier results, exits with status 1 on regressions::
+
+    python benchmark/run_benchmarks.py --sizes 1000 --compare results.json
+
+Each project size runs in a process of its own, importing the integration
+from the source folder. Its runtime dependencies ftrack-connect-pipeline,
+ftrack-connect-pipeline-qt and clique must be installed. Benchmarks which
+cannot run are reported as skipped or failed with the reason, and the run
+exits with status 2. The framework part of change_version, querying ftrack
+and running the loader, is replaced by a plain import of the new version so
+only the Unreal side is measured.
+'''
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from unittest import mock
+
+BENCHMARK_PATH = os.path.dirname(os.path.abspath(__file__))
+SOURCE_PATH = os.path.join(os.path.dirname(BENCHMARK_PATH), 'source')
+FAKE_UNREAL_PATH = os.path.join(BENCHMARK_PATH, 'fake_unreal')
+
+RESULTS_VERSION = 1
+'''Version of the results file format'''
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+'''Number of assets in the benchmarked projects'''
+
+TRACKED_RATIO = 10
+'''One asset in this many is loaded through ftrack'''
+
+ASSETS_PER_FOLDER = 100
+'''Number of assets per content folder'''
+
+LOOKUPS_PER_ROUND = 100
+'''Number of calls per round of the lookup benchmarks'''
+
+REGRESSION_THRESHOLD = 0.1
+'''Slow down of the median time reported as a regression'''
+
+
+class FakeQueryResult(list):
+    '''Result of a :class:`FakeSession` query'''
+
+    def all(self):
+        return list(self)
+
+    def first(self):
+        return self[0] if self else None
+
+
+class FakeSession(object):
+    '''
+    Stand-in of an ftrack session answering AssetVersion queries by id,
+    each query taking *latency* seconds.
+    '''
+
+    server_url = 'https://benchmark.ftrackapp.com'
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.query_count = 0
+
+    def pick_location(self):
+        return {'name': 'benchmark.location'}
+
+    def query(self, expression):
+        self.query_count += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return FakeQueryResult(
+            {'id': entity_id, 'version': 1, 'components': []}
+            for entity_id in re.findall(r'"([^"]+)"', expression)
+        )
+
+
+class FakeEventManager(object):
+    '''Stand-in of the pipeline event manager, dropping all events'''
+
+    def __init__(self, session):
+        self.session = session
+
+    def publish(self, *args, **kwargs):
+        pass
+
+    def subscribe(self, *args, **kwargs):
+        pass
+
+
+def build_project(size):
+    '''
+    Populate the fake project with *size* assets, one in
+    :data:`TRACKED_RATIO` loaded through ftrack. Returns the list of
+    (node name, data) of the ftrack nodes.
+    '''
+    import unreal
+
+    import ftrack_connect_pipeline_unreal.constants as unreal_constants
+    from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+
+    nodes = []
+    for index in range(size):
+        folder = '/Game/Assets/Folder{:04d}'.format(index // ASSETS_PER_FOLDER)
+        asset_name = 'Asset{:06d}'.format(index)
+        metadata = {}
+        if index % TRACKED_RATIO == 0:
+            asset_info_id = 'asset-info-{:06d}'.format(index)
+            metadata[asset_const.NODE_METADATA_TAG] = asset_info_id
+            nodes.append(
+                (
+                    '{}_ftrackdata_{:06d}'.format(asset_name, index),
+                    {
+                        asset_const.ASSET_INFO_ID: asset_info_id,
+                        asset_const.VERSION_ID: 'version-{:06d}'.format(
+                            index // 2
+                        ),
+                        asset_const.COMPONENT_PATH: '/fake/{}.fbx'.format(
+                            asset_name
+                        ),
+                    },
+                )
+            )
+            class_name = 'StaticMesh'
+        elif index % 7 == 0:
+            class_name = 'Skeleton'
+        elif index % 3 == 0:
+            class_name = 'SkeletalMesh'
+        else:
+            class_name = 'StaticMesh'
+        unreal.add_asset(
+            '{}/{}'.format(folder, asset_name), class_name, metadata
+        )
+    # A crowded import destination
+    for index in range(1, 51):
+        unreal.add_asset(
+            '{}/Imported{}'.format(
+                unreal_constants.GAME_ROOT_PATH,
+                '_{}'.format(index) if index > 1 else '',
+            )
+        )
+
+    if not os.path.exists(unreal_constants.FTRACK_ROOT_PATH):
+        os.makedirs(unreal_constants.FTRACK_ROOT_PATH)
+    with open(
+        os.path.join(
+            unreal_constants.FTRACK_ROOT_PATH,
+            unreal_constants.FTRACK_NODE_STORE_FILE_NAME,
+        ),
+        'w',
+    ) as f:
+        for name, data in nodes:
+            f.write('{}\n'.format(json.dumps({'name': name, 'data': data})))
+    return nodes
+
+
+def measure(function, rounds, calls_per_round=1):
+    '''
+    Time *function*, once cold and *rounds* times warm, each run doing
+    *calls_per_round* calls. Returns a dictionary of the times per call in
+    seconds and the Unreal API calls made by the cold run.
+    '''
+    import unreal
+
+    unreal.reset_call_counts()
+    start_time = time.perf_counter()
+    function()
+    cold = (time.perf_counter() - start_time) / calls_per_round
+    api_calls = dict(unreal.CALL_COUNTS)
+    times = []
+    for unused_index in range(rounds):
+        start_time = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start_time) / calls_per_round)
+    return {
+        'status': 'ok',
+        'cold': cold,
+        'median': statistics.median(times) if times else cold,
+        'min': min(times) if times else cold,
+        'rounds': rounds,
+        'calls_per_round': calls_per_round,
+        'api_calls': api_calls,
+    }
+
+
+def create_engine(session):
+    '''Return an asset manager engine bound to *session*.'''
+    from ftrack_connect_pipeline_unreal.host.engine import (
+        UnrealAssetManagerEngine,
+    )
+
+    engine = UnrealAssetManagerEngine(
+        FakeEventManager(session), ['unreal'], 'benchmark'
+    )
+    # Client notifications are not part of the measure
+    engine._notify_client = lambda plugin, result_data: None
+    return engine
+
+
+def bench_discover_assets(context):
+    engine = create_engine(context['session'])
+
+    def discover_assets():
+        status, result = engine.discover_assets()
+        assert len(result) == len(context['nodes'])
+
+    return measure(discover_assets, context['rounds'])
+
+
+def bench_get_connected_nodes_from_dcc_object(context):
+    from ftrack_connect_pipeline_unreal import utils as unreal_utils
+
+    node_names = [
+        name
+        for name, unused_data in context['nodes'][
+            :: max(1, len(context['nodes']) // LOOKUPS_PER_ROUND)
+        ]
+    ][:LOOKUPS_PER_ROUND]
+
+    def get_connected_nodes():
+        for node_name in node_names:
+            assert unreal_utils.get_connected_nodes_from_dcc_object(node_name)
+
+    return measure(get_connected_nodes, context['rounds'], len(node_names))
+
+
+def bench_node_exists(context):
+    from ftrack_connect_pipeline_unreal import utils as unreal_utils
+
+    step = max(1, context['size'] // LOOKUPS_PER_ROUND)
+    asset_paths = []
+    for index in range(0, context['size'], step)[:LOOKUPS_PER_ROUND]:
+        asset_paths.append(
+            '/Game/Assets/Folder{:04d}/Asset{:06d}'.format(
+                index // ASSETS_PER_FOLDER,
+                index if index % 2 == 0 else index + context['size'],
+            )
+        )
+
+    def node_exists():
+        for asset_path in asset_paths:
+            unreal_utils.node_exists(asset_path)
+
+    return measure(node_exists, context['rounds'], len(asset_paths))
+
+
+def bench_change_version(context):
+    from ftrack_connect_pipeline import constants as core_constants
+    from ftrack_connect_pipeline.host.engine import AssetManagerEngine
+
+    from ftrack_connect_pipeline_unreal import utils as unreal_utils
+    from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+
+    def load_version(engine, asset_info, options, plugin=None):
+        '''Import the new version and connect it, like the loader does.'''
+        import unreal
+
+        import_task = unreal.AssetImportTask()
+        import_task.destination_path = '/Game/Imported'
+        import_task.destination_name = unreal_utils.allocate_asset_name(
+            import_task.destination_path, 'Version'
+        )
+        import_task.save = True
+        object_paths = unreal_utils.import_files([import_task])[0]
+        engine.dcc_object.update(
+            {asset_const.VERSION_ID: options['new_version_id']}
+        )
+        engine.dcc_object.connect_objects(object_paths)
+        return core_constants.SUCCESS_STATUS, object_paths
+
+    engine = create_engine(context['session'])
+    changes = iter(list(context['nodes']))
+
+    def change_version():
+        unused_name, data = next(changes)
+        status, unused_result = engine.change_version(
+            data, {'new_version_id': 'new-version'}
+        )
+        assert core_constants.status_bool_mapping[status]
+
+    rounds = min(context['rounds'], len(context['nodes']) - 1)
+    with mock.patch.object(AssetManagerEngine, 'change_version', load_version):
+        return measure(change_version, rounds)
+
+
+def bench_prepare_load_task(context):
+    from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+    from ftrack_connect_pipeline_unreal.plugin.load.importer import (
+        UnrealLoaderImporterPlugin,
+    )
+
+    component_path = os.path.join(context['project_path'], 'component.fbx')
+    with open(component_path, 'w') as f:
+        f.write('fbx')
+    # Only the task preparation is measured, the framework is not needed
+    importer = UnrealLoaderImporterPlugin.__new__(UnrealLoaderImporterPlugin)
+    data = [{'result': {asset_const.COMPONENT_PATH: component_path}}]
+
+    def prepare_load_task():
+        importer.prepare_load_task({'asset_name': 'Imported'}, data, {})
+        assert importer.task.destination_name == 'Imported_51'
+
+    return measure(prepare_load_task, context['rounds'])
+
+
+def bench_publish_finalizer(context):
+    import logging
+
+    from ftrack_connect_pipeline_unreal.plugin.publish.finalizer import (
+        UnrealPublisherFinalizerPlugin,
+    )
+
+    # Only the dependency resolution is measured, the framework is not
+    # needed
+    finalizer = UnrealPublisherFinalizerPlugin.__new__(
+        UnrealPublisherFinalizerPlugin
+    )
+    finalizer.session = context['session']
+    finalizer.logger = logging.getLogger('benchmark.finalizer')
+
+    def collect_version_dependencies():
+        assert finalizer.collect_version_dependencies()
+
+    result = measure(collect_version_dependencies, context['rounds'])
+    result['ftrack_queries'] = context['session'].query_count
+    return result
+
+
+BENCHMARKS = [
+    ('discover_assets', bench_discover_assets),
+    (
+        'get_connected_nodes_from_dcc_object',
+        bench_get_connected_nodes_from_dcc_object,
+    ),
+    ('node_exists', bench_node_exists),
+    ('change_version', bench_change_version),
+    ('prepare_load_task', bench_prepare_load_task),
+    ('publish_finalizer', bench_publish_finalizer),
+]
+'''Benchmarks run on each project size, in order'''
+
+
+def ensure_version_module():
+    '''
+    Provide the version module of the integration when it has not been
+    generated, as in a plain checkout not installed with setuptools_scm.
+    '''
+    if os.path.exists(
+        os.path.join(
+            SOURCE_PATH, 'ftrack_connect_pipeline_unreal', '_version.py'
+        )
+    ):
+        return
+    version_module = types.ModuleType(
+        'ftrack_connect_pipeline_unreal._version'
+    )
+    version_module.__version__ = '0.0.0'
+    sys.modules[version_module.__name__] = version_module
+
+
+def run_size(args):
+    '''Run all benchmarks on a project of *args* size, in this process.'''
+    sys.path.insert(0, SOURCE_PATH)
+    sys.path.insert(0, FAKE_UNREAL_PATH)
+    ensure_version_module()
+    import unreal
+
+    unreal.set_latency(call=args.call_latency, per_asset=args.scan_latency)
+    benchmarks = [
+        (name, benchmark)
+        for name, benchmark in BENCHMARKS
+        if not args.benchmarks or name in args.benchmarks
+    ]
+    start_time = time.perf_counter()
+    try:
+        nodes = build_project(args.size)
+    except ImportError as error:
+        sys.stderr.write('Cannot build project: {}\n'.format(error))
+        return dict(
+            (name, {'status': 'skipped', 'reason': str(error)})
+            for name, unused_benchmark in benchmarks
+        )
+    sys.stderr.write(
+        'Project of {} assets built in {:.1f}s\n'.format(
+            args.size, time.perf_counter() - start_time
+        )
+    )
+
+    results = {}
+    for name, benchmark in benchmarks:
+        context = {
+            'size': args.size,
+            'rounds': args.rounds,
+            'nodes': nodes,
+            'session': FakeSession(args.query_latency),
+            'project_path': os.environ[unreal.PROJECT_DIR_ENV],
+        }
+        try:
+            results[name] = benchmark(context)
+        except ImportError as error:
+            results[name] = {'status': 'skipped', 'reason': str(error)}
+        except Exception as error:
+            results[name] = {
+                'status': 'failed',
+                'reason': '{}: {}'.format(type(error).__name__, error),
+            }
+        sys.stderr.write(
+            '{} {}: {}\n'.format(args.size, name, format_result(results[name]))
+        )
+    return results
+
+
+def format_result(result):
+    '''Return benchmark *result* as text.'''
+    if result['status'] != 'ok':
+        return '{} ({})'.format(result['status'], result['reason'])
+    return 'median {:.3f} ms, cold {:.3f} ms, min {:.3f} ms'.format(
+        result['median'] * 1000, result['cold'] * 1000, result['min'] * 1000
+    )
+
+
+def compare(results, baseline):
+    '''
+    Print the change of median time of *results* relative to *baseline*,
+    return the list of regressions.
+    '''
+    regressions = []
+    for size, size_results in sorted(
+        results['results'].items(), key=lambda item: int(item[0])
+    ):
+        for name, result in size_results.items():
+            baseline_result = baseline['results'].get(size, {}).get(name)
+            if (
+                result['status'] != 'ok'
+                or not baseline_result
+                or baseline_result['status'] != 'ok'
+            ):
+                continue
+            change = result['median'] / baseline_result['median'] - 1
+            flag = ''
+            if change > REGRESSION_THRESHOLD:
+                regressions.append((size, name, change))
+                flag = ' REGRESSION'
+            print(
+                '{:>7} {:<40} {:>10.3f} ms {:>+8.1%}{}'.format(
+                    size, name, result['median'] * 1000, change, flag
+                )
+            )
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=DEFAULT_SIZES,
+        help='Numbers of assets of the benchmarked projects',
+    )
+    parser.add_argument(
+        '--benchmarks',
+        nargs='+',
+        choices=[name for name, _ in BENCHMARKS],
+        help='Benchmarks to run, all by default',
+    )
+    parser.add_argument(
+        '--rounds',
+        type=int,
+        default=5,
+        help='Number of warm runs',
+    )
+    parser.add_argument(
+        '--call-latency',
+        type=float,
+        default=0.0,
+        help='Seconds added to each Unreal API call',
+    )
+    parser.add_argument(
+        '--scan-latency',
+        type=float,
+        default=0.0,
+        help='Seconds added per project asset to Unreal API calls listing '
+        'or scanning assets',
+    )
+    parser.add_argument(
+        '--query-latency',
+        type=float,
+        default=0.0,
+        help='Seconds added to each ftrack query',
+    )
+    parser.add_argument('--output', help='Path to write the results to')
+    parser.add_argument(
+        '--compare', help='Path to earlier results to compare against'
+    )
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(arguments)
+
+    if args.size is not None:
+        # Child process running one project size
+        json.dump(run_size(args), sys.stdout)
+        return 0
+
+    results = {
+        'version': RESULTS_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'rounds': args.rounds,
+            'call_latency': args.call_latency,
+            'scan_latency': args.scan_latency,
+            'query_latency': args.query_latency,
+            'tracked_ratio': TRACKED_RATIO,
+        },
+        'results': {},
+    }
+    for size in args.sizes:
+        project_path = tempfile.mkdtemp(prefix='ftrack_unreal_benchmark_')
+        env = dict(os.environ, FTRACK_UNREAL_BENCHMARK_PROJECT=project_path)
+        command = [
+            sys.executable,
+            os.path.abspath(__file__),
+            '--size',
+            str(size),
+            '--rounds',
+            str(args.rounds),
+            '--call-latency',
+            str(args.call_latency),
+            '--scan-latency',
+            str(args.scan_latency),
+            '--query-latency',
+            str(args.query_latency),
+        ]
+        if args.benchmarks:
+            command += ['--benchmarks'] + args.benchmarks
+        try:
+            output = subprocess.check_output(command, env=env)
+        finally:
+            shutil.rmtree(project_path, ignore_errors=True)
+        results['results'][str(size)] = json.loads(output.decode('utf-8'))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+        print('Results written to {}'.format(args.output))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline):
+            return 1
+
+    not_run = [
+        '{} {}: {}'.format(size, name, format_result(result))
+        for size, size_results in sorted(
+            results['results'].items(), key=lambda item: int(item[0])
+        )
+        for name, result in sorted(size_results.items())
+        if result['status'] != 'ok'
+    ]
+    if not_run:
+        sys.stderr.write(
+            '{} benchmark{} did not run:\n{}\n'.format(
+                len(not_run),
+                's' if len(not_run) > 1 else '',
+                '\n'.join(not_run),
+            )
+        )
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,8 @@ import ftrack_api
 import logging
 import functools
 import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger('ftrack_connect_pipeline_unreal.discover')
 
@@ -16,6 +18,95 @@ plugin_base_dir = os.path.normpath(
 python_dependencies = os.path.join(plugin_base_dir, 'dependencies')
 sys.path.append(python_dependencies)
 
+# The hook runs in Connect before the editor has opened a project, so the
+# project's Saved/ftrack folder used by the integration is not known yet.
+# Context data is cached in the temp folder instead, shared by all projects.
+cache_root_path = os.path.join(
+    tempfile.gettempdir(), 'ftrack_connect_pipeline_unreal', 'cache'
+)
+
+context_query_timeout = 10.0
+'''Seconds to wait for the context query before using cached data'''
+
+
+def query_context_data(session, context_id, schema_cache_path=None):
+    '''
+    Query and return the entity type and frame range of *context_id*, with
+    a session of its own connected as *session*, reading the schemas from
+    *schema_cache_path*.
+    '''
+    # The Connect session is not thread safe, query with a dedicated one
+    query_session = ftrack_api.Session(
+        server_url=session.server_url,
+        api_key=session.api_key,
+        api_user=session.api_user,
+        auto_connect_event_hub=False,
+        plugin_paths=[],
+        schema_cache_path=schema_cache_path,
+    )
+    try:
+        entity = query_session.get('Context', context_id)
+        context_data = {'entity_type': entity.entity_type}
+        if entity.entity_type == 'Task':
+            custom_attributes = entity['parent']['custom_attributes']
+            context_data['fstart'] = str(
+                custom_attributes.get('fstart', '1.0')
+            )
+            context_data['fend'] = str(custom_attributes.get('fend', '100.0'))
+            context_data['fps'] = str(custom_attributes.get('fps', '24'))
+        return context_data
+    finally:
+        query_session.close()
+
+
+def get_context_data(session, context_id):
+    '''
+    Return the entity type and frame range of the context *context_id*,
+    queried from the server and cached across launches. Cached data,
+    expired or not, is used when the query fails or does not finish within
+    :data:`context_query_timeout` seconds. Without cached data the query
+    is waited for.
+    '''
+    from ftrack_connect_pipeline_unreal.cache import (
+        FtrackCache,
+        get_ftrack_cache,
+    )
+
+    ftrack_cache = get_ftrack_cache(cache_root_path, session.server_url)
+
+    def on_queried(future):
+        if future.exception() is None:
+            ftrack_cache.set(FtrackCache.CONTEXT, context_id, future.result())
+
+    # Query in a worker so a slow server does not hold the launch, a late
+    # result still refreshes the cache
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(
+        query_context_data,
+        session,
+        context_id,
+        schema_cache_path=ftrack_cache.schema_cache_path,
+    )
+    future.add_done_callback(on_queried)
+    executor.shutdown(wait=False)
+    try:
+        return future.result(timeout=context_query_timeout)
+    except Exception as error:
+        context_data = ftrack_cache.get(
+            FtrackCache.CONTEXT, context_id, stale=True
+        )
+        if context_data is None:
+            if not future.done():
+                # Nothing cached, wait for the server
+                return future.result()
+            raise
+        logger.warning(
+            'Could not query context {}, using cached data: {}'.format(
+                context_id, str(error) or 'timed out'
+            )
+        )
+        return context_data
+
 
 def on_discover_pipeline_unreal(session, event):
     from ftrack_connect_pipeline_unreal import (
@@ -126,20 +217,14 @@ def on_launch_pipeline_unreal(session, event):
         logger.info('Unreal init script is in sync, no update required.')
     selection = event['data'].get('context', {}).get('selection', [])
     if selection:
-        entity = session.get('Context', selection[0]['entityId'])
-        if entity.entity_type == 'Task':
-            pipeline_unreal_base_data['integration']['env'][
-                'FTRACK_CONTEXTID.set'
-            ] = str(entity['id'])
-            pipeline_unreal_base_data['integration']['env']['FS.set'] = str(
-                entity['parent']['custom_attributes'].get('fstart', '1.0')
-            )
-            pipeline_unreal_base_data['integration']['env']['FE.set'] = str(
-                entity['parent']['custom_attributes'].get('fend', '100.0')
-            )
-            pipeline_unreal_base_data['integration']['env']['FPS.set'] = str(
-                entity['parent']['custom_attributes'].get('fps', '24')
-            )
+        context_id = selection[0]['entityId']
+        context_data = get_context_data(session, context_id)
+        if context_data['entity_type'] == 'Task':
+            env = pipeline_unreal_base_data['integration']['env']
+            env['FTRACK_CONTEXTID.set'] = str(context_id)
+            env['FS.set'] = context_data['fstart']
+            env['FE.set'] = context_data['fend']
+            env['FPS.set'] = context_data['fps']
 
     return pipeline_unreal_base_data
 
@@ -10,6 +10,24 @@ import sys
 import os
 import logging
 import functools
+import time
+
+WARM_UP_ENV = 'FTRACK_UNREAL_WARM_UP'
+'''
+Environment variable enabling warm up, the integration is then loaded on an
+idle editor tick this many seconds after startup, right away on the first
+tick for "true". Otherwise the integration is loaded on first use of the
+ftrack menu.
+'''
+
+MENU_ENTRIES = [
+    ('assembler', 'Assembler', ''),
+    ('publisher', 'Publisher', ''),
+    ('change_context', 'Change context', ''),
+    ('log_viewer', 'Log Viewer', 'zoom'),
+    ('documentation', 'Documentation', ''),
+]
+'''Entries of the ftrack menu, as (name, label, image)'''
 
 do_load_integration = True
 
@@ -40,6 +58,45 @@ if do_load_integration:
         sys.path.append(p)
 
 
+def get_ftrack_menu(menu_name='ftrack', submenu_name=None):
+    '''Get the current ftrack menu, create it if does not exists.'''
+    import unreal
+
+    menus = unreal.ToolMenus.get()
+
+    main_menu = menus.find_menu('LevelEditor.MainMenu')
+
+    return main_menu.add_sub_menu(
+        'Ftrack.Menu', 'Python', 'ftrack Menu', 'ftrack'
+    )
+
+
+def register_menu():
+    '''
+    Add the ftrack menu entries, opening their client through
+    :func:`ftrack_connect_pipeline_unreal.menu.launch_dialog` which loads the
+    integration on first use.
+    '''
+    import unreal
+
+    ftrack_menu = get_ftrack_menu()
+    for name, label, unused_image in MENU_ENTRIES:
+        menu_entry = unreal.ToolMenuEntry(
+            name, type=unreal.MultiBlockType.MENU_ENTRY
+        )
+        menu_entry.set_label(label)
+        menu_entry.set_string_command(
+            unreal.ToolMenuStringCommandType.PYTHON,
+            name,
+            string=(
+                "from ftrack_connect_pipeline_unreal.menu import launch_dialog;launch_dialog('{}')".format(
+                    name
+                )
+            ),
+        )
+        ftrack_menu.add_menu_entry(label, menu_entry)
+
+
 def load_integration():
     from Qt import QtCore, QtWidgets, QtGui
 
@@ -48,7 +105,6 @@ def load_integration():
     import ftrack_api
 
     from ftrack_connect_pipeline import constants as core_constants
-    from ftrack_connect_pipeline.configure_logging import configure_logging
 
     # Create a qapplication, needs to be done before using ftrack_connect_pipeline_qt
     qapp = QtWidgets.QApplication.instance()
@@ -79,29 +135,10 @@ def load_integration():
     from ftrack_connect_pipeline_unreal import utils as unreal_utils
     from ftrack_connect_pipeline_unreal import menu as unreal_menu
 
-    configure_logging(
-        'ftrack_connect_pipeline_unreal',
-        extra_modules=[
-            'ftrack_connect_pipeline',
-            'ftrack_connect_pipeline_qt',
-        ],
-        propagate=False,
-    )
-
     logger = logging.getLogger('ftrack_connect_pipeline_unreal')
 
     created_widgets = dict()
 
-    def get_ftrack_menu(menu_name='ftrack', submenu_name=None):
-        '''Get the current ftrack menu, create it if does not exists.'''
-        menus = unreal.ToolMenus.get()
-
-        main_menu = menus.find_menu('LevelEditor.MainMenu')
-
-        return main_menu.add_sub_menu(
-            'Ftrack.Menu', 'Python', 'ftrack Menu', 'ftrack'
-        )
-
     def _open_widget(
         event_manager,
         # asset_list_model,
@@ -113,11 +150,9 @@ def load_integration():
         widget_name = None
         widget_class = None
         for (
+            unused_menu_entry,
             _widget_name,
             _widget_class,
-            unused_label,
-            unused_image,
-            unused_add_to_menu,
         ) in widgets:
             if _widget_name == event['data']['pipeline']['name']:
                 widget_name = _widget_name
@@ -172,8 +207,19 @@ def load_integration():
         #  from ftrack-connect-unreal
         # such as frame start / end etc....
 
+        # Run calls to Unreal from worker threads on the main thread
+        unreal_utils.get_main_thread_dispatcher().start()
+
         logger.debug('Setting up the host')
-        session = ftrack_api.Session(auto_connect_event_hub=False)
+        # Schemas are cached within the project, by server, so warm starts
+        # do not fetch them again
+        ftrack_cache = unreal_utils.get_project_ftrack_cache(
+            os.environ.get('FTRACK_SERVER')
+        )
+        session = ftrack_api.Session(
+            auto_connect_event_hub=False,
+            schema_cache_path=ftrack_cache.schema_cache_path,
+        )
 
         event_manager = event.QEventManager(
             session=session, mode=core_constants.LOCAL_EVENT_MODE
@@ -181,95 +227,57 @@ def load_integration():
 
         host = unreal_host.UnrealHost(event_manager)
 
-        unreal_menu.host = host
-
-        logger.debug('Setting up the menu')
+        logger.debug('Setting up the clients')
 
         # Shared asset manager models
         # asset_list_model = AssetListModel(event_manager)
 
+        # Clients opened by the menu entries, as (menu entry, widget name,
+        # widget class)
         widgets = list()
         widgets.append(
             (
+                'assembler',
                 qt_constants.ASSEMBLER_WIDGET,
                 load.UnrealQtAssemblerClientWidget,
-                'Assembler',
-                '',
-                True,
             )
         )
         # widgets.append(
         #     (
+        #         'asset_manager',
         #         core_constants.ASSET_MANAGER,
         #         asset_manager.UnrealQtAssetManagerClientWidget,
-        #         'Asset Manager',
-        #         '',
-        #         True,
         #     )
         # )
         widgets.append(
             (
+                'publisher',
                 core_constants.PUBLISHER,
                 publish.UnrealQtPublisherClientWidget,
-                'Publisher',
-                '',
-                True,
             )
         )
         widgets.append(
             (
+                'change_context',
                 qt_constants.CHANGE_CONTEXT_WIDGET,
                 change_context.UnrealQtChangeContextClientWidget,
-                'Change context',
-                '',
-                True,
             )
         )
         widgets.append(
             (
+                'log_viewer',
                 core_constants.LOG_VIEWER,
                 log_viewer.UnrealQtLogViewerClientWidget,
-                'Log Viewer',
-                'zoom',
-                True,
             )
         )
         widgets.append(
             (
+                'documentation',
                 qt_constants.DOCUMENTATION_WIDGET,
                 documentation.UnrealQtDocumentationClientWidget,
-                'Documentation',
-                '',
-                True,
             )
         )
 
-        ftrack_menu = get_ftrack_menu()
-        # Register and hook the dialog in ftrack menu
-        for item in widgets:
-            if item == 'divider':
-                continue
-
-            widget_name, unused_widget_class, label, image, add_to_menu = item
-
-            if not add_to_menu:
-                continue
-
-            menu_entry = unreal.ToolMenuEntry(
-                widget_name, type=unreal.MultiBlockType.MENU_ENTRY
-            )
-            menu_entry.set_label(label)
-            menu_entry.set_string_command(
-                unreal.ToolMenuStringCommandType.PYTHON,
-                widget_name,
-                string=(
-                    "from ftrack_connect_pipeline_unreal.menu import launch_dialog;launch_dialog('{}')".format(
-                        widget_name
-                    )
-                ),
-            )
-            ftrack_menu.add_menu_entry(label, menu_entry)
-
         # Listen to widget launch events
         session.event_hub.subscribe(
             'topic={} and data.pipeline.host_id={}'.format(
@@ -285,13 +293,117 @@ def load_integration():
 
         unreal_utils.init_unreal()
 
+        unreal_menu.widget_names = dict(
+            (menu_entry, widget_name)
+            for menu_entry, widget_name, unused_widget_class in widgets
+        )
+        unreal_menu.host = host
+
     initialise()
 
 
-if do_load_integration:
+_loading = False
+
+
+def configure_integration_logging():
+    '''Configure logging of the integration and the framework.'''
+    from ftrack_connect_pipeline.configure_logging import configure_logging
+
+    configure_logging(
+        'ftrack_connect_pipeline_unreal',
+        extra_modules=[
+            'ftrack_connect_pipeline',
+            'ftrack_connect_pipeline_qt',
+        ],
+        propagate=False,
+    )
+
+
+def load_integration_once():
+    '''
+    Load the integration unless already loaded or loading, called on first
+    use of the ftrack menu or on warm up. Errors are logged and kept in
+    :data:`ftrack_connect_pipeline_unreal.menu.integration_error` for the
+    menu to show, leaving the integration unloaded.
+    '''
+    global _loading
+    from ftrack_connect_pipeline_unreal import menu as unreal_menu
+
+    if unreal_menu.is_integration_loaded() or _loading:
+        return
+    logger = logging.getLogger('ftrack_connect_pipeline_unreal')
+    _loading = True
+    start_time = time.time()
     try:
         load_integration()
-        print('[ftrack] integration loaded')
+        unreal_menu.integration_error = None
+        logger.info(
+            'ftrack integration loaded in {:.2f}s'.format(
+                time.time() - start_time
+            )
+        )
+    except ImportError as error:
+        unreal_menu.integration_error = (
+            'ftrack connect Unreal plugin is not well initialized '
+            'or you did not start Unreal from ftrack connect? '
+            'Error: {}'.format(error)
+        )
+        logger.exception(unreal_menu.integration_error)
+    except Exception as error:
+        unreal_menu.integration_error = (
+            'Could not load ftrack integration: {}'.format(error)
+        )
+        logger.exception(unreal_menu.integration_error)
+    finally:
+        _loading = False
+
+
+def schedule_warm_up(delay):
+    '''
+    Load the integration on the first idle editor tick *delay* seconds from
+    now, so it is ready when the ftrack menu is first used.
+    '''
+    import unreal
+
+    warm_up_time = time.time() + delay
+    tick_handle = []
+
+    def on_tick(unused_delta_seconds):
+        if time.time() < warm_up_time:
+            return
+        unreal.unregister_slate_post_tick_callback(tick_handle[0])
+        load_integration_once()
+
+    tick_handle.append(unreal.register_slate_post_tick_callback(on_tick))
+
+
+def get_warm_up_delay():
+    '''
+    Return the warm up delay in seconds set by :data:`WARM_UP_ENV`, None if
+    warm up is disabled.
+    '''
+    value = os.environ.get(WARM_UP_ENV, '').strip().lower()
+    if not value or value in ('false', 'no', 'off'):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return 0.0
+
+
+if do_load_integration:
+    try:
+        # Only the menu is set up at startup, the integration is loaded on
+        # first use so editor startup is not slowed down
+        from ftrack_connect_pipeline_unreal import menu as unreal_menu
+
+        configure_integration_logging()
+        unreal_menu.integration_loader = load_integration_once
+        register_menu()
+        warm_up_delay = get_warm_up_delay()
+        if warm_up_delay is not None:
+            schedule_warm_up(warm_up_delay)
+        print('[ftrack] menu registered')
     except ImportError as error:
         print(
             'ftrack connect Unreal plugin is not well initialized '
@@ -54,10 +54,9 @@ class UnrealFbxAnimationLoaderImporterOptionsWidget(DynamicWidget):
             'Save': True,
         }
         # Load existing skeletons
-        skeletons = unreal_utils.get_assets_by_class('Skeleton')
         result['Skeleton'].append({'value': None})
-        for skeleton in skeletons:
-            result['Skeleton'].append({'value': str(skeleton.asset_name)})
+        for skeleton_name in unreal_utils.get_skeletons():
+            result['Skeleton'].append({'value': skeleton_name})
         return result
 
     def get_options_group_name(self):
@@ -1,11 +1,5 @@
 # :coding: utf-8
 # :copyright: Copyright (c) 2014-2023 ftrack
-import os
-import tempfile
-import shutil
-
-import unreal
-
 import ftrack_api
 
 from ftrack_connect_pipeline_unreal import plugin
@@ -49,20 +43,42 @@ class UnrealReviewablePublisherExporterPlugin(
                 return False
 
         if render_path:
-            # TODO: convert image sequence to movie file.
-            pass
+            temp_movie_path = unreal_utils.new_staged_path('.mp4')
+            self.logger.debug(
+                'Encoding rendered image sequence "{}" to: {}'.format(
+                    render_path, temp_movie_path
+                )
+            )
+            unreal_utils.encode_image_sequence(
+                render_path,
+                temp_movie_path,
+                frame_rate=options.get('frame_rate'),
+                max_workers=options.get('max_encoders'),
+            )
+            return [temp_movie_path]
 
         self.logger.debug(
-            'Using pre-rendered movie path: "{}", copying to temp.'.format(
+            'Using pre-rendered movie path: "{}", staging it.'.format(
                 movie_path
             )
         )
 
-        temp_movie_path = tempfile.NamedTemporaryFile(
-            delete=False, suffix='.mov'
-        ).name
+        reported_progress = [0]
+
+        def report_progress(copied_bytes, total_bytes):
+            progress = int(100 * copied_bytes / max(1, total_bytes))
+            if progress >= reported_progress[0] + 10:
+                reported_progress[0] = progress
+                self.logger.debug('Copied {}% of movie'.format(progress))
 
-        shutil.copy(movie_path, temp_movie_path)
+        temp_movie_path, checksum = unreal_utils.stage_file(
+            movie_path, progress_callback=report_progress
+        )
+        self.logger.debug(
+            'Staged movie to: {} ({}: {})'.format(
+                temp_movie_path, unreal_utils.CHECKSUM_ALGORITHM, checksum
+            )
+        )
 
         return [temp_movie_path]
 
@@ -21,7 +21,8 @@ class UnrealSequencePublisherExporterPlugin(
 
     def run(self, context_data=None, data=None, options=None):
         '''Pick up an existing file image sequence, or render images from level sequence, given
-        in *data* with the given *options*.'''
+        in *data* with the given *options*. If the manifest option is set,
+        export the manifest of the image sequence instead.'''
 
         image_sequence_path = None
         for collector in data:
@@ -30,6 +31,21 @@ class UnrealSequencePublisherExporterPlugin(
                     if key == 'image_sequence_path':
                         image_sequence_path = value
 
+        if options.get('manifest'):
+            # Publish the manifest of the sequence instead of the sequence
+            manifest_path = unreal_utils.new_staged_path('.json')
+            self.logger.debug(
+                'Writing manifest of "{}" to: {}'.format(
+                    image_sequence_path, manifest_path
+                )
+            )
+            unreal_utils.write_image_sequence_manifest(
+                image_sequence_path,
+                manifest_path,
+                max_workers=options.get('max_workers'),
+            )
+            return [manifest_path]
+
         return [image_sequence_path]
 
 
@@ -2,6 +2,7 @@
 # :copyright: Copyright (c) 2014-2023 ftrack
 
 from ftrack_connect_pipeline_unreal import plugin
+from ftrack_connect_pipeline_unreal import utils as unreal_utils
 import clique
 
 import ftrack_api
@@ -14,9 +15,14 @@ class UnrealImageSequencePublisherValidatorPlugin(
 
     plugin_name = 'unreal_image_sequence_publisher_validator'
 
+    MAX_REPORTED_ERRORS = 20
+    '''Maximum number of frame errors logged individually'''
+
     def run(self, context_data=None, data=None, options=None):
         '''Return True if all collected objects supplied in *data* is an image
-        sequence and has a supported file format'''
+        sequence and has a supported file format. If the option check_frames
+        is set, also check that no frame is missing, empty or truncated and
+        that all frames have the same resolution and channel layout.'''
 
         supported_file_formats = ["exr", "jpg", "bmp", "png"]
 
@@ -24,23 +30,58 @@ class UnrealImageSequencePublisherValidatorPlugin(
         for collector in data:
             for result in collector['result']:
                 # We are only interested on the media_path
-                media_path = result.get('media_path')
+                media_path = result.get('media_path') or result.get(
+                    'image_sequence_path'
+                )
 
         if media_path:
             try:
                 collection = clique.parse(media_path)
                 if (
                     str(collection.tail).lower().split(".")[-1]
-                    in supported_file_formats
+                    not in supported_file_formats
                 ):
-                    return True
-                return False
+                    return False
             except Exception as e:
                 self.logger.error(
                     "Unsupported media path: {} \n "
                     "With error message: {}".format(media_path, e)
                 )
                 return False
+            if (options or {}).get('check_frames'):
+                return self.check_frames(media_path, options)
+        return True
+
+    def check_frames(self, media_path, options):
+        '''Check the frames of image sequence *media_path*, return True if
+        they are all valid.'''
+        failed = 0
+        reference = None
+        for frame, path, header, error in unreal_utils.check_image_sequence(
+            media_path, max_workers=options.get('max_workers')
+        ):
+            if error is None and header is not None:
+                if reference is None:
+                    reference = (frame, header)
+                elif header != reference[1]:
+                    error = (
+                        'Resolution/channels {} differ from frame {}: '
+                        '{}'.format(header, reference[0], reference[1])
+                    )
+            if error is None:
+                continue
+            failed += 1
+            if failed <= self.MAX_REPORTED_ERRORS:
+                self.logger.error(
+                    'Frame {} ({}): {}'.format(frame, path, error)
+                )
+        if failed > 0:
+            self.logger.error(
+                '{} invalid frame(s) in image sequence: {}'.format(
+                    failed, media_path
+                )
+            )
+            return False
         return True
 
 
@@ -2,14 +2,10 @@
 # :copyright: Copyright (c) 2014-2023 ftrack
 
 import logging
-import os
-import json
-
-import unreal
+import contextlib
 
 from ftrack_connect_pipeline.asset.dcc_object import DccObject
 
-import ftrack_connect_pipeline_unreal.constants as unreal_constants
 from ftrack_connect_pipeline_unreal.constants import asset as asset_const
 from ftrack_connect_pipeline_unreal import utils as unreal_utils
 
@@ -21,14 +17,13 @@ class UnrealDccObject(DccObject):
     '''Plugin id used on some DCC applications '''
 
     @property
-    def ftrack_file_path(self):
+    def ftrack_node_store(self):
         '''
-        Return the json file path of the current dcc object.
+        Return the :class:`~ftrack_connect_pipeline_unreal.utils.FtrackNodeStore`
+        holding the current dcc object.
         '''
         # This property is added for convenience in this DCC only.
-        return os.path.join(
-            unreal_constants.FTRACK_ROOT_PATH, "{}.json".format(self.name)
-        )
+        return unreal_utils.get_ftrack_node_store()
 
     def __init__(self, name=None, from_id=None, **kwargs):
         '''
@@ -39,18 +34,46 @@ class UnrealDccObject(DccObject):
         self.logger = logging.getLogger(
             '{0}.{1}'.format(__name__, self.__class__.__name__)
         )
+        self._batch_depth = 0
         super(UnrealDccObject, self).__init__(name, from_id, **kwargs)
 
     def __setitem__(self, k, v):
         '''
         Sets the given *v* into the given *k* and automatically set the
-        attributes of the current self :obj:`name` on the DCC
+        attributes of the current self :obj:`name` on the DCC, deferred
+        within a :meth:`batch_update` block.
         '''
         super(UnrealDccObject, self).__setitem__(k, v)
-        # As we are using a json file to handle the asset info, just dump the
-        # self dictionary to the json file
-        with open(self.ftrack_file_path, "w") as outfile:
-            json.dump(self, outfile)
+        if self._batch_depth == 0:
+            self._write()
+
+    def update(self, *args, **kwargs):
+        '''
+        Update the dcc object with the given *args* and *kwargs*, writing it
+        to the DCC once.
+        '''
+        with self.batch_update():
+            super(UnrealDccObject, self).update(*args, **kwargs)
+
+    @contextlib.contextmanager
+    def batch_update(self):
+        '''
+        Defer writing the dcc object to the ftrack node store until the end of
+        the block, nested blocks are written when the outermost block exits.
+        '''
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._write()
+
+    def _write(self):
+        '''Write the dcc object to the ftrack node store if changed.'''
+        # As we are using a json store to handle the asset info, just dump
+        # the self dictionary to it
+        self.ftrack_node_store.put(self.name, self)
 
     def create(self, name):
         '''
@@ -61,21 +84,10 @@ class UnrealDccObject(DccObject):
             self.logger.error(error_message)
             raise RuntimeError(error_message)
 
-        # Set the name before creating the object because the ftrack_file_path
-        # property needs the name
         self.name = name
 
-        if not os.path.exists(unreal_constants.FTRACK_ROOT_PATH):
-            self.logger.warning(
-                'Creating project ftrack folder: {}'.format(
-                    unreal_constants.FTRACK_ROOT_PATH
-                )
-            )
-            os.makedirs(unreal_constants.FTRACK_ROOT_PATH)
-
-        # Create an empty json file in the unreal project ftrack root folder
-        with open(self.ftrack_file_path, "w") as outfile:
-            json.dump({}, outfile)
+        # Create an empty entry in the unreal project ftrack node store
+        self.ftrack_node_store.put(self.name, {})
 
         self.logger.debug('Creating new dcc object {}'.format(name))
 
@@ -86,34 +98,22 @@ class UnrealDccObject(DccObject):
 
     def _name_exists(self, name):
         '''
-        Return true if the given *name* as ftrack file exists in the project.
+        Return true if the given *name* as ftrack node exists in the project.
         '''
-        ftrack_file_path = os.path.join(
-            unreal_constants.FTRACK_ROOT_PATH, "{}.json".format(name)
-        )
-        return unreal.Paths.file_exists(ftrack_file_path)
+        return self.ftrack_node_store.exists(name)
 
     def from_asset_info_id(self, asset_info_id):
         '''
-        Checks unreal project to get all the ftrackAssetNode objects. Compares them
-        with the given *asset_info_id* and returns them if matches.
+        Looks up the ftrackAssetNode object holding the given *asset_info_id*
+        in the unreal project ftrack node store and returns it if found.
         '''
-        ftrack_asset_nodes = unreal_utils.get_ftrack_nodes()
-        for dcc_object_name in ftrack_asset_nodes:
-            ftrack_file_path = os.path.join(
-                unreal_constants.FTRACK_ROOT_PATH,
-                "{}.json".format(dcc_object_name),
+        dcc_object_name = self.ftrack_node_store.find(asset_info_id)
+        if dcc_object_name is not None:
+            self.logger.debug(
+                'Found existing object: {}'.format(dcc_object_name)
             )
-            param_dict = {}
-            with open(ftrack_file_path, 'r') as openfile:
-                param_dict = json.load(openfile)
-
-            if param_dict.get(asset_const.ASSET_INFO_ID) == asset_info_id:
-                self.logger.debug(
-                    'Found existing object: {}'.format(dcc_object_name)
-                )
-                self.name = dcc_object_name
-                return self.name
+            self.name = dcc_object_name
+            return self.name
 
         self.logger.debug(
             "Couldn't found an existing object for the asset info id: {}".format(
@@ -134,17 +134,11 @@ class UnrealDccObject(DccObject):
         logger = logging.getLogger(
             '{0}.{1}'.format(__name__, __class__.__name__)
         )
-        param_dict = {}
-        ftrack_file_path = os.path.join(
-            unreal_constants.FTRACK_ROOT_PATH, "{}.json".format(object_name)
-        )
-        if not unreal.Paths.file_exists(ftrack_file_path):
+        param_dict = unreal_utils.get_ftrack_node_store().get(object_name)
+        if param_dict is None:
             error_message = "{} Object doesn't exists".format(object_name)
             logger.error(error_message)
-            return param_dict
-
-        with open(ftrack_file_path, 'r') as openfile:
-            param_dict = json.load(openfile)
+            return {}
 
         return param_dict
 
@@ -0,0 +1,201 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+from ftrack_connect_pipeline_unreal.lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+# Cache of ftrack data kept on disk across editor sessions. Does not depend
+# on Unreal so it can be used by the launch hook as well.
+
+SCHEMA_CACHE_FILE_NAME = 'ftrack_api_schema_cache.json'
+'''Name of the schema cache file written by ftrack_api'''
+
+
+class FtrackCache(object):
+    '''
+    Cache of data queried from the ftrack server *server_url*, stored as
+    JSON files within a folder of *root_path* of its own, one file per kind
+    of data. Entries older than the time to live of their kind, see
+    :attr:`TTLS`, are not returned unless stale entries are asked for.
+
+    The ftrack_api schema cache is kept in the same folder, see
+    :attr:`schema_cache_path`, and is invalidated along.
+    '''
+
+    SCHEMA = 'schema'
+    CONTEXT = 'context'
+    ASSET_VERSION = 'asset_version'
+
+    TTLS = {
+        CONTEXT: 60 * 60,
+        ASSET_VERSION: 24 * 60 * 60,
+    }
+    '''Seconds entries are kept by kind'''
+
+    DEFAULT_TTL = 60 * 60
+    '''Seconds entries of kinds not in :attr:`TTLS` are kept'''
+
+    LOCK_TIMEOUT = 10.0
+    '''Seconds to wait for the lock of a cache file'''
+
+    @property
+    def server_url(self):
+        '''Return the url of the ftrack server cached'''
+        return self._server_url
+
+    @property
+    def path(self):
+        '''Return the folder holding the cache files'''
+        return self._path
+
+    @property
+    def schema_cache_path(self):
+        '''Return the folder to pass as schema_cache_path to a session'''
+        self._ensure_path()
+        return self._path
+
+    def __init__(self, root_path, server_url):
+        self._server_url = (server_url or '').rstrip('/')
+        self._path = os.path.join(
+            root_path,
+            hashlib.sha1(self._server_url.encode('utf-8')).hexdigest()[:16],
+        )
+        self._entries = {}
+        self._lock = threading.RLock()
+
+    def _ensure_path(self):
+        if not os.path.exists(self._path):
+            os.makedirs(self._path)
+            with open(os.path.join(self._path, 'server.txt'), 'w') as f:
+                f.write(self._server_url)
+
+    def _get_file_path(self, kind):
+        return os.path.join(self._path, '{}.json'.format(kind))
+
+    def _read(self, kind):
+        '''Return the entries of *kind* stored on disk.'''
+        try:
+            with open(self._get_file_path(kind), 'r') as f:
+                return json.load(f)
+        except (IOError, OSError):
+            return {}
+        except ValueError as error:
+            logger.warning(
+                'Discarding unreadable ftrack cache {}: {}'.format(
+                    self._get_file_path(kind), error
+                )
+            )
+            return {}
+
+    def _file_lock(self, kind):
+        '''Hold the lock of the file of *kind*, shared between processes.'''
+        self._ensure_path()
+        return file_lock(self._get_file_path(kind), timeout=self.LOCK_TIMEOUT)
+
+    def _write(self, kind, entries):
+        '''Write the *entries* of *kind* atomically, must hold the file lock.'''
+        file_path = self._get_file_path(kind)
+        temp_path = '{}.{}.tmp'.format(file_path, os.getpid())
+        with open(temp_path, 'w') as f:
+            json.dump(entries, f)
+        os.replace(temp_path, file_path)
+
+    def _get_entries(self, kind):
+        if kind not in self._entries:
+            self._entries[kind] = self._read(kind)
+        return self._entries[kind]
+
+    def get(self, kind, key, stale=False):
+        '''
+        Return the value cached for *key* of *kind*, None if there is none
+        or it has expired. Expired values are returned if *stale* is True,
+        to be used when the server cannot be reached.
+        '''
+        with self._lock:
+            entry = self._get_entries(kind).get(key)
+        if entry is None:
+            return None
+        if not stale and time.time() - entry['time'] > self.TTLS.get(
+            kind, self.DEFAULT_TTL
+        ):
+            return None
+        return entry['value']
+
+    def set(self, kind, key, value):
+        '''Cache the JSON serialisable *value* for *key* of *kind*.'''
+        self.update(kind, {key: value})
+
+    def update(self, kind, values):
+        '''
+        Cache the JSON serialisable *values* by key of *kind*, merged with
+        the entries written meanwhile by other editor sessions under the
+        file lock. The values are only kept in memory if the file cannot be
+        written.
+        '''
+        now = time.time()
+        with self._lock:
+            try:
+                with self._file_lock(kind):
+                    entries = self._read(kind)
+                    for key, value in values.items():
+                        entries[key] = {'time': now, 'value': value}
+                    self._write(kind, entries)
+            except Exception as error:
+                logger.warning(
+                    'Could not write ftrack cache {}: {}'.format(
+                        self._get_file_path(kind), error
+                    )
+                )
+                entries = self._get_entries(kind)
+                for key, value in values.items():
+                    entries[key] = {'time': now, 'value': value}
+            self._entries[kind] = entries
+
+    def invalidate(self, kind=None, key=None):
+        '''
+        Remove the entry of *key* of *kind*, all entries of *kind* if *key*
+        is not given, or the whole cache including the schemas if *kind* is
+        not given.
+        '''
+        with self._lock:
+            if kind is None:
+                self._entries = {}
+                if os.path.exists(self._path):
+                    shutil.rmtree(self._path, ignore_errors=True)
+                return
+            if kind == self.SCHEMA:
+                file_path = os.path.join(self._path, SCHEMA_CACHE_FILE_NAME)
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                return
+            with self._file_lock(kind):
+                if key is None:
+                    self._entries.pop(kind, None)
+                    if os.path.exists(self._get_file_path(kind)):
+                        os.remove(self._get_file_path(kind))
+                    return
+                entries = self._read(kind)
+                if entries.pop(key, None) is not None:
+                    self._write(kind, entries)
+            self._entries[kind] = entries
+
+
+_ftrack_caches = {}
+_ftrack_caches_lock = threading.Lock()
+
+
+def get_ftrack_cache(root_path, server_url):
+    '''Return the :class:`FtrackCache` of *server_url* in *root_path*.'''
+    with _ftrack_caches_lock:
+        cache_key = (root_path, (server_url or '').rstrip('/'))
+        if cache_key not in _ftrack_caches:
+            _ftrack_caches[cache_key] = FtrackCache(root_path, server_url)
+        return _ftrack_caches[cache_key]
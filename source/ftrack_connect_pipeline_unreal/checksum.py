@@ -0,0 +1,41 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import hashlib
+import mmap
+import os
+
+# File checksums. Does not depend on Unreal so the functions can run in
+# worker processes started from the editor.
+
+HASH_CHUNK_SIZE = 16 * 1024 * 1024
+'''Number of bytes hashed at a time'''
+
+
+def checksum_file(path, algorithm='blake2b'):
+    '''
+    Return the hex checksum of the file *path* using the hashlib
+    *algorithm*, reading it memory mapped.
+    '''
+    checksum = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                with memoryview(data) as view:
+                    for offset in range(0, len(data), HASH_CHUNK_SIZE):
+                        with view[offset : offset + HASH_CHUNK_SIZE] as chunk:
+                            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def checksum_frame(frame_path_algorithm):
+    '''
+    Return the manifest entry of a (frame, path, algorithm) tuple, with the
+    file name, size and checksum of the frame.
+    '''
+    frame, path, algorithm = frame_path_algorithm
+    return {
+        'frame': frame,
+        'name': os.path.basename(path),
+        'size': os.path.getsize(path),
+        'checksum': checksum_file(path, algorithm=algorithm),
+    }
@@ -21,6 +21,26 @@ class UnrealQtAssetManagerClientWidget(QtAssetManagerClientWidget):
 
     snapshot_assets = True
 
+    @property
+    def asset_jobs(self):
+        '''
+        Return the last known state of the jobs submitted, as dictionaries
+        by job id, see :meth:`submit_jobs`.
+        '''
+        return dict(self._asset_jobs)
+
+    @property
+    def asset_job_progress(self):
+        '''Return the fraction of the jobs submitted that have finished'''
+        if not self._asset_jobs:
+            return 1.0
+        finished_jobs = [
+            job
+            for job in self._asset_jobs.values()
+            if job['state'] in ('done', 'failed', 'cancelled')
+        ]
+        return float(len(finished_jobs)) / len(self._asset_jobs)
+
     def __init__(
         self,
         event_manager,
@@ -38,9 +58,58 @@ class UnrealQtAssetManagerClientWidget(QtAssetManagerClientWidget):
         )
         self.setWindowTitle('Unreal Pipeline Asset Manager')
         self.resize(600, 800)
+        self._asset_jobs = {}
 
     def get_theme_background_style(self):
         return 'ftrack' if not self.is_assembler else 'transparent'
 
     def is_docked(self):
         return False
+
+    def submit_jobs(
+        self, asset_info_list, method, options=None, new_version_ids=None
+    ):
+        '''
+        Run *method* with *options* on each asset of *asset_info_list* as a
+        separate job in the background. For change_version, the new version
+        ids are given by asset info id in *new_version_ids*.
+        '''
+        data = {
+            'method': 'submit_jobs',
+            'plugin': None,
+            'assets': asset_info_list,
+            'options': {
+                'method': method,
+                'options': options or {},
+                'new_version_ids': new_version_ids or {},
+            },
+        }
+        self.host_connection.run(data, self.engine_type, self._jobs_callback)
+
+    def cancel_jobs(self, asset_info_list=None, job_ids=None):
+        '''
+        Cancel the queued jobs of the assets in *asset_info_list*, or of
+        *job_ids*, all queued jobs if none are given.
+        '''
+        data = {
+            'method': 'cancel_jobs',
+            'plugin': None,
+            'assets': asset_info_list or [],
+            'options': {'job_ids': job_ids},
+        }
+        self.host_connection.run(data, self.engine_type, self._jobs_callback)
+
+    def refresh_jobs(self):
+        '''Fetch the state and progress of the jobs submitted.'''
+        data = {
+            'method': 'get_jobs',
+            'plugin': None,
+            'assets': [],
+            'options': {},
+        }
+        self.host_connection.run(data, self.engine_type, self._jobs_callback)
+
+    def _jobs_callback(self, event):
+        '''Store the jobs returned by the engine in *event*.'''
+        for job in (event['data'] or {}).values():
+            self._asset_jobs[job['job_id']] = job
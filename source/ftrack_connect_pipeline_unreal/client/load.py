@@ -13,6 +13,7 @@ import ftrack_connect_pipeline_qt.constants as qt_constants
 
 from ftrack_connect_pipeline_unreal.constants.asset import modes as load_const
 import ftrack_connect_pipeline_unreal.constants as unreal_constants
+from ftrack_connect_pipeline_unreal import utils as unreal_utils
 
 from ftrack_connect_pipeline_qt.ui.utility.widget.button import (
     LoadRunButton,
@@ -62,7 +63,9 @@ class UnrealQtAssemblerClientWidget(load.QtAssemblerClientWidget):
             event_manager,
             load_const.LOAD_MODES,
             asset_list_model,
-            multithreading_enabled=False,
+            # Calls to Unreal made from worker threads are run on the main
+            # thread by the main thread dispatcher
+            multithreading_enabled=True,
         )
 
         # Make sure we stays on top of Unreal
@@ -245,36 +248,41 @@ class UnrealQtAssemblerClientWidget(load.QtAssemblerClientWidget):
 
             self.progress_widget.show_widget()
             failed = 0
-            for component_widget in component_widgets:
-                # Prepare progress widget
-                component = self._assembler_widget.component_list.model.data(
-                    component_widget.index
-                )[0]
-                self.progress_widget.set_status(
-                    core_constants.RUNNING_STATUS,
-                    'Loading {} / {}...'.format(
-                        str_version(component['version']), component['name']
-                    ),
-                )
-                definition = component_widget.definition
-                factory = component_widget.factory
-                factory.listen_widget_updates()
-
-                engine_type = definition['_config']['engine_type']
-                try:
-                    # Set method to importer plugins
-                    if method:
-                        for plugin in definition.get_all(
-                            category=core_constants.PLUGIN,
-                            type=core_constants.plugin._PLUGIN_IMPORTER_TYPE,
-                        ):
-                            plugin['default_method'] = method
-                    self.run_definition(definition, engine_type)
-                    # Did it go well?
-                    if factory.has_error:
-                        failed += 1
-                finally:
-                    component_widget.factory.end_widget_updates()
+            # Import all components before saving the imported assets in one
+            # go
+            with unreal_utils.batch_import():
+                for component_widget in component_widgets:
+                    # Prepare progress widget
+                    component_list = self._assembler_widget.component_list
+                    component = component_list.model.data(
+                        component_widget.index
+                    )[0]
+                    self.progress_widget.set_status(
+                        core_constants.RUNNING_STATUS,
+                        'Loading {} / {}...'.format(
+                            str_version(component['version']),
+                            component['name'],
+                        ),
+                    )
+                    definition = component_widget.definition
+                    factory = component_widget.factory
+                    factory.listen_widget_updates()
+
+                    engine_type = definition['_config']['engine_type']
+                    try:
+                        # Set method to importer plugins
+                        if method:
+                            for plugin in definition.get_all(
+                                category=core_constants.PLUGIN,
+                                type=core_constants.plugin._PLUGIN_IMPORTER_TYPE,
+                            ):
+                                plugin['default_method'] = method
+                        self.run_definition(definition, engine_type)
+                        # Did it go well?
+                        if factory.has_error:
+                            failed += 1
+                    finally:
+                        component_widget.factory.end_widget_updates()
 
             succeeded = len(component_widgets) - failed
             if succeeded > 0:
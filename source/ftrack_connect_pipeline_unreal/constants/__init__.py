@@ -15,4 +15,9 @@ except TypeError as te:
     # Ignore exception during docs/sphinx build
     pass
 PROJECT_SETTINGS_FILE_NAME = "project_settings.json"
+FTRACK_NODE_STORE_FILE_NAME = "ftrack_nodes.jsonl"
 GAME_ROOT_PATH = '/Game'
+FFMPEG_PATH_ENV = 'FTRACK_UNREAL_FFMPEG_PATH'
+FTRACK_TRACES_FOLDER_NAME = 'traces'
+FTRACK_CACHE_FOLDER_NAME = 'cache'
+TRACE_ENV = 'FTRACK_UNREAL_TRACE'
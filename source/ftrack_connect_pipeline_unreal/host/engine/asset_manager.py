@@ -5,17 +5,45 @@ import time
 import random
 import string
 import os
+from functools import partial, wraps
 
 import unreal
 
+import ftrack_api
+
 from ftrack_connect_pipeline import constants as core_constants
 from ftrack_connect_pipeline.host.engine import AssetManagerEngine
 from ftrack_connect_pipeline.asset.asset_info import FtrackAssetInfo
 
 from ftrack_connect_pipeline_unreal import utils as unreal_utils
+from ftrack_connect_pipeline_unreal.cache import FtrackCache
 from ftrack_connect_pipeline_unreal.constants import asset as asset_const
 from ftrack_connect_pipeline_unreal.asset import UnrealFtrackObjectManager
 from ftrack_connect_pipeline_unreal.asset.dcc_object import UnrealDccObject
+from ftrack_connect_pipeline_unreal.host.engine.job import (
+    AssetJob,
+    AssetJobRunner,
+)
+
+
+def traced_method(function):
+    '''
+    Decorator timing the engine method *function* in a span, the summary of
+    the outermost span is reported to the client when tracing is enabled.
+    '''
+    span_name = 'asset_manager.{}'.format(function.__name__)
+
+    @wraps(function)
+    def decorated(self, *args, **kwargs):
+        if not unreal_utils.is_tracing_enabled():
+            return function(self, *args, **kwargs)
+        with unreal_utils.span(span_name, export=True) as method_span:
+            result = function(self, *args, **kwargs)
+        if method_span.trace is not None:
+            self._notify_trace(method_span)
+        return result
+
+    return decorated
 
 
 class UnrealAssetManagerEngine(AssetManagerEngine):
@@ -26,6 +54,18 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
     DccObject = UnrealDccObject
     '''DccObject class to use'''
 
+    QUERY_CHUNK_SIZE = 100
+    '''Maximum number of asset versions resolved per query'''
+
+    JOB_METHODS = [
+        'select_asset',
+        'load_asset',
+        'change_version',
+        'unload_asset',
+        'remove_asset',
+    ]
+    '''Methods that can be run as per asset jobs, see :meth:`submit_jobs`'''
+
     def __init__(
         self, event_manager, host_types, host_id, asset_type_name=None
     ):
@@ -34,8 +74,10 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
         super(UnrealAssetManagerEngine, self).__init__(
             event_manager, host_types, host_id, asset_type_name=asset_type_name
         )
+        self._job_runners = []
 
     @unreal_utils.run_in_main_thread
+    @traced_method
     def discover_assets(self, assets=None, options=None, plugin=None):
         '''
         Discover all the assets in the scene:
@@ -56,12 +98,17 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
             'message': message,
         }
 
-        ftrack_asset_nodes = unreal_utils.get_ftrack_nodes()
+        # The scene model follows the asset registry, refresh only lists the
+        # project again if registry events are unavailable
+        scene_model = unreal_utils.get_ftrack_scene_model()
+        scene_model.refresh()
+
+        # Read all ftrack nodes from the model in one go
+        ftrack_asset_nodes = scene_model.items()
         ftrack_asset_info_list = []
 
         if ftrack_asset_nodes:
-            for node_name in ftrack_asset_nodes:
-                param_dict = self.DccObject.dictionary_from_object(node_name)
+            for unused_node_name, param_dict in ftrack_asset_nodes:
                 node_asset_info = FtrackAssetInfo(param_dict)
                 ftrack_asset_info_list.append(node_asset_info)
 
@@ -87,6 +134,7 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
         return status, result
 
     @unreal_utils.run_in_main_thread
+    @traced_method
     def select_asset(self, asset_info, options=None, plugin=None):
         '''
         Selects the given *asset_info* from the scene.
@@ -166,6 +214,7 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
         return status, result
 
     @unreal_utils.run_in_main_thread
+    @traced_method
     def select_assets(self, assets, options=None, plugin=None):
         '''
         Returns status dictionary and results dictionary keyed by the id for
@@ -180,6 +229,7 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
         )
 
     @unreal_utils.run_in_main_thread
+    @traced_method
     def load_asset(self, asset_info, options=None, plugin=None):
         '''
         Override load_asset method to deal with unloaded assets.
@@ -190,16 +240,13 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
             asset_info=asset_info, options=options, plugin=plugin
         )
 
-    @unreal_utils.run_in_main_thread
-    def change_version(self, asset_info, options, plugin=None):
+    def _notify_result(
+        self, plugin, method, start_time, status, result, message=None
+    ):
         '''
-        (Override) Support Unreal asset version change preserving in memory references.
+        Report the *status* and *result* of *method* run by *plugin* on an
+        asset to the client, with execution time counted from *start_time*.
         '''
-        start_time = time.time()
-        status = core_constants.UNKNOWN_STATUS
-        result = {}
-        message = None
-
         plugin_type = core_constants.PLUGIN_AM_ACTION_TYPE
         plugin_name = None
         if plugin:
@@ -209,31 +256,51 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
         result_data = {
             'plugin_name': plugin_name,
             'plugin_type': plugin_type,
-            'method': 'change_version',
+            'method': method,
             'status': status,
             'result': result,
-            'execution_time': 0,
+            'execution_time': time.time() - start_time,
             'message': message,
         }
 
-        self.asset_info = asset_info
-        dcc_object = self.DccObject(
-            from_id=asset_info[asset_const.ASSET_INFO_ID]
-        )
-        self.dcc_object = dcc_object
+        self._notify_client(plugin, result_data)
 
-        nodes = (
-            unreal_utils.get_connected_nodes_from_dcc_object(
-                self.dcc_object.name
-            )
-            or []
-        )
+    def _notify_trace(self, method_span):
+        '''
+        Report the summary of the trace of the engine method *method_span* to
+        the client.
+        '''
+        summary = unreal_utils.summarize_trace(method_span.trace)
+        result_data = {
+            'plugin_name': None,
+            'plugin_type': core_constants.PLUGIN_AM_ACTION_TYPE,
+            'method': method_span.name,
+            'status': core_constants.SUCCESS_STATUS,
+            'result': summary,
+            'execution_time': method_span.duration,
+            'message': 'Trace of {}:\n{}'.format(
+                method_span.name, unreal_utils.format_trace_summary(summary)
+            ),
+        }
+        self._notify_client(None, result_data)
+
+    @unreal_utils.traced('asset_manager.stage_version_change')
+    def _stage_version_change(self, nodes):
+        '''
+        Rename the existing *nodes* to temporary names and remove their ftrack
+        metadata, so the new version can be imported alongside.
+        Returns status, message and a dictionary of temporary node names
+        mapped to their Unreal class name.
+        '''
+        status = core_constants.UNKNOWN_STATUS
+        message = None
         temporary_assets = {}
+        existing_nodes = unreal_utils.nodes_exist(nodes)
         # Rename
         for node in nodes:
             # Generate temp name and map it to class
             try:
-                if unreal_utils.node_exists(node):
+                if existing_nodes[node]:
                     asset = unreal.EditorAssetLibrary.load_asset(node)
                     asset_class_name = asset.__class__.__name__
                     suffix = '_{}'.format(
@@ -266,9 +333,7 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
                     #  the new imported nodes with the old name.
                     temporary_assets[str(new_name)] = asset_class_name
                     # Remove dcc metadata tag.
-                    unreal.EditorAssetLibrary.remove_metadata_tag(
-                        asset, asset_const.NODE_METADATA_TAG
-                    )
+                    unreal_utils.disconnect_object(new_name)
                     status = core_constants.SUCCESS_STATUS
                 else:
                     self.logger.warning(
@@ -285,44 +350,23 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
                 self.logger.error(message)
                 status = core_constants.ERROR_STATUS
 
-        bool_status = core_constants.status_bool_mapping[status]
-        if not bool_status:
-            end_time = time.time()
-            total_time = end_time - start_time
+        return status, message, temporary_assets
 
-            result_data['status'] = status
-            result_data['result'] = result
-            result_data['execution_time'] = total_time
-            result_data['message'] = message
-
-            self._notify_client(plugin, result_data)
-            return status, result
-
-        # Change version
-        super_status, super_result = super(
-            UnrealAssetManagerEngine, self
-        ).change_version(asset_info=asset_info, options=options, plugin=plugin)
-
-        bool_status = core_constants.status_bool_mapping[super_status]
-        if not bool_status:
-            end_time = time.time()
-            total_time = end_time - start_time
-
-            result_data['status'] = super_status
-            result_data['result'] = super_result
-            result_data['execution_time'] = total_time
-            result_data['message'] = message
-
-            self._notify_client(plugin, result_data)
-            return status, result
+    @unreal_utils.traced('asset_manager.consolidate_version_change')
+    def _consolidate_version_change(self, new_nodes, temporary_assets):
+        '''
+        Consolidate the previous version *temporary_assets* into the newly
+        imported *new_nodes*, matched on Unreal class name.
+        Returns status and message.
+        '''
+        status = core_constants.SUCCESS_STATUS
+        message = None
 
-        # Consolidate new nodes and remove temp ones
-        new_nodes = (
-            unreal_utils.get_connected_nodes_from_dcc_object(
-                self.dcc_object.name
+        temporary_assets_by_class = {}
+        for temp_node, asset_class_name in temporary_assets.items():
+            temporary_assets_by_class.setdefault(asset_class_name, []).append(
+                temp_node
             )
-            or []
-        )
 
         # Consolidate nodes
         unprocessed_nodes = []
@@ -331,12 +375,7 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
             try:
                 asset = unreal.EditorAssetLibrary.load_asset(node)
                 asset_class_name = asset.__class__.__name__
-                temp_nodes = list(
-                    filter(
-                        lambda x: temporary_assets[x] == asset_class_name,
-                        temporary_assets,
-                    )
-                )
+                temp_nodes = temporary_assets_by_class.get(asset_class_name)
                 if not temp_nodes:
                     unprocessed_nodes.append(node)
                     self.logger.debug(
@@ -351,9 +390,8 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
                 self.logger.info(
                     'Consolidating from previous asset: {}'.format(temp_node)
                 )
-                # TODO: This command produces residual redirect nodes.
-                #  Can't currently be removed as their creation is delayed and
-                #  can't be detected here.
+                # This command produces residual redirect nodes, they are
+                # fixed up once all versions are changed.
                 unreal.EditorAssetLibrary.consolidate_assets(
                     asset, [temp_asset]
                 )
@@ -365,12 +403,6 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
                 self.logger.error(message)
                 status = core_constants.ERROR_STATUS
 
-        # Clean up not consolidated nodes
-        for temp_node in list(temporary_assets.keys()):
-            if unreal_utils.node_exists(temp_node):
-                self.logger.debug("Removing temp node {}".format(temp_node))
-                unreal_utils.delete_node(temp_node)
-
         if unprocessed_nodes:
             self.logger.warning(
                 "Following nodes couldn't be consolidated.\n"
@@ -382,208 +414,817 @@ class UnrealAssetManagerEngine(AssetManagerEngine):
         else:
             self.logger.debug("All nodes consolidation done.")
 
-        end_time = time.time()
-        total_time = end_time - start_time
-
-        result_data['status'] = status
-        result_data['result'] = super_result
-        result_data['execution_time'] = total_time
-        result_data['message'] = message
+        return status, message
 
-        self._notify_client(plugin, result_data)
-
-        return status, result
-
-    @unreal_utils.run_in_main_thread
-    def unload_asset(self, asset_info, options=None, plugin=None):
+    @unreal_utils.traced('asset_manager.restore_version_change')
+    def _restore_version_change(
+        self, temporary_assets, dcc_object_name, dcc_object_data
+    ):
         '''
-        Removes the given *asset_info* from the scene.
-        Returns status and result
+        Rename the previous version *temporary_assets* back to their original
+        names and connect them again to the dcc object *dcc_object_name*,
+        recreated from *dcc_object_data* if removed, when the new version
+        could not be loaded.
         '''
-        start_time = time.time()
-        status = core_constants.UNKNOWN_STATUS
-        result = []
-        message = None
+        dcc_object = self.DccObject()
+        dcc_object.name = dcc_object_name
+        # The version change removes the dcc object before loading
+        dcc_object.update(dcc_object_data)
+
+        restored_nodes = []
+        for temp_node in temporary_assets:
+            # Strip the random suffix added by _stage_version_change
+            node = temp_node.rsplit('_', 1)[0]
+            try:
+                if unreal_utils.rename_node(temp_node, node) != node:
+                    raise Exception(
+                        'Unreal asset {} could not be renamed.'.format(
+                            temp_node
+                        )
+                    )
+                restored_nodes.append(node)
+            except Exception as error:
+                self.logger.error(
+                    'Node: {0} could not be restored, error: {1}'.format(
+                        temp_node, error
+                    )
+                )
+        self.logger.debug(
+            'Restored previous version nodes: {}'.format(restored_nodes)
+        )
+        dcc_object.connect_objects(restored_nodes)
 
-        plugin_type = core_constants.PLUGIN_AM_ACTION_TYPE
-        plugin_name = None
-        if plugin:
-            plugin_type = '{}.{}'.format('asset_manager', plugin['type'])
-            plugin_name = plugin.get('name')
+    def _get_component_paths(self, asset_version, location):
+        '''
+        Return the file paths of the components of *asset_version* in
+        *location* by component name, None for components not available in
+        the location.
+        '''
+        component_paths = {}
+        for component in asset_version['components']:
+            try:
+                component_paths[component['name']] = (
+                    location.get_filesystem_path(component)
+                )
+            except Exception as error:
+                self.logger.debug(
+                    'Component {} not available in {}: {}'.format(
+                        component['name'], location['name'], error
+                    )
+                )
+                component_paths[component['name']] = None
+        return component_paths
 
-        result_data = {
-            'plugin_name': plugin_name,
-            'plugin_type': plugin_type,
-            'method': 'unload_asset',
-            'status': status,
-            'result': result,
-            'execution_time': 0,
-            'message': message,
-        }
+    def _query_component_paths(self, asset_version_ids, session=None):
+        '''
+        Return the file paths of the components of the asset versions
+        *asset_version_ids* by version id and component name, resolved with
+        as few queries as possible through *session*, the engine session if
+        not given. Versions that do not exist are left out.
+        '''
+        if not asset_version_ids:
+            return {}
+        session = session or self.session
+        location = session.pick_location()
+        component_paths = {}
+        for index in range(0, len(asset_version_ids), self.QUERY_CHUNK_SIZE):
+            chunk = asset_version_ids[index : index + self.QUERY_CHUNK_SIZE]
+            with unreal_utils.span(
+                'ftrack.query_versions', versions=len(chunk)
+            ):
+                for asset_version in session.query(
+                    'select asset, components from AssetVersion '
+                    'where id in ({})'.format(
+                        ','.join('"{}"'.format(v_id) for v_id in chunk)
+                    )
+                ).all():
+                    component_paths[asset_version['id']] = (
+                        self._get_component_paths(asset_version, location)
+                    )
+        return component_paths
 
-        self.asset_info = asset_info
-        dcc_object = self.DccObject(
-            from_id=asset_info[asset_const.ASSET_INFO_ID]
+    def _prefetch_component_paths(self, asset_version_ids):
+        '''
+        Resolve the component paths of the asset versions *asset_version_ids*
+        not in the project ftrack cache, with as few queries as possible, and
+        cache them. Versions not resolved here are queried one by one by
+        :meth:`_resolve_component_paths`.
+        '''
+        ftrack_cache = unreal_utils.get_project_ftrack_cache(
+            self.session.server_url
         )
-        self.dcc_object = dcc_object
+        missing_version_ids = []
+        for asset_version_id in asset_version_ids:
+            if (
+                asset_version_id
+                and asset_version_id not in missing_version_ids
+                and ftrack_cache.get(
+                    FtrackCache.ASSET_VERSION, asset_version_id
+                )
+                is None
+            ):
+                missing_version_ids.append(asset_version_id)
+        try:
+            component_paths = self._query_component_paths(missing_version_ids)
+        except Exception as error:
+            self.logger.warning(
+                'Could not query asset versions {}: {}'.format(
+                    missing_version_ids, error
+                )
+            )
+            return
+        if component_paths:
+            ftrack_cache.update(FtrackCache.ASSET_VERSION, component_paths)
 
-        nodes = (
-            unreal_utils.get_connected_nodes_from_dcc_object(
-                self.dcc_object.name
+    def _resolve_component_paths(self, asset_version_id):
+        '''
+        Return the file paths of the components of the asset version
+        *asset_version_id* by component name. Paths are taken from the
+        project ftrack cache when fresh, otherwise queried. Raises an
+        exception if the version does not exist or cannot be queried, expired
+        cache entries are not used as the paths may have changed since.
+        '''
+        ftrack_cache = unreal_utils.get_project_ftrack_cache(
+            self.session.server_url
+        )
+        component_paths = ftrack_cache.get(
+            FtrackCache.ASSET_VERSION, asset_version_id
+        )
+        if component_paths is not None:
+            return component_paths
+        try:
+            component_paths = self._query_component_paths(
+                [asset_version_id]
+            ).get(asset_version_id)
+        except Exception as error:
+            if (
+                ftrack_cache.get(
+                    FtrackCache.ASSET_VERSION, asset_version_id, stale=True
+                )
+                is not None
+            ):
+                raise Exception(
+                    'Could not query the asset version and its cached '
+                    'component paths have expired: {}'.format(error)
+                )
+            raise
+        if component_paths is None:
+            raise Exception(
+                'Asset version {} does not exist'.format(asset_version_id)
             )
-            or []
+        ftrack_cache.set(
+            FtrackCache.ASSET_VERSION, asset_version_id, component_paths
         )
+        return component_paths
 
-        for node in nodes:
-            self.logger.debug("Removing object: {}".format(node))
+    def _check_new_version(
+        self, asset_info, new_version_id, component_paths=None
+    ):
+        '''
+        Check the component of *asset_info* can be loaded from the asset
+        version *new_version_id*, before the assets of the current version
+        are renamed. The *component_paths* of the version are resolved if not
+        given. Returns an error message, None if it can.
+        '''
+        if component_paths is None:
             try:
-                if unreal_utils.node_exists(node):
-                    if not unreal_utils.delete_node(node):
-                        raise Exception(
-                            'Unreal asset could not be deleted from library.'
-                        )
-                    result.append(str(node))
-                    status = core_constants.SUCCESS_STATUS
+                component_paths = self._resolve_component_paths(new_version_id)
             except Exception as error:
-                message = str(
-                    'Node: {0} could not be deleted, error: {1}'.format(
-                        node, error
+                return (
+                    'Could not resolve asset version {}, skipped: {}'.format(
+                        new_version_id, error
                     )
                 )
+        component_name = asset_info.get(asset_const.COMPONENT_NAME)
+        if not component_name:
+            return None
+        if component_name not in component_paths:
+            return 'Asset version {} has no {} component'.format(
+                new_version_id, component_name
+            )
+        component_path = component_paths[component_name]
+        if not component_path or not os.path.exists(component_path):
+            return (
+                'Component {} of asset version {} is not on disk: {}'.format(
+                    component_name, new_version_id, component_path
+                )
+            )
+        return None
+
+    def _change_versions(self, changes, plugin=None, component_paths=None):
+        '''
+        Change version of all asset info and options pairs in *changes*,
+        checking the new versions can be loaded, staging all renames first,
+        then importing all new versions and finally consolidating them, with
+        a single temporary node clean up and redirector fix up at the end.
+        The component paths of new versions already resolved can be given by
+        version id in *component_paths*.
+        Returns status dictionary and results dictionary keyed by the id.
+        '''
+        start_time = time.time()
+        statuses = {}
+        results = {}
+        component_paths = component_paths or {}
+
+        # Resolve all other new versions at once, checked one by one below
+        self._prefetch_component_paths(
+            [
+                options.get('new_version_id')
+                for unused_asset_info, options in changes
+                if options.get('new_version_id') not in component_paths
+            ]
+        )
+
+        # Rename all previous versions out of the way
+        staged = []
+        for asset_info, options in changes:
+            asset_info_id = asset_info[asset_const.ASSET_INFO_ID]
+            self.asset_info = asset_info
+            dcc_object = self.DccObject(from_id=asset_info_id)
+            self.dcc_object = dcc_object
+
+            # Leave the current version in place if the new one cannot load
+            message = self._check_new_version(
+                asset_info,
+                options.get('new_version_id'),
+                component_paths.get(options.get('new_version_id')),
+            )
+            if message:
                 self.logger.error(message)
-                status = core_constants.ERROR_STATUS
+                self._notify_result(
+                    plugin,
+                    'change_version',
+                    start_time,
+                    core_constants.ERROR_STATUS,
+                    {},
+                    message,
+                )
+                statuses[asset_info_id] = core_constants.ERROR_STATUS
+                results[asset_info_id] = {}
+                continue
+
+            nodes = (
+                unreal_utils.get_connected_nodes_from_dcc_object(
+                    self.dcc_object.name
+                )
+                or []
+            )
+            status, message, temporary_assets = self._stage_version_change(
+                nodes
+            )
 
             bool_status = core_constants.status_bool_mapping[status]
             if not bool_status:
-                end_time = time.time()
-                total_time = end_time - start_time
-
-                result_data['status'] = status
-                result_data['result'] = result
-                result_data['execution_time'] = total_time
-                result_data['message'] = message
-
-                self._notify_client(plugin, result_data)
-                return status, result
+                if temporary_assets:
+                    self._restore_version_change(
+                        temporary_assets,
+                        self.dcc_object.name,
+                        self.DccObject.dictionary_from_object(
+                            self.dcc_object.name
+                        ),
+                    )
+                self._notify_result(
+                    plugin, 'change_version', start_time, status, {}, message
+                )
+                statuses[asset_info_id] = status
+                results[asset_info_id] = {}
+                continue
+            staged.append((asset_info, options, temporary_assets))
+
+        # Change version, importing all new versions, saved in one go once
+        # all are imported
+        imported = []
+        with unreal_utils.batch_import():
+            for asset_info, options, temporary_assets in staged:
+                asset_info_id = asset_info[asset_const.ASSET_INFO_ID]
+                self.asset_info = asset_info
+                self.dcc_object = self.DccObject(from_id=asset_info_id)
+                dcc_object_name = self.dcc_object.name
+                dcc_object_data = self.DccObject.dictionary_from_object(
+                    dcc_object_name
+                )
+                with unreal_utils.span(
+                    'asset_manager.load_version',
+                    version_id=options.get('new_version_id'),
+                ):
+                    super_status, super_result = super(
+                        UnrealAssetManagerEngine, self
+                    ).change_version(
+                        asset_info=asset_info, options=options, plugin=plugin
+                    )
 
-        self.ftrack_object_manager.objects_loaded = False
+                bool_status = core_constants.status_bool_mapping[super_status]
+                if not bool_status:
+                    # Put the current version back in place
+                    self._restore_version_change(
+                        temporary_assets, dcc_object_name, dcc_object_data
+                    )
+                    self._notify_result(
+                        plugin,
+                        'change_version',
+                        start_time,
+                        super_status,
+                        super_result,
+                    )
+                    statuses[asset_info_id] = super_status
+                    results[asset_info_id] = {}
+                    continue
+                imported.append(
+                    (
+                        asset_info_id,
+                        self.dcc_object.name,
+                        temporary_assets,
+                        super_result,
+                    )
+                )
 
-        end_time = time.time()
-        total_time = end_time - start_time
+        # Consolidate new nodes, all imports are listed in one project scan
+        all_temporary_assets = {}
+        consolidated = []
+        for (
+            asset_info_id,
+            dcc_object_name,
+            temporary_assets,
+            super_result,
+        ) in imported:
+            new_nodes = (
+                unreal_utils.get_connected_nodes_from_dcc_object(
+                    dcc_object_name
+                )
+                or []
+            )
+            status, message = self._consolidate_version_change(
+                new_nodes, temporary_assets
+            )
+            all_temporary_assets.update(temporary_assets)
+            consolidated.append((asset_info_id, status, super_result, message))
 
-        result_data['status'] = status
-        result_data['result'] = result
-        result_data['execution_time'] = total_time
+        if all_temporary_assets:
+            # Remap references left on redirectors by consolidate
+            unreal_utils.fixup_redirectors(list(all_temporary_assets))
 
-        self._notify_client(plugin, result_data)
+            # Clean up not consolidated nodes
+            existing_temp_nodes = unreal_utils.nodes_exist(
+                all_temporary_assets
+            )
+            temp_nodes = []
+            for temp_node in all_temporary_assets:
+                if existing_temp_nodes[temp_node]:
+                    self.logger.debug(
+                        "Removing temp node {}".format(temp_node)
+                    )
+                    temp_nodes.append(temp_node)
+            unreal_utils.delete_nodes(temp_nodes)
+
+        for asset_info_id, status, super_result, message in consolidated:
+            self._notify_result(
+                plugin,
+                'change_version',
+                start_time,
+                status,
+                super_result,
+                message,
+            )
+            # The result of the load is only reported to the client
+            statuses[asset_info_id] = status
+            results[asset_info_id] = {}
 
-        return status, result
+        return statuses, results
 
     @unreal_utils.run_in_main_thread
-    def remove_asset(self, asset_info, options=None, plugin=None):
+    @traced_method
+    def change_version(self, asset_info, options, plugin=None):
         '''
-        Removes the given *asset_info* from the scene.
-        Returns status and result
+        (Override) Support Unreal asset version change preserving in memory references.
         '''
-        start_time = time.time()
-        status = core_constants.UNKNOWN_STATUS
-        result = []
-        message = None
-
-        plugin_type = core_constants.PLUGIN_AM_ACTION_TYPE
-        plugin_name = None
-        if plugin:
-            plugin_type = '{}.{}'.format('asset_manager', plugin['type'])
-            plugin_name = plugin.get('name')
-
-        result_data = {
-            'plugin_name': plugin_name,
-            'plugin_type': plugin_type,
-            'method': 'remove_asset',
-            'status': status,
-            'result': result,
-            'execution_time': 0,
-            'message': message,
-        }
-
-        self.asset_info = asset_info
-        dcc_object = self.DccObject(
-            from_id=asset_info[asset_const.ASSET_INFO_ID]
+        statuses, results = self._change_versions(
+            [(asset_info, options)], plugin=plugin
         )
-        self.dcc_object = dcc_object
+        asset_info_id = asset_info[asset_const.ASSET_INFO_ID]
+        return statuses[asset_info_id], results[asset_info_id]
 
-        nodes = (
-            unreal_utils.get_connected_nodes_from_dcc_object(
-                self.dcc_object.name
+    @unreal_utils.run_in_main_thread
+    @traced_method
+    def change_versions(self, assets, options, plugin=None):
+        '''
+        Returns status dictionary and results dictionary keyed by the id for
+        changing version of all the
+        :class:`~ftrack_connect_pipeline.asset.FtrackAssetInfo` in the given
+        *assets* list, to the version ids given by asset info id in the
+        *options* "new_version_ids" dictionary. Renames, imports and
+        consolidation are each done for all assets in one pass.
+
+        *assets*: List of :class:`~ftrack_connect_pipeline.asset.FtrackAssetInfo`
+        '''
+        new_version_ids = options.get('new_version_ids') or {}
+        changes = []
+        for asset_info in assets:
+            asset_info_id = asset_info[asset_const.ASSET_INFO_ID]
+            if not new_version_ids.get(asset_info_id):
+                self.logger.warning(
+                    'No new version given for asset: {}'.format(asset_info_id)
+                )
+                continue
+            asset_options = dict(options)
+            asset_options.pop('new_version_ids')
+            asset_options['new_version_id'] = new_version_ids[asset_info_id]
+            changes.append((asset_info, asset_options))
+        return self._change_versions(changes, plugin=plugin)
+
+    def _delete_assets(self, assets, method, remove_dcc_object, plugin):
+        '''
+        Delete the Unreal assets connected to all *assets* in one operation,
+        and the dcc objects if *remove_dcc_object* is True. The result of each
+        asset is reported to the client as *method* run by *plugin*.
+        Returns status dictionary and results dictionary keyed by the id.
+        '''
+        start_time = time.time()
+        statuses = {}
+        results = {}
+
+        # Gather the connected nodes of the whole selection
+        dcc_objects = {}
+        nodes_by_id = {}
+        for asset_info in assets:
+            asset_info_id = asset_info[asset_const.ASSET_INFO_ID]
+            dcc_object = self.DccObject(from_id=asset_info_id)
+            dcc_objects[asset_info_id] = dcc_object
+            nodes_by_id[asset_info_id] = (
+                unreal_utils.get_connected_nodes_from_dcc_object(
+                    dcc_object.name
+                )
+                or []
             )
-            or []
-        )
 
-        for node in nodes:
-            self.logger.debug("Removing object: {}".format(node))
-            try:
-                if unreal_utils.node_exists(node):
-                    if not unreal_utils.delete_node(node):
-                        raise Exception(
-                            'Unreal asset could not be deleted from library.'
+        all_nodes = []
+        for nodes in nodes_by_id.values():
+            all_nodes.extend(nodes)
+        existing_nodes = unreal_utils.nodes_exist(all_nodes)
+        nodes_to_delete = []
+        for node in all_nodes:
+            if existing_nodes[node]:
+                self.logger.debug("Removing object: {}".format(node))
+                nodes_to_delete.append(node)
+        delete_error = 'Unreal asset could not be deleted from library.'
+        try:
+            deleted_nodes = set(unreal_utils.delete_nodes(nodes_to_delete))
+        except Exception as error:
+            self.logger.error(
+                'Nodes: {0} could not be deleted, error: {1}'.format(
+                    nodes_to_delete, error
+                )
+            )
+            delete_error = error
+            deleted_nodes = set()
+
+        # Remove the dcc objects of fully deleted assets in one go
+        deleted_dcc_objects = set()
+        if remove_dcc_object:
+            deleted_dcc_objects = set(
+                unreal_utils.delete_ftrack_nodes(
+                    [
+                        dcc_objects[asset_info_id].name
+                        for asset_info_id, nodes in nodes_by_id.items()
+                        if deleted_nodes.issuperset(
+                            node for node in nodes if existing_nodes[node]
                         )
+                    ]
+                )
+            )
+
+        for asset_info in assets:
+            asset_info_id = asset_info[asset_const.ASSET_INFO_ID]
+            dcc_object = dcc_objects[asset_info_id]
+            # Unknown unless something has been deleted, as before batching
+            status = core_constants.UNKNOWN_STATUS
+            result = []
+            message = None
+
+            for node in nodes_by_id[asset_info_id]:
+                if not existing_nodes[node]:
+                    continue
+                if node in deleted_nodes:
                     result.append(str(node))
-                    status = core_constants.SUCCESS_STATUS
-            except Exception as error:
+                    if status != core_constants.ERROR_STATUS:
+                        status = core_constants.SUCCESS_STATUS
+                    continue
                 message = str(
                     'Node: {0} could not be deleted, error: {1}'.format(
-                        node, error
+                        node, delete_error
                     )
                 )
                 self.logger.error(message)
                 status = core_constants.ERROR_STATUS
 
-            bool_status = core_constants.status_bool_mapping[status]
-            if not bool_status:
-                end_time = time.time()
-                total_time = end_time - start_time
+            if remove_dcc_object and dcc_object.name in deleted_dcc_objects:
+                result.append(str(dcc_object.name))
+                if status != core_constants.ERROR_STATUS:
+                    status = core_constants.SUCCESS_STATUS
 
-                result_data['status'] = status
-                result_data['result'] = result
-                result_data['execution_time'] = total_time
-                result_data['message'] = message
+            if status != core_constants.ERROR_STATUS and not remove_dcc_object:
+                self.asset_info = asset_info
+                self.dcc_object = dcc_object
+                self.ftrack_object_manager.objects_loaded = False
 
-                self._notify_client(plugin, result_data)
-                return status, result
+            self._notify_result(
+                plugin, method, start_time, status, result, message
+            )
 
-        if unreal_utils.ftrack_node_exists(self.dcc_object.name):
-            try:
-                unreal_utils.delete_ftrack_node(self.dcc_object.name)
-                result.append(str(self.dcc_object.name))
-                status = core_constants.SUCCESS_STATUS
-            except Exception as error:
-                message = str(
-                    'Could not delete the dcc_object, error: {}'.format(error)
-                )
-                self.logger.error(message)
-                status = core_constants.ERROR_STATUS
+            statuses[asset_info_id] = status
+            results[asset_info_id] = result
 
-            bool_status = core_constants.status_bool_mapping[status]
-            if not bool_status:
-                end_time = time.time()
-                total_time = end_time - start_time
+        return statuses, results
 
-                result_data['status'] = status
-                result_data['result'] = result
-                result_data['execution_time'] = total_time
-                result_data['message'] = message
+    @unreal_utils.run_in_main_thread
+    @traced_method
+    def unload_asset(self, asset_info, options=None, plugin=None):
+        '''
+        Removes the given *asset_info* from the scene.
+        Returns status and result
+        '''
+        statuses, results = self._delete_assets(
+            [asset_info], 'unload_asset', False, plugin
+        )
+        asset_info_id = asset_info[asset_const.ASSET_INFO_ID]
+        return statuses[asset_info_id], results[asset_info_id]
 
-                self._notify_client(plugin, result_data)
+    @unreal_utils.run_in_main_thread
+    @traced_method
+    def unload_assets(self, assets, options=None, plugin=None):
+        '''
+        Returns status dictionary and results dictionary keyed by the id for
+        unloading all the
+        :class:`~ftrack_connect_pipeline.asset.FtrackAssetInfo` in the given
+        *assets* list, deleting their Unreal assets in one operation.
 
-                return status, result
+        *assets*: List of :class:`~ftrack_connect_pipeline.asset.FtrackAssetInfo`
+        '''
+        return self._delete_assets(assets, 'unload_asset', False, plugin)
 
-        end_time = time.time()
-        total_time = end_time - start_time
+    @unreal_utils.run_in_main_thread
+    @traced_method
+    def remove_asset(self, asset_info, options=None, plugin=None):
+        '''
+        Removes the given *asset_info* from the scene.
+        Returns status and result
+        '''
+        statuses, results = self._delete_assets(
+            [asset_info], 'remove_asset', True, plugin
+        )
+        asset_info_id = asset_info[asset_const.ASSET_INFO_ID]
+        return statuses[asset_info_id], results[asset_info_id]
 
-        result_data['status'] = status
-        result_data['result'] = result
-        result_data['execution_time'] = total_time
+    @unreal_utils.run_in_main_thread
+    @traced_method
+    def remove_assets(self, assets, options=None, plugin=None):
+        '''
+        Returns status dictionary and results dictionary keyed by the id for
+        removing all the
+        :class:`~ftrack_connect_pipeline.asset.FtrackAssetInfo` in the given
+        *assets* list, deleting their Unreal assets and dcc objects in one
+        operation.
 
-        self._notify_client(plugin, result_data)
+        *assets*: List of :class:`~ftrack_connect_pipeline.asset.FtrackAssetInfo`
+        '''
+        return self._delete_assets(assets, 'remove_asset', True, plugin)
 
-        return status, result
+    def _prepare_change_version(self, new_version_id, session):
+        '''
+        Return the component paths of the asset version *new_version_id*,
+        queried through the worker thread *session* ahead of the version
+        change. Raises an exception if the version does not exist.
+        '''
+        component_paths = self._query_component_paths(
+            [new_version_id], session=session
+        ).get(new_version_id)
+        if component_paths is None:
+            raise Exception(
+                'Asset version {} does not exist'.format(new_version_id)
+            )
+        return component_paths
+
+    def _execute_change_version(
+        self, asset_info, options, plugin, component_paths
+    ):
+        '''
+        Change the version of *asset_info* with *options*, to the version
+        with the *component_paths* returned by
+        :meth:`_prepare_change_version`.
+        '''
+        statuses, results = self._change_versions(
+            [(asset_info, options)],
+            plugin=plugin,
+            component_paths={options['new_version_id']: component_paths},
+        )
+        asset_info_id = asset_info[asset_const.ASSET_INFO_ID]
+        return statuses[asset_info_id], results[asset_info_id]
+
+    def _execute_job_method(
+        self, method, asset_info, options, plugin, unused_prepared
+    ):
+        '''
+        Run the engine *method* on *asset_info* with *options*, for jobs
+        without a prepare part.
+        '''
+        return getattr(self, method)(asset_info, options, plugin)
+
+    def _create_job_session_factory(self):
+        '''
+        Return a callable creating sessions connected as the engine session,
+        for the job worker threads as sessions are not thread safe.
+        '''
+        ftrack_cache = unreal_utils.get_project_ftrack_cache(
+            self.session.server_url
+        )
+        return partial(
+            ftrack_api.Session,
+            server_url=self.session.server_url,
+            api_key=self.session.api_key,
+            api_user=self.session.api_user,
+            auto_connect_event_hub=False,
+            plugin_paths=[],
+            schema_cache_path=ftrack_cache.schema_cache_path,
+        )
+
+    def _notify_job(self, plugin, job, progress):
+        '''
+        Report the state of *job* run by *plugin* to the client, with the
+        *progress* of the batch it belongs to.
+        '''
+        if job.finished:
+            status = job.status
+        else:
+            status = core_constants.RUNNING_STATUS
+        result = job.to_dict()
+        result['progress'] = progress
+        # Clients are notified from the main thread
+        unreal_utils.submit_to_main_thread(
+            self._notify_result,
+            plugin,
+            'submit_jobs',
+            time.time() - job.execution_time,
+            status,
+            result,
+            job.message,
+        )
+
+    def _get_job_results(self, runner, jobs):
+        '''
+        Return status dictionary and results dictionary keyed by the asset
+        info id describing *jobs* of *runner*, with the batch progress.
+        '''
+        statuses = {}
+        results = {}
+        for job in jobs:
+            statuses[job.asset_info_id] = core_constants.SUCCESS_STATUS
+            results[job.asset_info_id] = job.to_dict()
+            results[job.asset_info_id]['progress'] = runner.progress
+        return statuses, results
+
+    @unreal_utils.run_in_main_thread
+    def submit_jobs(self, assets, options, plugin=None):
+        '''
+        Run the *options* "method", one of :attr:`JOB_METHODS`, on each of
+        the :class:`~ftrack_connect_pipeline.asset.FtrackAssetInfo` in the
+        given *assets* list as a separate job, in the background. Options of
+        the method are given by *options* "options", for change_version the
+        new version ids are given by asset info id in *options*
+        "new_version_ids".
+
+        Returns at once a status dictionary and a results dictionary keyed by
+        the id, holding the queued jobs. Each job change is reported to the
+        client, see :meth:`get_jobs` and :meth:`cancel_jobs`.
+        '''
+        method = options.get('method')
+        if method not in self.JOB_METHODS:
+            raise Exception('Method {} cannot run as a job'.format(method))
+        method_options = options.get('options') or {}
+        new_version_ids = options.get('new_version_ids') or {}
+
+        jobs = []
+        session_factory = None
+        for asset_info in assets:
+            asset_info_id = asset_info[asset_const.ASSET_INFO_ID]
+            job_options = dict(method_options)
+            if method == 'change_version':
+                if not new_version_ids.get(asset_info_id):
+                    self.logger.warning(
+                        'No new version given for asset: {}'.format(
+                            asset_info_id
+                        )
+                    )
+                    continue
+                job_options['new_version_id'] = new_version_ids[asset_info_id]
+                prepare = partial(
+                    self._prepare_change_version,
+                    job_options['new_version_id'],
+                )
+                execute = partial(
+                    self._execute_change_version,
+                    asset_info,
+                    job_options,
+                    plugin,
+                )
+                if session_factory is None:
+                    session_factory = self._create_job_session_factory()
+            else:
+                prepare = None
+                execute = partial(
+                    self._execute_job_method,
+                    method,
+                    asset_info,
+                    job_options,
+                    plugin,
+                )
+            jobs.append(
+                AssetJob(method, asset_info, job_options, execute, prepare)
+            )
+
+        runner = AssetJobRunner(
+            jobs,
+            on_job_changed=partial(self._notify_job, plugin),
+            session_factory=session_factory,
+        )
+        self._job_runners = [
+            job_runner
+            for job_runner in self._job_runners
+            if not job_runner.finished
+        ]
+        self._job_runners.append(runner)
+        runner.start()
+        return self._get_job_results(runner, jobs)
+
+    @unreal_utils.run_in_main_thread
+    def get_jobs(self, assets=None, options=None, plugin=None):
+        '''
+        Returns status dictionary and results dictionary keyed by the id,
+        holding the last job submitted for each of the
+        :class:`~ftrack_connect_pipeline.asset.FtrackAssetInfo` in the given
+        *assets* list, or for all assets if not given, with the progress of
+        its batch.
+        '''
+        asset_info_ids = None
+        if assets:
+            asset_info_ids = set(
+                asset_info[asset_const.ASSET_INFO_ID] for asset_info in assets
+            )
+        statuses = {}
+        results = {}
+        for runner in self._job_runners:
+            runner_statuses, runner_results = self._get_job_results(
+                runner,
+                [
+                    job
+                    for job in runner.jobs
+                    if asset_info_ids is None
+                    or job.asset_info_id in asset_info_ids
+                ],
+            )
+            statuses.update(runner_statuses)
+            results.update(runner_results)
+        return statuses, results
+
+    @unreal_utils.run_in_main_thread
+    def cancel_jobs(self, assets=None, options=None, plugin=None):
+        '''
+        Cancel the queued jobs of the
+        :class:`~ftrack_connect_pipeline.asset.FtrackAssetInfo` in the given
+        *assets* list, or of the job ids in *options* "job_ids", all queued
+        jobs if none are given. Jobs already running finish.
+
+        Returns status dictionary and results dictionary keyed by the id,
+        holding the cancelled jobs.
+        '''
+        job_ids = (options or {}).get('job_ids')
+        asset_info_ids = None
+        if assets:
+            asset_info_ids = set(
+                asset_info[asset_const.ASSET_INFO_ID] for asset_info in assets
+            )
+        statuses = {}
+        results = {}
+        for runner in self._job_runners:
+            selected_job_ids = None
+            if job_ids is not None or asset_info_ids is not None:
+                selected_job_ids = set(
+                    job.id
+                    for job in runner.jobs
+                    if (job_ids is not None and job.id in job_ids)
+                    or (
+                        asset_info_ids is not None
+                        and job.asset_info_id in asset_info_ids
+                    )
+                )
+            cancelled_jobs = runner.cancel(selected_job_ids)
+            for job in cancelled_jobs:
+                self.logger.debug(
+                    'Cancelled job {} on asset {}'.format(
+                        job.method, job.asset_info_id
+                    )
+                )
+            runner_statuses, runner_results = self._get_job_results(
+                runner, cancelled_jobs
+            )
+            statuses.update(runner_statuses)
+            results.update(runner_results)
+        return statuses, results
@@ -0,0 +1,276 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from ftrack_connect_pipeline import constants as core_constants
+
+from ftrack_connect_pipeline_unreal import utils as unreal_utils
+from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+
+logger = logging.getLogger(__name__)
+
+
+class AssetJob(object):
+    '''
+    Asset manager operation *method* on a single asset, run by an
+    :class:`AssetJobRunner`.
+
+    The optional *prepare* callable does the ftrack and disk work of the job
+    on a worker thread. It is given a session of its own to that thread and
+    returns the data passed on to *execute*. *execute* does the Unreal work
+    on the main thread, given the prepared data, None without *prepare*, and
+    returns a (status, result) tuple.
+    '''
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    FINISHED_STATES = (DONE, FAILED, CANCELLED)
+    '''States of jobs that will not change anymore'''
+
+    @property
+    def asset_info_id(self):
+        '''Return the id of the asset info of the job'''
+        return self.asset_info[asset_const.ASSET_INFO_ID]
+
+    @property
+    def finished(self):
+        '''Return True if the job is done, failed or cancelled'''
+        return self.state in self.FINISHED_STATES
+
+    @property
+    def cancel_requested(self):
+        '''Return True if the job has been asked to cancel'''
+        return self._cancel_requested
+
+    @property
+    def execution_time(self):
+        '''Return the number of seconds the job has been running for'''
+        if self.start_time is None:
+            return 0
+        return (self.end_time or time.time()) - self.start_time
+
+    def __init__(self, method, asset_info, options, execute, prepare=None):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.asset_info = asset_info
+        self.options = options
+        self.execute = execute
+        self.prepare = prepare
+        self.state = self.QUEUED
+        self.status = None
+        self.result = None
+        self.message = None
+        self.start_time = None
+        self.end_time = None
+        self._cancel_requested = False
+
+    def cancel(self):
+        '''
+        Ask the job to cancel, return False if its Unreal part has already
+        started and it cannot be cancelled anymore.
+        '''
+        if self.state != self.QUEUED:
+            return False
+        self._cancel_requested = True
+        return True
+
+    def to_dict(self):
+        '''Return a dictionary describing the job'''
+        return {
+            'job_id': self.id,
+            'method': self.method,
+            'asset_info_id': self.asset_info_id,
+            'state': self.state,
+            'status': self.status,
+            'result': self.result,
+            'message': self.message,
+            'execution_time': self.execution_time,
+        }
+
+
+class AssetJobRunner(object):
+    '''
+    Runs *jobs* in order, calling *on_job_changed* with the job and the
+    fraction of jobs finished whenever a job changes state.
+
+    The prepare parts of the jobs run ahead on a pool of worker threads,
+    overlapping with the execute parts which run one at a time on the main
+    thread. Each worker creates its own session with *session_factory*, as
+    sessions are not thread safe, closed once all jobs have run. Queued jobs
+    can be cancelled until their execute part starts.
+    '''
+
+    MAX_PREPARE_WORKERS = 4
+    '''Maximum number of jobs prepared at the same time'''
+
+    @property
+    def jobs(self):
+        '''Return the list of jobs'''
+        return list(self._jobs)
+
+    @property
+    def finished(self):
+        '''Return True if all jobs are finished'''
+        return all(job.finished for job in self._jobs)
+
+    @property
+    def progress(self):
+        '''Return the fraction of jobs finished'''
+        if not self._jobs:
+            return 1.0
+        finished_jobs = [job for job in self._jobs if job.finished]
+        return float(len(finished_jobs)) / len(self._jobs)
+
+    def __init__(self, jobs, on_job_changed=None, session_factory=None):
+        self._jobs = list(jobs)
+        self._on_job_changed = on_job_changed
+        self._session_factory = session_factory
+        self._sessions = []
+        self._local = threading.local()
+        self._thread = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def _set_state(self, job, state, status=None, result=None, message=None):
+        '''Move *job* to *state* and tell the listener.'''
+        job.state = state
+        if state == AssetJob.RUNNING:
+            job.start_time = time.time()
+        elif state in AssetJob.FINISHED_STATES:
+            job.end_time = time.time()
+            job.status = status
+            job.result = result
+            job.message = message
+        if self._on_job_changed:
+            try:
+                self._on_job_changed(job, self.progress)
+            except Exception as error:
+                logger.warning(
+                    'Could not report job {} change: {}'.format(job.id, error)
+                )
+
+    def _get_session(self):
+        '''Return the session of the calling worker thread, None if none.'''
+        if self._session_factory is None:
+            return None
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._session_factory()
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def _prepare(self, job):
+        '''Run the prepare part of *job* on a worker thread.'''
+        if job.cancel_requested:
+            return None
+        return job.prepare(self._get_session())
+
+    def start(self):
+        '''
+        Run the jobs in a background thread, leaving the main thread free to
+        run their Unreal parts. Jobs run in the calling thread if the main
+        thread dispatcher is not running.
+        '''
+        if self._thread is not None:
+            return
+        for job in self._jobs:
+            self._set_state(job, AssetJob.QUEUED)
+        if not unreal_utils.get_main_thread_dispatcher().running:
+            self._run()
+            return
+        self._thread = threading.Thread(
+            target=self._run, name='ftrack asset jobs'
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def cancel(self, job_ids=None):
+        '''
+        Cancel the queued jobs of *job_ids*, all jobs if not given. Returns
+        the list of jobs cancelled.
+        '''
+        cancelled = []
+        with self._lock:
+            for job in self._jobs:
+                if job_ids is not None and job.id not in job_ids:
+                    continue
+                if job.cancel():
+                    cancelled.append(job)
+        return cancelled
+
+    def wait(self, timeout=None):
+        '''Wait for all jobs to finish, return True if they have.'''
+        return self._done.wait(timeout)
+
+    def _run(self):
+        '''Run all jobs in order.'''
+        executor = ThreadPoolExecutor(max_workers=self.MAX_PREPARE_WORKERS)
+        try:
+            prepare_futures = [
+                executor.submit(self._prepare, job) if job.prepare else None
+                for job in self._jobs
+            ]
+            for job, prepare_future in zip(self._jobs, prepare_futures):
+                with self._lock:
+                    cancel_requested = job.cancel_requested
+                    if not cancel_requested:
+                        job.state = AssetJob.RUNNING
+                if cancel_requested:
+                    if prepare_future is not None:
+                        prepare_future.cancel()
+                    self._set_state(
+                        job,
+                        AssetJob.CANCELLED,
+                        status=core_constants.UNKNOWN_STATUS,
+                        message='Cancelled',
+                    )
+                    continue
+                self._set_state(job, AssetJob.RUNNING)
+                try:
+                    prepared = None
+                    if prepare_future is not None:
+                        prepared = prepare_future.result()
+                    status, result = unreal_utils.run_in_main_thread(
+                        job.execute
+                    )(prepared)
+                except Exception as error:
+                    message = 'Job {} on asset {} failed: {}'.format(
+                        job.method, job.asset_info_id, error
+                    )
+                    logger.error(message)
+                    self._set_state(
+                        job,
+                        AssetJob.FAILED,
+                        status=core_constants.ERROR_STATUS,
+                        message=message,
+                    )
+                    continue
+                if core_constants.status_bool_mapping[status]:
+                    self._set_state(
+                        job, AssetJob.DONE, status=status, result=result
+                    )
+                else:
+                    self._set_state(
+                        job, AssetJob.FAILED, status=status, result=result
+                    )
+        finally:
+            executor.shutdown(wait=True)
+            for session in self._sessions:
+                try:
+                    session.close()
+                except Exception as error:
+                    logger.debug(
+                        'Could not close job session: {}'.format(error)
+                    )
+            self._done.set()
@@ -3,6 +3,8 @@
 
 from ftrack_connect_pipeline.host.engine import PublisherEngine
 
+from ftrack_connect_pipeline_unreal import utils as unreal_utils
+
 
 class UnrealPublisherEngine(PublisherEngine):
     engine_type = 'publisher'
@@ -13,3 +15,13 @@ class UnrealPublisherEngine(PublisherEngine):
         super(UnrealPublisherEngine, self).__init__(
             event_manager, host_types, host_id, asset_type_name
         )
+
+    def run_definition(self, data):
+        '''
+        Run the definition *data*, then remove the files staged by its
+        exporters whether the publish succeeded or failed.
+        '''
+        try:
+            return super(UnrealPublisherEngine, self).run_definition(data)
+        finally:
+            unreal_utils.cleanup_staged_files()
@@ -0,0 +1,50 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import contextlib
+import sys
+import time
+
+# File locks shared between processes. Does not depend on Unreal so they can
+# be used by the launch hook as well.
+
+DEFAULT_LOCK_TIMEOUT = 10.0
+'''Seconds to wait for a file lock'''
+
+
+@contextlib.contextmanager
+def file_lock(path, timeout=DEFAULT_LOCK_TIMEOUT):
+    '''
+    Hold the exclusive lock of *path*, shared between processes, through the
+    lock file next to it. Raises an exception if the lock cannot be acquired
+    within *timeout* seconds.
+    '''
+    with open('{}.lock'.format(path), 'a+') as lock_file:
+        start_time = time.time()
+        while True:
+            try:
+                if sys.platform == 'win32':
+                    import msvcrt
+
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    import fcntl
+
+                    fcntl.flock(
+                        lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB
+                    )
+                break
+            except (IOError, OSError):
+                if time.time() - start_time > timeout:
+                    raise Exception(
+                        'Timed out waiting for lock on {}'.format(path)
+                    )
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if sys.platform == 'win32':
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -1,9 +1,57 @@
 # :coding: utf-8
 # :copyright: Copyright (c) 2014-2023 ftrack
+import logging
+
+logger = logging.getLogger(__name__)
 
 host = None
+'''Unreal host, set once the integration is loaded'''
+
+widget_names = {}
+'''Client widget names by menu entry, set once the integration is loaded'''
+
+integration_loader = None
+'''Callable loading the integration, set by the bootstrap at startup'''
+
+integration_error = None
+'''Message of the last failure to load the integration'''
+
+
+def is_integration_loaded():
+    '''Return True if the integration has been loaded.'''
+    return host is not None
+
+
+def load_integration():
+    '''
+    Load the integration through :data:`integration_loader` unless already
+    loaded. Returns True if the integration is loaded.
+    '''
+    if host is None and integration_loader is not None:
+        integration_loader()
+    return host is not None
+
+
+def show_error(message):
+    '''Show the error *message* to the user in an editor dialog.'''
+    import unreal
+
+    unreal.EditorDialog.show_message('ftrack', message, unreal.AppMsgType.OK)
 
 
-def launch_dialog(widget_name):
-    '''Send an event to open *widget_name* client.'''
-    host.launch_client(widget_name)
+def launch_dialog(menu_entry):
+    '''
+    Send an event to open the client of *menu_entry*, loading the
+    integration first if needed.
+    '''
+    if not load_integration():
+        message = (
+            'Cannot open {}, the ftrack integration could not be '
+            'loaded.'.format(menu_entry)
+        )
+        if integration_error:
+            message = '{}\n\n{}'.format(message, integration_error)
+        logger.error(message)
+        show_error(message)
+        return
+    host.launch_client(widget_names.get(menu_entry, menu_entry))
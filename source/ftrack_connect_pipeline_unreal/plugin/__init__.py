@@ -21,7 +21,10 @@ class UnrealBasePlugin(plugin.BasePlugin):
 
     @unreal_utils.run_in_main_thread
     def _run(self, event):
-        return super(UnrealBasePlugin, self)._run(event)
+        with unreal_utils.span(
+            'plugin.{}'.format(self.plugin_name), export=True
+        ):
+            return super(UnrealBasePlugin, self)._run(event)
 
 
 class UnrealBasePluginWidget(UnrealBasePlugin, pluginWidget.BasePluginWidget):
@@ -32,9 +32,11 @@ class UnrealLoaderImporterPlugin(
     dependency_load_mode = load_const.IMPORT_MODE
 
     @unreal_utils.run_in_main_thread
+    @unreal_utils.traced('importer.get_current_objects')
     def get_current_objects(self):
         return unreal_utils.get_current_scene_objects()
 
+    @unreal_utils.traced('importer.prepare_load_task')
     def prepare_load_task(self, context_data, data, options):
         '''Prepare loader import task based on *data* and *context_data*, using *options*.'''
 
@@ -71,24 +73,15 @@ class UnrealLoaderImporterPlugin(
         destination_name_base = context_data['asset_name'].replace(' ', '_')
 
         # Make sure we do not everwrite any existing asset
-        n = 1
-        while True:
-            destination_name = '{}{}'.format(
-                destination_name_base, '_{}'.format(n) if n > 1 else ''
-            )
-            path = unreal_utils.asset_path_to_filesystem_path(
-                '{}/{}'.format(self.task.destination_path, destination_name),
-                throw_on_error=False,
-            )
-            if path is None:
-                break
-            n += 1
-        self.task.destination_name = destination_name
+        self.task.destination_name = unreal_utils.allocate_asset_name(
+            self.task.destination_path, destination_name_base
+        )
 
         self.task.replace_existing = options.get('ReplaceExisting', True)
         self.task.automated = options.get('Automated', True)
         self.task.save = options.get('Save', True)
 
+    @unreal_utils.traced('importer.import_geometry')
     def import_geometry(self, rename_mesh=False, rename_mesh_prefix='S_'):
         '''
         Geometry import from prepared *task*, *component_path* with *options*.
@@ -107,6 +100,7 @@ class UnrealLoaderImporterPlugin(
 
         return result
 
+    @unreal_utils.traced('importer.import_rig')
     def import_rig(
         self,
         skeleton_name=False,
@@ -122,12 +116,7 @@ class UnrealLoaderImporterPlugin(
         '''
         # Rig specific options
         if skeleton_name:
-            skeletons = unreal_utils.get_assets_by_class('Skeleton')
-            skeleton_ad = None
-            for skeleton in skeletons:
-                if skeleton.asset_name == skeleton_name:
-                    skeleton_ad = skeleton
-
+            skeleton_ad = unreal_utils.get_skeletons().get(skeleton_name)
             if skeleton_ad is not None:
                 self.task.options.set_editor_property(
                     'skeleton', skeleton_ad.get_asset()
@@ -179,6 +168,7 @@ class UnrealLoaderImporterPlugin(
 
         return result
 
+    @unreal_utils.traced('importer.import_animation')
     def import_animation(
         self,
         skeleton_name=None,
@@ -190,12 +180,7 @@ class UnrealLoaderImporterPlugin(
         '''
         skeleton_name = skeleton_name
         if skeleton_name:
-            skeletons = unreal_utils.get_assets_by_class('Skeleton')
-            skeleton_ad = None
-            for skeleton in skeletons:
-                if skeleton.asset_name == skeleton_name:
-                    skeleton_ad = skeleton
-
+            skeleton_ad = unreal_utils.get_skeletons().get(skeleton_name)
             if skeleton_ad is not None:
                 self.task.options.set_editor_property(
                     'skeleton', skeleton_ad.get_asset()
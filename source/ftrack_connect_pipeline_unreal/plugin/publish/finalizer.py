@@ -1,7 +1,5 @@
 # :coding: utf-8
 # :copyright: Copyright (c) 2014-2023 ftrack
-import os
-import json
 from ftrack_connect_pipeline import plugin
 
 from ftrack_connect_pipeline_qt import plugin as pluginWidget
@@ -12,7 +10,6 @@ from ftrack_connect_pipeline_unreal.plugin import (
 )
 
 from ftrack_connect_pipeline_unreal import utils as unreal_utils
-import ftrack_connect_pipeline_unreal.constants as unreal_constants
 from ftrack_connect_pipeline_unreal.constants import asset as asset_const
 
 
@@ -28,6 +25,66 @@ class UnrealPublisherFinalizerPlugin(
         current asset
     '''
 
+    QUERY_CHUNK_SIZE = 100
+    '''Maximum number of asset versions resolved per query'''
+
+    def collect_version_dependencies(self):
+        '''
+        Return the asset versions of all assets tracked in the project, in
+        order and without duplicates, resolved with as few queries as
+        possible.
+        '''
+        # Collect the unique version ids of all tracked assets, in order
+        dependency_version_ids = []
+        unique_version_ids = set()
+        ftrack_node_store = unreal_utils.get_ftrack_node_store()
+        for unused_name, param_dict in ftrack_node_store.items():
+            dependency_version_id = param_dict.get(asset_const.VERSION_ID)
+            if (
+                dependency_version_id
+                and dependency_version_id not in unique_version_ids
+            ):
+                self.logger.debug(
+                    'Adding dependency_asset_version_id: {}'.format(
+                        dependency_version_id
+                    )
+                )
+                unique_version_ids.add(dependency_version_id)
+                dependency_version_ids.append(dependency_version_id)
+
+        # Resolve them with as few queries as possible
+        dependency_versions = {}
+        for index in range(
+            0, len(dependency_version_ids), self.QUERY_CHUNK_SIZE
+        ):
+            chunk = dependency_version_ids[
+                index : index + self.QUERY_CHUNK_SIZE
+            ]
+            with unreal_utils.span(
+                'ftrack.query_dependencies', versions=len(chunk)
+            ):
+                for dependency_version in self.session.query(
+                    'select version from AssetVersion where id in ({})'.format(
+                        ','.join('"{}"'.format(v_id) for v_id in chunk)
+                    )
+                ).all():
+                    dependency_versions[
+                        dependency_version['id']
+                    ] = dependency_version
+
+        version_dependencies = []
+        for dependency_version_id in dependency_version_ids:
+            dependency_version = dependency_versions.get(dependency_version_id)
+            if dependency_version is None:
+                self.logger.warning(
+                    'Dependency asset version not found: {}'.format(
+                        dependency_version_id
+                    )
+                )
+                continue
+            version_dependencies.append(dependency_version)
+        return version_dependencies
+
     def _run(self, event):
         '''Run the current plugin with the settings form the *event*.
 
@@ -37,30 +94,7 @@ class UnrealPublisherFinalizerPlugin(
            committed in the finalizer plugin itself. This way we avoid
            publishing the dependencies if the plugin fails.
         '''
-        self.version_dependencies = []
-        ftrack_asset_nodes = unreal_utils.get_ftrack_nodes()
-        for dcc_object_node_name in ftrack_asset_nodes:
-            ftrack_file_path = os.path.join(
-                unreal_constants.FTRACK_ROOT_PATH,
-                "{}.json".format(dcc_object_node_name),
-            )
-            with open(ftrack_file_path, 'r') as openfile:
-                param_dict = json.load(openfile)
-            dependency_version_id = param_dict.get(asset_const.VERSION_ID)
-            self.logger.debug(
-                'Adding dependency_asset_version_id: {}'.format(
-                    dependency_version_id
-                )
-            )
-            if dependency_version_id:
-                dependency_version = self.session.query(
-                    'select version from AssetVersion where id is "{}"'.format(
-                        dependency_version_id
-                    )
-                ).one()
-
-                if dependency_version not in self.version_dependencies:
-                    self.version_dependencies.append(dependency_version)
+        self.version_dependencies = self.collect_version_dependencies()
 
         super_result = super(UnrealPublisherFinalizerPlugin, self)._run(event)
 
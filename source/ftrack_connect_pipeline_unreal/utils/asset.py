@@ -1,43 +1,287 @@
 # :coding: utf-8
 # :copyright: Copyright (c) 2014-2023 ftrack
+import logging
 import os
+import threading
+import time
 
 import unreal
 
 import ftrack_connect_pipeline_unreal.constants as unreal_constants
+from ftrack_connect_pipeline_unreal.utils.registry import (
+    get_project_asset_snapshot,
+    get_registry_generation,
+    invalidate_project_assets,
+    is_registry_cache_current,
+)
+from ftrack_connect_pipeline_unreal.utils.trace import traced
+
+logger = logging.getLogger(__name__)
+
+ENGINE_CLASS_PACKAGE = '/Script/Engine'
+'''Package of the Unreal classes given by name only'''
+
+_assets_by_class = {}
+_reserved_asset_names = set()
+_reserved_asset_names_lock = threading.Lock()
+
+
+class AssetPathResolver(object):
+    '''
+    Resolves Unreal asset paths to the files on disk below the content
+    folder *root_content_dir*, memoising the file extension of each asset
+    path resolved. Memoised extensions are forgotten when the asset registry
+    changes, or explicitly when assets are renamed or deleted, see
+    :meth:`forget`.
+    '''
+
+    EXTENSIONS = ['', '.uasset', '.umap']
+    '''File extensions probed, in order'''
+
+    @property
+    def content_root(self):
+        '''Return the content folder on disk'''
+        return self._content_root
+
+    def __init__(self, root_content_dir):
+        '''Initialise the resolver of the content folder *root_content_dir*'''
+        self._content_root = root_content_dir.replace('/', os.sep)
+        self._extensions = {}
+        self._generation = None
+        self._created = None
+
+    def _sync(self):
+        '''Forget memoised extensions if the asset registry has changed.'''
+        if self._generation is None or not is_registry_cache_current(
+            self._generation, self._created
+        ):
+            self._extensions.clear()
+            self._generation = get_registry_generation()
+            self._created = time.time()
+
+    def base_path(self, asset_path):
+        '''
+        Return the path on disk of *asset_path*, excluding the file
+        extension.
+        '''
+        if asset_path.lower().startswith(
+            unreal_constants.GAME_ROOT_PATH.lower()
+        ):
+            asset_path = asset_path[
+                len(unreal_constants.GAME_ROOT_PATH) + 1 :
+            ]  # Remove /Game/ prefix
+        asset_path = asset_path.replace('/', os.sep)  # Align to platform
+        content_folder, asset_filename = os.path.split(asset_path)
+        asset_filename = os.path.splitext(asset_filename)[0]  # No extension
+        return os.path.join(self._content_root, content_folder, asset_filename)
+
+    def _package_filename(self, asset_path, base_path):
+        '''
+        Return the file of the package *asset_path* as known by Unreal, if
+        loaded and below the content folder.
+        '''
+        find_object = getattr(unreal, 'find_object', None)
+        if find_object is None:
+            return None
+        try:
+            asset = find_object(None, asset_path)
+        except Exception:
+            return None
+        if asset is None:
+            return None
+        filename = unreal.SystemLibrary.get_system_path(asset)
+        if not filename:
+            return None
+        filename = os.path.normpath(filename)
+        if os.path.splitext(filename)[0] != os.path.normpath(base_path):
+            return None
+        return filename
+
+    def resolve(self, asset_path, throw_on_error=True):
+        '''
+        Converts *asset_path* to a full absolute asset filesystem path, raise
+        an exception if the file cannot be found and *throw_on_error* is
+        True, otherwise return None.
+        '''
+        self._sync()
+        path = self.base_path(asset_path)
+        ext = self._extensions.get(path)
+        if ext is not None:
+            return '{}{}'.format(path, ext)
+        filename = self._package_filename(asset_path, path)
+        if filename and os.path.exists(filename):
+            self._extensions[path] = filename[len(path) :]
+            return filename
+        # Probe our way to finding out the extension as we can't tell from
+        # the asset path
+        for ext in self.EXTENSIONS:
+            result = '{}{}'.format(path, ext)
+            if os.path.exists(result):
+                self._extensions[path] = ext
+                return result
+        if throw_on_error:
+            raise Exception(
+                'Could not determine asset "{}" files extension on '
+                'disk!'.format(path)
+            )
+        return None
+
+    def resolve_many(self, asset_paths):
+        '''
+        Resolve *asset_paths* in bulk, reading each content folder involved
+        once. Returns a dictionary of asset path to filesystem path, None if
+        the file could not be found.
+        '''
+        self._sync()
+        result = {}
+        unresolved = {}
+        for asset_path in asset_paths:
+            path = self.base_path(asset_path)
+            ext = self._extensions.get(path)
+            if ext is not None:
+                result[asset_path] = '{}{}'.format(path, ext)
+            else:
+                folder, filename = os.path.split(path)
+                unresolved.setdefault(folder, {})[filename] = asset_path
+        for folder, asset_paths_by_filename in unresolved.items():
+            filenames = set()
+            if os.path.isdir(folder):
+                filenames = set(entry.name for entry in os.scandir(folder))
+            for filename, asset_path in asset_paths_by_filename.items():
+                result[asset_path] = None
+                for ext in self.EXTENSIONS:
+                    if '{}{}'.format(filename, ext) in filenames:
+                        path = os.path.join(folder, filename)
+                        self._extensions[path] = ext
+                        result[asset_path] = '{}{}'.format(path, ext)
+                        break
+        return result
+
+    def forget(self, asset_paths):
+        '''Forget the memoised extensions of *asset_paths*.'''
+        for asset_path in asset_paths:
+            self._extensions.pop(self.base_path(asset_path), None)
+
+    def clear(self):
+        '''Forget all memoised extensions.'''
+        self._extensions.clear()
+
+
+_asset_path_resolvers = {}
+
+
+def get_asset_path_resolver(root_content_dir=None):
+    '''
+    Return the :class:`AssetPathResolver` of the content folder
+    *root_content_dir*, the project content folder if not given.
+    '''
+    if root_content_dir is None:
+        if None not in _asset_path_resolvers:
+            _asset_path_resolvers[None] = AssetPathResolver(
+                unreal.SystemLibrary.get_project_content_directory()
+            )
+        return _asset_path_resolvers[None]
+    if root_content_dir not in _asset_path_resolvers:
+        _asset_path_resolvers[root_content_dir] = AssetPathResolver(
+            root_content_dir
+        )
+    return _asset_path_resolvers[root_content_dir]
+
+
+def forget_asset_paths(asset_paths):
+    '''
+    Forget the memoised filesystem paths of *asset_paths*, after they have
+    been renamed or deleted.
+    '''
+    for resolver in _asset_path_resolvers.values():
+        resolver.forget(asset_paths)
 
 
 def asset_path_to_filesystem_path(
     asset_path, root_content_dir=None, throw_on_error=True
 ):
     '''Converts *asset_path* to a full absolute asset filesystem path. Use the provided *root_content_dir*.'''
-    if root_content_dir is None:
-        root_content_dir = (
-            unreal.SystemLibrary.get_project_content_directory().replace(
-                '/', os.sep
+    return get_asset_path_resolver(root_content_dir).resolve(
+        asset_path, throw_on_error=throw_on_error
+    )
+
+
+def _name_index(name, base_name):
+    '''
+    Return the index of *name* as allocated by :func:`allocate_asset_name`
+    from *base_name*, 1 for the base name itself, or None.
+    '''
+    name = name.lower()
+    base_name = base_name.lower()
+    if name == base_name:
+        return 1
+    if name.startswith('{}_'.format(base_name)):
+        suffix = name[len(base_name) + 1 :]
+        if suffix.isdigit() and int(suffix) > 1:
+            return int(suffix)
+    return None
+
+
+def allocate_asset_name(destination_path, base_name, root_content_dir=None):
+    '''
+    Return an asset name free in the content folder *destination_path*,
+    *base_name* or *base_name* with the first free "_<n>" suffix. The folder
+    is read once, from the project asset listing and the files on disk, use
+    the provided *root_content_dir*. Within a
+    :func:`~ftrack_connect_pipeline_unreal.utils.file.batch_import` block
+    the name is reserved until the block exits, so it is not handed out to
+    another import of the batch.
+    '''
+    from ftrack_connect_pipeline_unreal.utils.file import in_batch_import
+
+    destination_path = destination_path.rstrip('/')
+    indices = set()
+    # Assets known to Unreal
+    for asset_path in get_project_asset_snapshot().starting_with(
+        '{}/{}'.format(destination_path, base_name)
+    ):
+        package_path, asset_name = asset_path.rsplit('/', 1)
+        if package_path == destination_path:
+            indices.add(_name_index(asset_name.split('.', 1)[0], base_name))
+    # Files on disk not (yet) known to the asset registry
+    root_content_dir = get_asset_path_resolver(root_content_dir).content_root
+    content_folder = destination_path
+    if content_folder.lower().startswith(
+        unreal_constants.GAME_ROOT_PATH.lower()
+    ):
+        content_folder = content_folder[len(unreal_constants.GAME_ROOT_PATH) :]
+    content_folder = os.path.join(
+        root_content_dir, content_folder.lstrip('/').replace('/', os.sep)
+    )
+    if os.path.isdir(content_folder):
+        for entry in os.scandir(content_folder):
+            indices.add(
+                _name_index(os.path.splitext(entry.name)[0], base_name)
             )
+    # Names handed out earlier, that might not be imported yet, checked and
+    # reserved in one go as imports can run from several threads
+    with _reserved_asset_names_lock:
+        for reserved_path in _reserved_asset_names:
+            package_path, asset_name = reserved_path.rsplit('/', 1)
+            if package_path == destination_path.lower():
+                indices.add(_name_index(asset_name, base_name))
+        index = 1
+        while index in indices:
+            index += 1
+        destination_name = '{}{}'.format(
+            base_name, '_{}'.format(index) if index > 1 else ''
         )
-    if asset_path.lower().startswith(unreal_constants.GAME_ROOT_PATH.lower()):
-        asset_path = asset_path[
-            len(unreal_constants.GAME_ROOT_PATH) + 1 :
-        ]  # Remove /Game/ prefix
-    asset_path = asset_path.replace('/', os.sep)  # Align to platform
-    content_folder, asset_filename = os.path.split(asset_path)
-    asset_filename = os.path.splitext(asset_filename)[0]  # Remove extension
-    path = os.path.join(root_content_dir, content_folder, asset_filename)
-    # Probe our way to finding out the extension as we can't tell from the asset path
-    for ext in ['', '.uasset', '.umap']:
-        result = '{}{}'.format(path, ext)
-        if os.path.exists(result):
-            return result
-    if throw_on_error:
-        raise Exception(
-            'Could not determine asset "{}" files extension on disk!'.format(
-                path
+        if in_batch_import():
+            _reserved_asset_names.add(
+                '{}/{}'.format(destination_path, destination_name).lower()
             )
-        )
-    else:
-        return None
+    return destination_name
+
+
+def release_asset_names():
+    '''Release all asset names reserved by :func:`allocate_asset_name`.'''
+    with _reserved_asset_names_lock:
+        _reserved_asset_names.clear()
 
 
 def get_asset_by_path(node_name):
@@ -53,10 +297,81 @@ def get_asset_by_path(node_name):
     return None
 
 
+def _query_assets_by_class(class_name):
+    '''
+    Query the asset registry for the assets of class *class_name*, either a
+    class name or a "/Script/Package.Class" class path, using the native
+    class filter.
+    '''
+    asset_registry = unreal.AssetRegistryHelpers.get_asset_registry()
+    if '.' in class_name:
+        class_package, class_name = class_name.rsplit('.', 1)
+    else:
+        class_package = ENGINE_CLASS_PACKAGE
+    if hasattr(unreal, 'TopLevelAssetPath'):
+        # Unreal 5.1 and later identify classes by path
+        return asset_registry.get_assets_by_class(
+            unreal.TopLevelAssetPath(class_package, class_name)
+        )
+    return asset_registry.get_assets_by_class(class_name)
+
+
 def get_assets_by_class(class_name):
-    '''Get all assets of a given Unreal class named *class_name*'''
-    return [
-        asset
-        for asset in unreal.AssetRegistryHelpers.get_asset_registry().get_all_assets()
-        if asset.get_class().get_name() == class_name
-    ]
+    '''
+    Get all assets of a given Unreal class named *class_name*, cached until
+    the asset registry changes.
+    '''
+    generation, created, assets = _assets_by_class.get(
+        class_name, (None, None, None)
+    )
+    if assets is None or not is_registry_cache_current(generation, created):
+        generation = get_registry_generation()
+        created = time.time()
+        try:
+            assets = list(_query_assets_by_class(class_name))
+        except Exception as error:
+            logger.debug(
+                'Native class query of {} failed ({}), scanning all '
+                'assets'.format(class_name, error)
+            )
+            class_name_only = class_name.rsplit('.', 1)[-1]
+            assets = [
+                asset
+                for asset in unreal.AssetRegistryHelpers.get_asset_registry().get_all_assets()
+                if asset.get_class().get_name() == class_name_only
+            ]
+        _assets_by_class[class_name] = (generation, created, assets)
+    return list(assets)
+
+
+def get_skeletons():
+    '''
+    Return a dictionary of the skeleton assets in the project, asset name to
+    asset data.
+    '''
+    return dict(
+        (str(skeleton.asset_name), skeleton)
+        for skeleton in get_assets_by_class('Skeleton')
+    )
+
+
+@traced('asset.fixup_redirectors')
+def fixup_redirectors(asset_paths):
+    '''
+    Fix up references to the redirectors left at *asset_paths*, for example
+    by consolidate, and remove them. Returns the number of redirectors found.
+    '''
+    asset_registry = unreal.AssetRegistryHelpers.get_asset_registry()
+    redirectors = []
+    for asset_path in asset_paths:
+        for asset_data in asset_registry.get_assets_by_package_name(
+            os.path.splitext(asset_path)[0]
+        ):
+            if asset_data.get_class().get_name() == 'ObjectRedirector':
+                redirectors.append(asset_data.get_asset())
+    if redirectors:
+        unreal.AssetToolsHelpers.get_asset_tools().fixup_referencers(
+            redirectors
+        )
+        invalidate_project_assets()
+    return len(redirectors)
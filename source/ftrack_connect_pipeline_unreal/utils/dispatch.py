@@ -0,0 +1,194 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import collections
+import logging
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from functools import wraps
+
+import unreal
+
+logger = logging.getLogger(__name__)
+
+MAIN_THREAD_TIMEOUT = 30.0
+'''Seconds a worker thread waits for a queued call to start on the main
+thread before giving up on it'''
+
+
+def is_main_thread():
+    '''Return True if called from the main Unreal (game) thread.'''
+    return threading.current_thread() is threading.main_thread()
+
+
+class MainThreadDispatcher(object):
+    '''
+    Runs functions submitted from any thread on the main Unreal thread.
+
+    Calls submitted from other threads are queued and run by a Slate post
+    tick callback, for at most :attr:`TICK_BUDGET` seconds per tick so the
+    editor stays responsive. Callers get a
+    :class:`concurrent.futures.Future` of the result. Calls submitted from
+    the main thread, or before the dispatcher is started, run immediately.
+
+    .. note::
+
+        A worker thread waiting on a future deadlocks if the main thread is
+        itself waiting on that worker, run blocking waits in workers only.
+    '''
+
+    TICK_BUDGET = 0.02
+    '''Maximum number of seconds spent running queued calls per tick'''
+
+    @property
+    def running(self):
+        '''Return True if the queue is drained on each Slate tick'''
+        return self._tick_handle is not None
+
+    @property
+    def pending(self):
+        '''Return the number of queued calls not run yet'''
+        return len(self._queue)
+
+    def __init__(self):
+        self._queue = collections.deque()
+        self._tick_handle = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        '''
+        Start draining the queue on each Slate tick, must be called from the
+        main thread.
+        '''
+        if not is_main_thread():
+            raise Exception(
+                'The main thread dispatcher must be started from the main '
+                'thread!'
+            )
+        with self._lock:
+            if self._tick_handle is not None:
+                return
+            self._tick_handle = unreal.register_slate_post_tick_callback(
+                self._on_tick
+            )
+        logger.debug('Main thread dispatcher started')
+
+    def stop(self):
+        '''
+        Stop draining the queue on Slate ticks, run pending calls now. Calls
+        submitted from now on run in the calling thread.
+        '''
+        with self._lock:
+            if self._tick_handle is None:
+                return
+            unreal.unregister_slate_post_tick_callback(self._tick_handle)
+            self._tick_handle = None
+        # Nothing is queued once stopped, drain what was queued before
+        self.process()
+        logger.debug('Main thread dispatcher stopped')
+
+    def submit(self, function, *args, **kwargs):
+        '''
+        Run *function* with *args* and *kwargs* on the main thread, return a
+        :class:`~concurrent.futures.Future` of the result.
+        '''
+        future = Future()
+        if is_main_thread():
+            self._execute(future, function, args, kwargs)
+            return future
+        with self._lock:
+            # Queued only while started, so stop() drains everything queued
+            queued = self._tick_handle is not None
+            if queued:
+                self._queue.append((future, function, args, kwargs))
+        if not queued:
+            # Nothing drains the queue, run in the calling thread
+            logger.debug(
+                'Main thread dispatcher not started, running {} in '
+                'thread {}'.format(
+                    getattr(function, '__name__', function),
+                    threading.current_thread().name,
+                )
+            )
+            self._execute(future, function, args, kwargs)
+        return future
+
+    def _execute(self, future, function, args, kwargs):
+        '''Run *function*, store the result or exception in *future*.'''
+        if not future.set_running_or_notify_cancel():
+            return  # Cancelled while queued
+        try:
+            result = function(*args, **kwargs)
+        except Exception as error:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def process(self, budget=None):
+        '''
+        Run queued calls in order, for at most *budget* seconds if given.
+        Returns the number of calls run.
+        '''
+        deadline = None if budget is None else time.time() + budget
+        count = 0
+        while self._queue:
+            try:
+                future, function, args, kwargs = self._queue.popleft()
+            except IndexError:
+                break
+            self._execute(future, function, args, kwargs)
+            count += 1
+            if deadline is not None and time.time() >= deadline:
+                break
+        return count
+
+    def _on_tick(self, delta_seconds):
+        '''Slate post tick callback, run queued calls.'''
+        if self._queue:
+            self.process(self.TICK_BUDGET)
+
+
+_main_thread_dispatcher = None
+
+
+def get_main_thread_dispatcher():
+    '''Return the shared :class:`MainThreadDispatcher`.'''
+    global _main_thread_dispatcher
+    if _main_thread_dispatcher is None:
+        _main_thread_dispatcher = MainThreadDispatcher()
+    return _main_thread_dispatcher
+
+
+def submit_to_main_thread(f, *args, **kwargs):
+    '''
+    Run *f* with *args* and *kwargs* on the main Unreal thread, return a
+    :class:`~concurrent.futures.Future` of the result.
+    '''
+    return get_main_thread_dispatcher().submit(f, *args, **kwargs)
+
+
+def run_in_main_thread(f):
+    '''
+    Make sure a function runs in the main Unreal thread. Calls from other
+    threads are queued to the main thread and wait for the result. Raises an
+    exception if the call has not started within :const:`MAIN_THREAD_TIMEOUT`
+    seconds, the call is then cancelled.
+    '''
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if is_main_thread():
+            return f(*args, **kwargs)
+        future = submit_to_main_thread(f, *args, **kwargs)
+        try:
+            return future.result(timeout=MAIN_THREAD_TIMEOUT)
+        except TimeoutError:
+            if future.cancel():
+                raise Exception(
+                    'Timed out waiting for the main thread to run {}, '
+                    'is the editor busy?'.format(getattr(f, '__name__', f))
+                )
+        # Already running on the main thread, wait for it to finish
+        return future.result()
+
+    return decorated
@@ -1,16 +1,112 @@
 # :coding: utf-8
 # :copyright: Copyright (c) 2014-2023 ftrack
+import contextlib
+import threading
 
 import unreal
 
+from ftrack_connect_pipeline_unreal.utils.registry import (
+    invalidate_project_assets,
+)
+from ftrack_connect_pipeline_unreal.utils.asset import release_asset_names
+from ftrack_connect_pipeline_unreal.utils.trace import span
+
+_import_batch_depth = 0
+_pending_saves = []
+# Guards the batch state, imports can be run from the client worker threads
+_batch_lock = threading.RLock()
+
+
+@contextlib.contextmanager
+def batch_import():
+    '''
+    Defer saving of assets imported and connected within the block, they are
+    saved in one go when the outermost block exits. Imports are not deferred,
+    each import within the block still runs right away.
+    '''
+    global _import_batch_depth
+    with _batch_lock:
+        _import_batch_depth += 1
+    try:
+        yield
+    finally:
+        with _batch_lock:
+            _import_batch_depth -= 1
+            if _import_batch_depth == 0:
+                release_asset_names()
+                save_pending_nodes()
+
+
+def in_batch_import():
+    '''Return True if within a :func:`batch_import` block'''
+    return _import_batch_depth > 0
+
+
+def save_node(node_name):
+    '''Save asset *node_name*, deferred if within a :func:`batch_import`'''
+    with _batch_lock:
+        if _import_batch_depth > 0:
+            if node_name not in _pending_saves:
+                _pending_saves.append(node_name)
+            return True
+    with span('file.save', assets=1):
+        return unreal.EditorAssetLibrary.save_asset(node_name)
+
+
+def rename_pending_save(node_name, new_node_name):
+    '''Make a deferred save of *node_name* follow it to *new_node_name*'''
+    with _batch_lock:
+        if node_name in _pending_saves:
+            _pending_saves[_pending_saves.index(node_name)] = new_node_name
+
+
+def save_pending_nodes():
+    '''Save all assets whose save has been deferred, in a single call.'''
+    with _batch_lock:
+        node_names = list(_pending_saves)
+        del _pending_saves[:]
+    assets = []
+    for node_name in node_names:
+        if unreal.EditorAssetLibrary.does_asset_exist(node_name):
+            assets.append(unreal.EditorAssetLibrary.load_asset(node_name))
+    if assets:
+        with span('file.save', assets=len(assets)):
+            unreal.EditorAssetLibrary.save_loaded_assets(
+                assets, only_if_is_dirty=False
+            )
+
+
+def import_files(asset_import_tasks):
+    '''
+    Native import files function, importing all the unreal.AssetImportTask()
+    given in *asset_import_tasks* in one call. Returns a list holding the list
+    of imported object paths of each task.
+    '''
+    if _import_batch_depth > 0:
+        for asset_import_task in asset_import_tasks:
+            if asset_import_task.save:
+                # Saved at the end of the batch instead
+                asset_import_task.save = False
+    with span('file.import', tasks=len(asset_import_tasks)):
+        unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks(
+            asset_import_tasks
+        )
+    # Import might create more assets than reported, list the project again
+    invalidate_project_assets()
+    result = []
+    for asset_import_task in asset_import_tasks:
+        imported_object_paths = [
+            str(object_path)
+            for object_path in asset_import_task.imported_object_paths or []
+        ]
+        if _import_batch_depth > 0:
+            for object_path in imported_object_paths:
+                save_node(object_path)
+        result.append(imported_object_paths)
+    return result
+
 
 def import_file(asset_import_task):
     '''Native import file function using the object unreal.AssetImportTask() given as *asset_import_task*'''
-    unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks(
-        [asset_import_task]
-    )
-    return (
-        asset_import_task.imported_object_paths[0]
-        if len(asset_import_task.imported_object_paths or []) > 0
-        else None
-    )
+    imported_object_paths = import_files([asset_import_task])[0]
+    return imported_object_paths[0] if imported_object_paths else None
@@ -0,0 +1,505 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import collections
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import unreal
+
+import clique
+
+import ftrack_connect_pipeline_unreal.constants as unreal_constants
+from ftrack_connect_pipeline_unreal.checksum import (
+    checksum_file,
+    checksum_frame,
+)
+
+logger = logging.getLogger(__name__)
+
+# Image sequence and movie operations
+
+DEFAULT_FRAME_RATE = 24.0
+'''Frame rate used when none is given and none is set in the environment'''
+
+MIN_SEGMENT_FRAMES = 25
+'''Minimum number of frames encoded by each encoder process'''
+
+MAX_IO_WORKERS = 8
+'''Default maximum number of frames read concurrently'''
+
+
+MANIFEST_VERSION = 1
+'''Version of the image sequence manifest format'''
+
+HEADER_READ_SIZE = 64 * 1024
+'''Number of bytes read from the start of an image to parse its header'''
+
+EXR_LINES_PER_CHUNK = {
+    0: 1,  # NONE
+    1: 1,  # RLE
+    2: 1,  # ZIPS
+    3: 16,  # ZIP
+    4: 32,  # PIZ
+    5: 16,  # PXR24
+    6: 32,  # B44
+    7: 32,  # B44A
+    8: 32,  # DWAA
+    9: 256,  # DWAB
+}
+'''Number of scan lines stored per chunk for each EXR compression'''
+
+
+def get_ffmpeg_path():
+    '''
+    Return the path to the ffmpeg (or compatible) executable, as set by the
+    :const:`~ftrack_connect_pipeline_unreal.constants.FFMPEG_PATH_ENV`
+    environment variable or found on the PATH.
+    '''
+    ffmpeg_path = os.environ.get(
+        unreal_constants.FFMPEG_PATH_ENV
+    ) or shutil.which('ffmpeg')
+    if not ffmpeg_path:
+        raise Exception(
+            'Could not find ffmpeg, install it or point {} to it!'.format(
+                unreal_constants.FFMPEG_PATH_ENV
+            )
+        )
+    return ffmpeg_path
+
+
+def get_frame_rate():
+    '''Return the frame rate of the current context, from the environment'''
+    try:
+        return float(os.environ.get('FPS', DEFAULT_FRAME_RATE))
+    except ValueError:
+        return DEFAULT_FRAME_RATE
+
+
+def parse_image_sequence(image_sequence_path):
+    '''
+    Return the :class:`clique.Collection` of *image_sequence_path*, on the
+    "prefix.%04d.ext [first-last]" form.
+    '''
+    return clique.parse(image_sequence_path)
+
+
+def _segment_frames(collection, max_segments):
+    '''
+    Split the frames of *collection* into at most about *max_segments*
+    segments of consecutive frames, return a list of (first frame, frame
+    count). Holes in the sequence always split segments.
+    '''
+    frame_count = len(collection.indexes)
+    segment_size = max(
+        MIN_SEGMENT_FRAMES, -(-frame_count // max(1, max_segments))
+    )
+    segments = []
+    for sub_collection in collection.separate():
+        indexes = sorted(sub_collection.indexes)
+        for index in range(0, len(indexes), segment_size):
+            segment = indexes[index : index + segment_size]
+            segments.append((segment[0], len(segment)))
+    return segments
+
+
+def _run_encoder(command):
+    '''Run the encoder *command*, raise an exception if it fails.'''
+    process = subprocess.run(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    if process.returncode != 0:
+        raise Exception(
+            'Encoding failed ({}): {}'.format(
+                process.returncode,
+                process.stderr.decode('utf-8', 'replace').strip()[-2000:],
+            )
+        )
+
+
+def encode_image_sequence(
+    image_sequence_path,
+    movie_path,
+    frame_rate=None,
+    max_workers=None,
+    ffmpeg_path=None,
+):
+    '''
+    Encode the image sequence *image_sequence_path* to the H.264 movie
+    *movie_path* at *frame_rate* (the context frame rate if not given).
+
+    The sequence is split into segments encoded by up to *max_workers*
+    encoder processes in parallel (one per core if not given), then joined
+    without re-encoding. Frames are streamed from disk by the encoder, so
+    memory use does not depend on the sequence length. *ffmpeg_path* can
+    point to any ffmpeg compatible executable.
+    '''
+    collection = parse_image_sequence(image_sequence_path)
+    if not collection.indexes:
+        raise Exception(
+            'No frames found in image sequence: {}'.format(image_sequence_path)
+        )
+    if collection.holes().indexes:
+        logger.warning(
+            'Image sequence {} has missing frames, they are skipped in '
+            'the movie.'.format(image_sequence_path)
+        )
+    ffmpeg_path = ffmpeg_path or get_ffmpeg_path()
+    frame_rate = frame_rate or get_frame_rate()
+    cpu_count = os.cpu_count() or 1
+    max_workers = max_workers or cpu_count
+    segments = _segment_frames(collection, max_workers)
+    workers = min(max_workers, len(segments))
+
+    input_pattern = collection.format('{head}{padding}{tail}')
+    input_options = ['-framerate', str(frame_rate)]
+    if collection.tail.lower().endswith('.exr'):
+        # Display linear renders in sRGB
+        input_options += ['-apply_trc', 'iec61966_2_1']
+    output_options = [
+        '-c:v',
+        'libx264',
+        '-preset',
+        'fast',
+        '-crf',
+        '18',
+        '-pix_fmt',
+        'yuv420p',
+        # H.264 needs even dimensions
+        '-vf',
+        'scale=trunc(iw/2)*2:trunc(ih/2)*2',
+        '-threads',
+        str(max(1, cpu_count // workers)),
+    ]
+
+    def segment_command(first_frame, frame_count, output_path):
+        return (
+            [ffmpeg_path, '-y', '-nostdin', '-loglevel', 'error']
+            + input_options
+            + ['-start_number', str(first_frame), '-i', input_pattern]
+            + ['-frames:v', str(frame_count)]
+            + output_options
+            + [output_path]
+        )
+
+    logger.debug(
+        'Encoding {} frame(s) of {} to {} in {} segment(s)'.format(
+            len(collection.indexes),
+            image_sequence_path,
+            movie_path,
+            len(segments),
+        )
+    )
+    if len(segments) == 1:
+        first_frame, frame_count = segments[0]
+        _run_encoder(segment_command(first_frame, frame_count, movie_path))
+        return movie_path
+
+    temp_folder = tempfile.mkdtemp(prefix='ftrack_encode_')
+    try:
+        segment_paths = [
+            os.path.join(temp_folder, 'segment_{:04d}.mp4'.format(index))
+            for index in range(len(segments))
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _run_encoder,
+                    segment_command(first_frame, frame_count, segment_path),
+                )
+                for (first_frame, frame_count), segment_path in zip(
+                    segments, segment_paths
+                )
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        # Join the segments
+        list_path = os.path.join(temp_folder, 'segments.txt')
+        with open(list_path, 'w') as f:
+            for segment_path in segment_paths:
+                f.write("file '{}'\n".format(segment_path.replace('\\', '/')))
+        _run_encoder(
+            [ffmpeg_path, '-y', '-nostdin', '-loglevel', 'error']
+            + ['-f', 'concat', '-safe', '0', '-i', list_path]
+            + ['-c', 'copy', movie_path]
+        )
+    finally:
+        shutil.rmtree(temp_folder, ignore_errors=True)
+    return movie_path
+
+
+class IncompleteHeaderError(ValueError):
+    '''Raised by the header readers when the header extends past the data'''
+
+
+def _read_exr_header(path, data, file_size):
+    '''Return the header of the OpenEXR image *path* starting with *data*'''
+    if data[:4] != b'\x76\x2f\x31\x01':
+        raise Exception('Not an OpenEXR image')
+    flags = struct.unpack('<I', data[4:8])[0]
+    attributes = {}
+    position = 8
+    while True:
+        end = data.index(b'\0', position)
+        name = data[position:end].decode('ascii')
+        position = end + 1
+        if not name:
+            break
+        end = data.index(b'\0', position)
+        position = end + 1
+        size = struct.unpack('<i', data[position : position + 4])[0]
+        position += 4
+        attributes[name] = data[position : position + size]
+        if len(attributes[name]) < size:
+            if len(data) < file_size:
+                raise IncompleteHeaderError('Header exceeds data read')
+            raise Exception('Truncated header')
+        position += size
+    x_min, y_min, x_max, y_max = struct.unpack('<4i', attributes['dataWindow'])
+    channels = []
+    channel_list = attributes['channels']
+    index = 0
+    while channel_list[index : index + 1] not in (b'\0', b''):
+        end = channel_list.index(b'\0', index)
+        pixel_type = struct.unpack('<i', channel_list[end + 1 : end + 5])[0]
+        channels.append(
+            '{}:{}'.format(
+                channel_list[index:end].decode('ascii'),
+                ('uint', 'half', 'float')[pixel_type],
+            )
+        )
+        index = end + 17
+    height = y_max - y_min + 1
+    if not flags & (0x200 | 0x800 | 0x1000):
+        # Single part, flat, scan line image, make sure all chunks are there
+        compression = ord(attributes.get('compression', b'\0')[:1])
+        lines_per_chunk = EXR_LINES_PER_CHUNK.get(compression, 1)
+        chunk_count = -(-height // lines_per_chunk)
+        offsets_end = position + 8 * chunk_count
+        if offsets_end > file_size:
+            raise Exception('Truncated file')
+        with open(path, 'rb') as f:
+            f.seek(position)
+            offsets = struct.unpack(
+                '<{}Q'.format(chunk_count), f.read(8 * chunk_count)
+            )
+        if not offsets or max(offsets) >= file_size:
+            raise Exception('Truncated file')
+    return (x_max - x_min + 1, height, ','.join(sorted(channels)))
+
+
+def _read_png_header(path, data, file_size):
+    '''Return the header of the PNG image *path* starting with *data*'''
+    if data[:8] != b'\x89PNG\r\n\x1a\n' or data[12:16] != b'IHDR':
+        raise Exception('Not a PNG image')
+    width, height, bit_depth, color_type = struct.unpack('>IIBB', data[16:26])
+    with open(path, 'rb') as f:
+        f.seek(max(0, file_size - 12))
+        if f.read(12)[4:8] != b'IEND':
+            raise Exception('Truncated file')
+    return (width, height, '{}:{}'.format(color_type, bit_depth))
+
+
+def _read_jpeg_header(path, data, file_size):
+    '''Return the header of the JPEG image *path* starting with *data*'''
+    if data[:2] != b'\xff\xd8':
+        raise Exception('Not a JPEG image')
+    position = 2
+    while position + 9 < len(data):
+        if data[position] != 0xFF:
+            raise Exception('Corrupt JPEG marker')
+        marker = data[position + 1]
+        size = struct.unpack('>H', data[position + 2 : position + 4])[0]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            bit_depth, height, width, components = struct.unpack(
+                '>BHHB', data[position + 4 : position + 10]
+            )
+            with open(path, 'rb') as f:
+                f.seek(max(0, file_size - 2))
+                if f.read(2) != b'\xff\xd9':
+                    raise Exception('Truncated file')
+            return (width, height, '{}:{}'.format(components, bit_depth))
+        position += 2 + size
+    if len(data) < file_size:
+        raise IncompleteHeaderError('Header exceeds data read')
+    raise Exception('JPEG frame header not found')
+
+
+def _read_bmp_header(path, data, file_size):
+    '''Return the header of the BMP image *path* starting with *data*'''
+    if data[:2] != b'BM':
+        raise Exception('Not a BMP image')
+    size = struct.unpack('<I', data[2:6])[0]
+    if size > file_size:
+        raise Exception('Truncated file')
+    width, height = struct.unpack('<ii', data[18:26])
+    bits_per_pixel = struct.unpack('<H', data[28:30])[0]
+    return (width, abs(height), str(bits_per_pixel))
+
+
+IMAGE_HEADER_READERS = {
+    '.exr': _read_exr_header,
+    '.png': _read_png_header,
+    '.jpg': _read_jpeg_header,
+    '.jpeg': _read_jpeg_header,
+    '.bmp': _read_bmp_header,
+}
+'''Image header readers by file extension'''
+
+
+def read_image_header(path):
+    '''
+    Return a tuple of width, height and channel layout of the image *path*,
+    read from its header. Raises an exception if the file is empty,
+    truncated or the header can not be parsed. Returns None if the format is
+    not supported.
+    '''
+    reader = IMAGE_HEADER_READERS.get(os.path.splitext(path)[1].lower())
+    file_size = os.path.getsize(path)
+    if file_size == 0:
+        raise Exception('Empty file')
+    if reader is None:
+        return None
+    read_size = HEADER_READ_SIZE
+    while True:
+        with open(path, 'rb') as f:
+            data = f.read(read_size)
+        try:
+            return reader(path, data, file_size)
+        except (struct.error, ValueError, KeyError, IndexError):
+            # Includes IncompleteHeaderError
+            if len(data) < read_size or read_size >= 64 * HEADER_READ_SIZE:
+                raise Exception('Corrupt or truncated header')
+            # Large header, read more
+            read_size *= 4
+
+
+def _check_frame(frame, path):
+    '''Return the (frame, path, header, error) check result of *path*'''
+    try:
+        return frame, path, read_image_header(path), None
+    except (IOError, OSError) as error:
+        return frame, path, None, 'Could not read: {}'.format(error)
+    except Exception as error:
+        return frame, path, None, str(error)
+
+
+def check_image_sequence(image_sequence_path, max_workers=None):
+    '''
+    Check the frames of the image sequence *image_sequence_path*, reading up
+    to *max_workers* files concurrently. Yields a (frame, path, header,
+    error) tuple per frame in frame order as soon as it is checked, see
+    :func:`read_image_header` for header. Missing frames are reported with
+    the error "Missing frame".
+    '''
+    collection = parse_image_sequence(image_sequence_path)
+    pattern = collection.format('{head}{padding}{tail}')
+    frames = sorted(collection.indexes | collection.holes().indexes)
+    max_workers = max_workers or MAX_IO_WORKERS
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = collections.deque()
+        for frame in frames:
+            path = pattern % frame
+            if frame not in collection.indexes or not os.path.exists(path):
+                pending.append((frame, path, None))
+            else:
+                pending.append(
+                    (frame, path, executor.submit(_check_frame, frame, path))
+                )
+            # Keep a bounded number of frames in flight
+            while len(pending) > 2 * max_workers:
+                yield _frame_result(pending.popleft())
+        while pending:
+            yield _frame_result(pending.popleft())
+
+
+def _frame_result(pending_frame):
+    frame, path, future = pending_frame
+    if future is None:
+        return frame, path, None, 'Missing frame'
+    return future.result()
+
+
+def _get_process_context():
+    '''
+    Return the multiprocessing context starting worker processes. Within
+    the editor sys.executable is the editor itself, workers run the Python
+    interpreter shipped with Unreal instead.
+    '''
+    context = multiprocessing.get_context('spawn')
+    if hasattr(unreal, 'get_interpreter_executable_path'):
+        context.set_executable(unreal.get_interpreter_executable_path())
+    return context
+
+
+def build_image_sequence_manifest(
+    image_sequence_path, max_workers=None, algorithm='blake2b'
+):
+    '''
+    Return the manifest of the image sequence *image_sequence_path* as a
+    dictionary listing each frame with its file name, size and checksum
+    using the hashlib *algorithm*, plus the missing frames.
+
+    Files are hashed memory mapped by a pool of up to *max_workers*
+    processes, one per core if not given. Falls back to a thread pool if
+    worker processes cannot be started.
+    '''
+    collection = parse_image_sequence(image_sequence_path)
+    pattern = collection.format('{head}{padding}{tail}')
+    tasks = [
+        (frame, pattern % frame, algorithm)
+        for frame in sorted(collection.indexes)
+    ]
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_size = max(1, len(tasks) // (4 * max_workers))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=_get_process_context()
+        ) as executor:
+            manifest_frames = list(
+                executor.map(checksum_frame, tasks, chunksize=chunk_size)
+            )
+    except (OSError, BrokenProcessPool) as error:
+        logger.warning(
+            'Could not hash frames in worker processes, using threads: '
+            '{}'.format(error)
+        )
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            manifest_frames = list(executor.map(checksum_frame, tasks))
+    return {
+        'version': MANIFEST_VERSION,
+        'image_sequence': os.path.basename(
+            collection.format('{head}{padding}{tail} [{ranges}]')
+        ),
+        'algorithm': algorithm,
+        'total_size': sum(frame['size'] for frame in manifest_frames),
+        'missing_frames': sorted(collection.holes().indexes),
+        'frames': manifest_frames,
+    }
+
+
+def write_image_sequence_manifest(image_sequence_path, manifest_path, **kw):
+    '''
+    Build the manifest of *image_sequence_path* and write it as JSON to
+    *manifest_path*, see :func:`build_image_sequence_manifest` for *kw*.
+    '''
+    manifest = build_image_sequence_manifest(image_sequence_path, **kw)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    return manifest_path
@@ -2,39 +2,182 @@
 # :copyright: Copyright (c) 2014-2023 ftrack
 import logging
 import os
-import json
 
 import unreal
 
 import ftrack_connect_pipeline_unreal.constants as unreal_constants
 from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+from ftrack_connect_pipeline_unreal.utils.store import get_ftrack_node_store
+from ftrack_connect_pipeline_unreal.utils.registry import (
+    add_registry_listener,
+    get_project_asset_snapshot,
+    update_project_assets,
+)
+from ftrack_connect_pipeline_unreal.utils.file import (
+    save_node,
+    rename_pending_save,
+)
+from ftrack_connect_pipeline_unreal.utils.trace import traced
 
 logger = logging.getLogger(__name__)
 
 
+def _object_path(node_name):
+    '''Return *node_name* on the "/Game/Path/Asset.Asset" object path form.'''
+    asset_name = node_name.rsplit('/', 1)[-1]
+    if '.' in asset_name:
+        return node_name
+    return '{}.{}'.format(node_name, asset_name)
+
+
+class AssetMetadataIndex(object):
+    '''
+    Reverse index of the ftrack metadata tag value (the asset info id) to
+    the Unreal asset paths carrying it.
+
+    The index is built once from a full project scan and then kept up to
+    date by the node utilities and the asset registry events, paths are
+    stored on the object path form returned by
+    :func:`get_current_scene_objects`.
+    '''
+
+    def __init__(self):
+        self._id_by_path = {}
+        self._paths_by_id = {}
+        self._dirty = set()
+        self._snapshot = None
+
+    def _add(self, node_name, id_value):
+        self._id_by_path[node_name] = id_value
+        if id_value:
+            self._paths_by_id.setdefault(id_value, set()).add(node_name)
+
+    @traced('node.read_metadata')
+    def _read(self, node_name):
+        '''Read the metadata tag of *node_name* into the index.'''
+        from ftrack_connect_pipeline_unreal.utils import get_asset_by_path
+
+        asset = get_asset_by_path(node_name)
+        id_value = None
+        if asset is not None:
+            id_value = unreal.EditorAssetLibrary.get_metadata_tag(
+                asset, asset_const.NODE_METADATA_TAG
+            )
+        self.remove(node_name)
+        self._add(node_name, id_value or None)
+
+    def remove(self, node_name):
+        '''Remove *node_name* from the index.'''
+        node_name = _object_path(node_name)
+        self._dirty.discard(node_name)
+        id_value = self._id_by_path.pop(node_name, None)
+        if id_value:
+            paths = self._paths_by_id.get(id_value)
+            if paths is not None:
+                paths.discard(node_name)
+                if not paths:
+                    del self._paths_by_id[id_value]
+
+    def set(self, node_name, id_value):
+        '''Store that *node_name* is tagged with *id_value*.'''
+        self.remove(node_name)
+        self._add(_object_path(node_name), id_value)
+
+    def rename(self, node_name, new_node_name):
+        '''Move the index entry of *node_name* to *new_node_name*.'''
+        node_name = _object_path(node_name)
+        new_node_name = _object_path(new_node_name)
+        if node_name not in self._id_by_path:
+            # Already moved, or not indexed yet and read by the next sync
+            if new_node_name not in self._id_by_path:
+                self._dirty.add(new_node_name)
+            return
+        id_value = self._id_by_path.get(node_name)
+        self.remove(node_name)
+        self.remove(new_node_name)
+        self._add(new_node_name, id_value)
+
+    def invalidate(self, node_name):
+        '''Read the metadata tag of *node_name* again on next sync.'''
+        self._dirty.add(_object_path(node_name))
+
+    def on_registry_event(self, event, node_name, old_node_name=None):
+        '''
+        Apply the asset registry *event* about *node_name*, renamed from
+        *old_node_name*.
+        '''
+        if event == 'removed':
+            self.remove(node_name)
+        elif event == 'renamed':
+            self.rename(old_node_name, node_name)
+        else:
+            self.invalidate(node_name)
+
+    def get_id(self, node_name):
+        '''Return the asset info id *node_name* is tagged with, if indexed'''
+        return self._id_by_path.get(_object_path(node_name))
+
+    @traced('node.sync_metadata')
+    def sync(self, snapshot):
+        '''
+        Check the index against the project asset paths in *snapshot*. When
+        listed again, drop removed assets and read the metadata tag of assets
+        not yet indexed, otherwise only read the tags of the assets changed
+        since last sync.
+        '''
+        if snapshot is not self._snapshot:
+            self._snapshot = snapshot
+            scene_objects = snapshot.asset_paths
+            for node_name in set(self._id_by_path).difference(scene_objects):
+                self.remove(node_name)
+            self._dirty.update(
+                node_name
+                for node_name in scene_objects
+                if node_name not in self._id_by_path
+            )
+        while self._dirty:
+            node_name = self._dirty.pop()
+            if node_name in snapshot:
+                self._read(node_name)
+            else:
+                self.remove(node_name)
+
+    def get_nodes(self, id_value):
+        '''Return the asset paths tagged with *id_value*.'''
+        return sorted(self._paths_by_id.get(id_value, []))
+
+    def clear(self):
+        '''Drop all entries, next sync will rescan the project.'''
+        self._id_by_path = {}
+        self._paths_by_id = {}
+        self._dirty = set()
+        self._snapshot = None
+
+
+_asset_metadata_index = AssetMetadataIndex()
+add_registry_listener(_asset_metadata_index.on_registry_event)
+
+
+def get_asset_metadata_index():
+    '''Return the shared :class:`AssetMetadataIndex`.'''
+    return _asset_metadata_index
+
+
+def get_nodes_by_asset_info_id(asset_info_id):
+    '''Return the project asset paths tagged with *asset_info_id*'''
+    _asset_metadata_index.sync(get_project_asset_snapshot())
+    return _asset_metadata_index.get_nodes(asset_info_id)
+
+
 def get_ftrack_nodes():
     '''Returns all the ftrack nodes in the scene'''
-    ftrack_nodes = []
-    if not os.path.exists(unreal_constants.FTRACK_ROOT_PATH):
-        return ftrack_nodes
-    content = os.listdir(unreal_constants.FTRACK_ROOT_PATH)
-    for item_name in content:
-        if 'ftrackdata' not in item_name:
-            continue
-        if item_name.endswith(".json"):
-            ftrack_nodes.append(os.path.splitext(item_name)[0])
-    return ftrack_nodes  # str ["xxxx_ftrackdata_3642"] == list of node names
+    # str ["xxxx_ftrackdata_3642"] == list of node names
+    return get_ftrack_node_store().names()
 
 
 def get_current_scene_objects():
     '''Returns all the objects in the scene'''
-    # Return the list of all the assets found in the DirectoryPath.
-    # https://docs.unrealengine.com/5.1/en-US/PythonAPI/class/EditorAssetLibrary.html?highlight=editorassetlibrary#unreal.EditorAssetLibrary
-    return set(
-        unreal.EditorAssetLibrary.list_assets(
-            unreal_constants.GAME_ROOT_PATH, recursive=True
-        )
-    )
+    return set(get_project_asset_snapshot().asset_paths)
 
 
 def connect_object(node_name, asset_info, supplied_logger=None):
@@ -43,56 +186,78 @@ def connect_object(node_name, asset_info, supplied_logger=None):
     from ftrack_connect_pipeline_unreal.utils import get_asset_by_path
 
     asset = get_asset_by_path(node_name)
+    id_value = str(asset_info.get(asset_const.ASSET_INFO_ID))
     unreal.EditorAssetLibrary.set_metadata_tag(
         asset,
         asset_const.NODE_METADATA_TAG,
-        str(asset_info.get(asset_const.ASSET_INFO_ID)),
+        id_value,
     )
+    _asset_metadata_index.set(node_name, id_value)
 
     # Have Unreal save the asset as it has been modified
     logger_effective = supplied_logger or logger
     logger_effective.debug('Saving asset: {}'.format(node_name))
-    unreal.EditorAssetLibrary.save_asset(node_name)
+    save_node(node_name)
+
+
+def disconnect_object(node_name):
+    '''Remove the ftrack metadata from the Unreal asset given by *node_name*'''
 
+    from ftrack_connect_pipeline_unreal.utils import get_asset_by_path
 
-def node_exists(node_name):
-    '''Check if node_name exist in the project'''
-    for content in unreal.EditorAssetLibrary.list_assets(
-        unreal_constants.GAME_ROOT_PATH, recursive=True
-    ):
-        if node_name in content:
-            return True
-    return False
+    asset = get_asset_by_path(node_name)
+    if asset is not None:
+        unreal.EditorAssetLibrary.remove_metadata_tag(
+            asset, asset_const.NODE_METADATA_TAG
+        )
+    _asset_metadata_index.set(node_name, None)
+
+
+def node_exists(node_name, prefix=False):
+    '''
+    Check if node_name exist in the project, as an object path or package
+    name. If *prefix* is True, check for any asset path beginning with
+    *node_name*.
+    '''
+    return get_project_asset_snapshot().exists(node_name, prefix=prefix)
+
+
+def nodes_exist(node_names, prefix=False):
+    '''
+    Check which of *node_names* exist in the project, returns a dictionary
+    of node name to bool, see :func:`node_exists`.
+    '''
+    snapshot = get_project_asset_snapshot()
+    return dict(
+        (node_name, snapshot.exists(node_name, prefix=prefix))
+        for node_name in node_names
+    )
 
 
 def ftrack_node_exists(dcc_object_name):
     '''Check if ftrack node identified by *node_name* exist in the project'''
-    dcc_object_node = None
-    ftrack_nodes = get_ftrack_nodes()
-    for node in ftrack_nodes:
-        if node == dcc_object_name:
-            dcc_object_node = node
-            break
-    return dcc_object_node is not None
+    return get_ftrack_node_store().exists(dcc_object_name)
 
 
-def rename_node_with_prefix(node_name, prefix):
-    '''This method allow renaming a UObject to put a prefix to work along
-    with UE4 naming convention. https://github.com/Allar/ue4-style-guide'''
+@traced('node.rename')
+def rename_node(node_name, new_node_name):
+    '''
+    Rename asset *node_name* to *new_node_name*, return the new name or
+    *node_name* if it could not be renamed.
+    '''
 
     from ftrack_connect_pipeline_unreal.utils.asset import (
         asset_path_to_filesystem_path,
+        forget_asset_paths,
     )
 
-    assert node_name is not None, 'No node name/asset path provided'
-    object_ad = unreal.EditorAssetLibrary.find_asset_data(node_name)
-    new_name_with_prefix = '{}/{}{}'.format(
-        str(object_ad.package_path),
-        prefix,
-        str(object_ad.asset_name),
-    )
-
-    if unreal.EditorAssetLibrary.rename_asset(node_name, new_name_with_prefix):
+    if unreal.EditorAssetLibrary.rename_asset(node_name, new_node_name):
+        _asset_metadata_index.rename(node_name, new_node_name)
+        rename_pending_save(node_name, new_node_name)
+        update_project_assets(
+            added=[_object_path(new_node_name)],
+            removed=[_object_path(node_name)],
+        )
         # Make sure previous files is deleted from disk, Unreal have a behaviour to leave a stub asset
         previous_asset_path = asset_path_to_filesystem_path(
             node_name, throw_on_error=False
@@ -102,90 +267,101 @@ def rename_node_with_prefix(node_name, prefix):
                 'Removing previous asset file: {}'.format(previous_asset_path)
             )
             os.remove(previous_asset_path)
-        return new_name_with_prefix
+        forget_asset_paths([node_name, new_node_name])
+        return new_node_name
     else:
         return node_name
 
 
-def rename_node_with_suffix(node_name, suffix):
-    '''Rename asset *node_name* with *suffix*'''
+def rename_node_with_prefix(node_name, prefix):
+    '''This method allow renaming a UObject to put a prefix to work along
+    with UE4 naming convention. https://github.com/Allar/ue4-style-guide'''
 
-    from ftrack_connect_pipeline_unreal.utils.asset import (
-        asset_path_to_filesystem_path,
+    assert node_name is not None, 'No node name/asset path provided'
+    object_ad = unreal.EditorAssetLibrary.find_asset_data(node_name)
+    new_name_with_prefix = '{}/{}{}'.format(
+        str(object_ad.package_path),
+        prefix,
+        str(object_ad.asset_name),
     )
+    return rename_node(node_name, new_name_with_prefix)
+
+
+def rename_node_with_suffix(node_name, suffix):
+    '''Rename asset *node_name* with *suffix*'''
 
     assert node_name is not None, 'No node name/asset path provided'
     object_ad = unreal.EditorAssetLibrary.find_asset_data(node_name)
     new_name_with_suffix = '{}/{}{}'.format(
         str(object_ad.package_path), str(object_ad.asset_name), suffix
     )
-
-    if unreal.EditorAssetLibrary.rename_asset(node_name, new_name_with_suffix):
-        # Make sure previous files is deleted from disk, Unreal have a behaviour to leave a stub asset
-        previous_asset_path = asset_path_to_filesystem_path(
-            node_name, throw_on_error=False
-        )
-        if previous_asset_path and os.path.exists(previous_asset_path):
-            logger.warning(
-                'Removing previous asset file: {}'.format(previous_asset_path)
-            )
-            os.remove(previous_asset_path)
-        return new_name_with_suffix
-    else:
-        return node_name
+    return rename_node(node_name, new_name_with_suffix)
 
 
 def get_connected_nodes_from_dcc_object(dcc_object_name):
     '''Return all objects connected to the given *dcc_object_name*'''
 
-    from ftrack_connect_pipeline_unreal.utils import get_asset_by_path
-
-    objects = []
-    dcc_object_node = None
-    ftrack_nodes = get_ftrack_nodes()
-    for node in ftrack_nodes:
-        if node == dcc_object_name:
-            dcc_object_node = node
-            break
-    if not dcc_object_node:
-        return
-    path_dcc_object_node = '{}{}{}.json'.format(
-        unreal_constants.FTRACK_ROOT_PATH, os.sep, dcc_object_node
+    from ftrack_connect_pipeline_unreal.utils.scene import (
+        get_ftrack_scene_model,
     )
-    with open(
-        path_dcc_object_node,
-        'r',
-    ) as openfile:
-        param_dict = json.load(openfile)
-    id_value = param_dict.get(asset_const.ASSET_INFO_ID)
-    for node_name in get_current_scene_objects():
-        asset = get_asset_by_path(node_name)
-        for metadata_tag in [asset_const.NODE_METADATA_TAG]:
-            ftrack_value = unreal.EditorAssetLibrary.get_metadata_tag(
-                asset, metadata_tag
-            )
-            if id_value == ftrack_value:
-                objects.append(node_name)
-    return objects
 
+    return get_ftrack_scene_model().get_connected_nodes(dcc_object_name)
 
+
+@traced('node.delete')
 def delete_node(node_name):
     '''Delete the given *node_name*'''
-    return unreal.EditorAssetLibrary.delete_asset(node_name)
+
+    from ftrack_connect_pipeline_unreal.utils.asset import forget_asset_paths
+
+    result = unreal.EditorAssetLibrary.delete_asset(node_name)
+    if result:
+        _asset_metadata_index.remove(node_name)
+        forget_asset_paths([node_name])
+        update_project_assets(removed=[_object_path(node_name)])
+    return result
+
+
+@traced('node.delete')
+def delete_nodes(node_names):
+    '''
+    Delete the given *node_names* in one operation, return the list of node
+    names deleted.
+    '''
+
+    from ftrack_connect_pipeline_unreal.utils.asset import forget_asset_paths
+
+    assets = []
+    for node_name in node_names:
+        asset = unreal.EditorAssetLibrary.load_asset(node_name)
+        if asset is not None:
+            assets.append(asset)
+    if assets:
+        unreal.EditorAssetLibrary.delete_loaded_assets(assets)
+    deleted = []
+    for node_name in node_names:
+        # Retry the ones left, one by one, if the bulk delete failed
+        if unreal.EditorAssetLibrary.does_asset_exist(
+            node_name
+        ) and not unreal.EditorAssetLibrary.delete_asset(node_name):
+            continue
+        _asset_metadata_index.remove(node_name)
+        deleted.append(node_name)
+    forget_asset_paths(deleted)
+    update_project_assets(
+        removed=[_object_path(node_name) for node_name in deleted]
+    )
+    return deleted
 
 
 def delete_ftrack_node(dcc_object_name):
-    dcc_object_node = None
-    ftrack_nodes = get_ftrack_nodes()
-    for node in ftrack_nodes:
-        if node == dcc_object_name:
-            dcc_object_node = node
-            break
-    if not dcc_object_node:
-        return False
-    path_dcc_object_node = '{}{}{}.json'.format(
-        unreal_constants.FTRACK_ROOT_PATH, os.sep, dcc_object_node
-    )
-    if os.path.exists(path_dcc_object_node):
-        return os.remove(path_dcc_object_node)
-    return False
+    '''Delete the ftrack node *dcc_object_name* from the project'''
+    return get_ftrack_node_store().delete(dcc_object_name)
+
+
+def delete_ftrack_nodes(dcc_object_names):
+    '''
+    Delete the ftrack nodes *dcc_object_names* from the project in one write,
+    return the names deleted.
+    '''
+    return get_ftrack_node_store().delete_many(dcc_object_names)
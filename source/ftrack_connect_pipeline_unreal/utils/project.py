@@ -1,13 +1,18 @@
 # Stored project data
 # :coding: utf-8
 # :copyright: Copyright (c) 2014-2023 ftrack
+import atexit
+import copy
 import logging
 import os
 import json
+import threading
 
 import unreal
 
 import ftrack_connect_pipeline_unreal.constants as unreal_constants
+from ftrack_connect_pipeline_unreal import cache as ftrack_cache
+from ftrack_connect_pipeline_unreal.lock import file_lock
 
 logger = logging.getLogger(__name__)
 
@@ -19,41 +24,181 @@ def get_project_path():
     return unreal.SystemLibrary.get_project_directory()
 
 
-def get_project_settings():
-    '''Read and return settings from the Unreal project.'''
-    settings_path = os.path.join(
-        unreal_constants.FTRACK_ROOT_PATH,
-        unreal_constants.PROJECT_SETTINGS_FILE_NAME,
-    )
-    if not os.path.exists(settings_path):
-        return {}
-    return json.load(open(settings_path, 'r'))
+class ProjectSettingsStore(object):
+    '''
+    Settings of the Unreal project, stored as JSON within the project ftrack
+    folder and shared by all editor instances opening the project.
 
+    Settings are cached in memory and read again only when the file changes
+    on disk. Updates are merged with the settings on disk, under a file
+    lock, and written atomically. Bursts of updates are written once, after
+    :const:`DEBOUNCE_DELAY` seconds.
+    '''
 
-def save_project_settings(settings):
-    '''Write the project settings to the current Unreal project.'''
-    settings_path = os.path.join(
-        unreal_constants.FTRACK_ROOT_PATH,
-        unreal_constants.PROJECT_SETTINGS_FILE_NAME,
-    )
-    if not os.path.exists(unreal_constants.FTRACK_ROOT_PATH):
-        logger.info(
-            'Creating Unreal project ftrack root: {}'.format(
-                unreal_constants.FTRACK_ROOT_PATH
-            )
+    DEBOUNCE_DELAY = 0.5
+    '''Seconds updates are held before being written'''
+
+    LOCK_TIMEOUT = 10.0
+    '''Seconds to wait for the settings file lock'''
+
+    @property
+    def path(self):
+        '''Return the path to the settings file'''
+        return os.path.join(
+            self._root_path, unreal_constants.PROJECT_SETTINGS_FILE_NAME
         )
-        os.makedirs(unreal_constants.FTRACK_ROOT_PATH)
-    with open(settings_path, 'w') as f:
-        json.dump(settings, f)
+
+    def __init__(self, root_path):
+        '''Initialise the store located in *root_path*'''
+        self._root_path = root_path
+        self._settings = {}
+        self._stat = None
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.RLock()
+
+    def _ensure_root(self):
+        if not os.path.exists(self._root_path):
+            logger.info(
+                'Creating Unreal project ftrack root: {}'.format(
+                    self._root_path
+                )
+            )
+            os.makedirs(self._root_path)
+
+    def _refresh(self):
+        '''Read the settings file again if it has changed on disk.'''
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self._settings = {}
+            self._stat = None
+            return
+        if self._stat is not None and (
+            stat.st_ino,
+            stat.st_size,
+            stat.st_mtime,
+        ) == (self._stat.st_ino, self._stat.st_size, self._stat.st_mtime):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self._settings = json.load(f)
+        except ValueError as error:
+            logger.warning(
+                'Could not read Unreal project settings {}: {}'.format(
+                    self.path, error
+                )
+            )
+            self._settings = {}
+        self._stat = stat
+
+    def _file_lock(self):
+        '''Hold the lock of the settings file, shared between processes.'''
+        self._ensure_root()
+        return file_lock(self.path, timeout=self.LOCK_TIMEOUT)
+
+    def _write(self, settings):
+        '''Write *settings* atomically, must hold the file lock.'''
+        temp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(temp_path, 'w') as f:
+            json.dump(settings, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._settings = settings
+        self._stat = os.stat(self.path)
         logger.info(
             'Successfully saved Unreal project settings to: {}'.format(
-                settings_path
+                self.path
             )
         )
 
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def get(self):
+        '''Return a copy of the settings, including updates not written'''
+        with self._lock:
+            self._refresh()
+            settings = copy.deepcopy(self._settings)
+            settings.update(copy.deepcopy(self._pending))
+            return settings
+
+    def update(self, settings):
+        '''
+        Update the settings with the given *settings*, written after
+        :const:`DEBOUNCE_DELAY` seconds together with any other update made
+        meanwhile.
+        '''
+        with self._lock:
+            self._pending.update(copy.deepcopy(settings))
+            if self._timer is None:
+                self._timer = threading.Timer(self.DEBOUNCE_DELAY, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        '''Write pending updates now, merged with the settings on disk.'''
+        with self._lock:
+            self._cancel_timer()
+            if not self._pending:
+                return
+            with self._file_lock():
+                self._stat = None
+                self._refresh()
+                settings = dict(self._settings)
+                settings.update(self._pending)
+                self._write(settings)
+            self._pending = {}
+
+    def save(self, settings):
+        '''Replace all settings with *settings*, written immediately.'''
+        with self._lock:
+            self._cancel_timer()
+            self._pending = {}
+            with self._file_lock():
+                self._write(copy.deepcopy(settings))
+
+
+_project_settings_stores = {}
+
+
+def get_project_settings_store():
+    '''Return the :class:`ProjectSettingsStore` of the current project.'''
+    root_path = unreal_constants.FTRACK_ROOT_PATH
+    if root_path not in _project_settings_stores:
+        store = ProjectSettingsStore(root_path)
+        atexit.register(store.flush)
+        _project_settings_stores[root_path] = store
+    return _project_settings_stores[root_path]
+
+
+def get_project_settings():
+    '''Read and return settings from the Unreal project.'''
+    return get_project_settings_store().get()
+
+
+def save_project_settings(settings):
+    '''Write the project settings to the current Unreal project.'''
+    get_project_settings_store().save(settings)
+
 
 def update_project_settings(settings):
     '''Update the project settings with the given *settings*.'''
-    existing_settings = get_project_settings()
-    existing_settings.update(settings)
-    save_project_settings(existing_settings)
+    get_project_settings_store().update(settings)
+
+
+def get_project_ftrack_cache(server_url):
+    '''
+    Return the :class:`~ftrack_connect_pipeline_unreal.cache.FtrackCache` of
+    *server_url* stored in the current project.
+    '''
+    return ftrack_cache.get_ftrack_cache(
+        os.path.join(
+            unreal_constants.FTRACK_ROOT_PATH,
+            unreal_constants.FTRACK_CACHE_FOLDER_NAME,
+        ),
+        server_url,
+    )
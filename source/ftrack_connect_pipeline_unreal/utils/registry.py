@@ -0,0 +1,306 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import bisect
+import logging
+import time
+
+import unreal
+
+import ftrack_connect_pipeline_unreal.constants as unreal_constants
+from ftrack_connect_pipeline_unreal.utils.trace import span
+
+logger = logging.getLogger(__name__)
+
+# Unreal asset registry operations
+
+REGISTRY_DELEGATES = [
+    'on_asset_added',
+    'on_asset_removed',
+    'on_asset_renamed',
+    'on_asset_updated',
+]
+'''Asset registry delegates keeping the cached project assets up to date'''
+
+SNAPSHOT_MAX_AGE = 5.0
+'''Seconds a project asset snapshot is trusted when the asset registry
+delegates are not available'''
+
+_generation = 0
+_registry_callbacks_bound = None
+_registry_listeners = []
+_project_asset_snapshot = None
+
+
+def _package_name(asset_path):
+    '''Return the package name of the object path *asset_path*'''
+    asset_name = asset_path.rsplit('/', 1)[-1]
+    if '.' not in asset_name:
+        return asset_path
+    return asset_path.rsplit('.', 1)[0]
+
+
+class ProjectAssetSnapshot(object):
+    '''
+    Snapshot of the asset paths in the project, on the object path form
+    returned by :func:`unreal.EditorAssetLibrary.list_assets`, hashed on both
+    object path and package name with a sorted index for prefix queries.
+    '''
+
+    @property
+    def generation(self):
+        '''Return the registry generation the snapshot was listed at'''
+        return self._generation
+
+    @property
+    def asset_paths(self):
+        '''Return the set of asset paths, must not be modified'''
+        return self._asset_paths
+
+    def __init__(self, asset_paths, generation):
+        '''Initialise the snapshot with *asset_paths* at *generation*'''
+        self._generation = generation
+        self._created = time.time()
+        self._asset_paths = set(asset_paths)
+        self._package_names = set(
+            _package_name(asset_path) for asset_path in self._asset_paths
+        )
+        self._sorted_asset_paths = None
+
+    def __contains__(self, asset_path):
+        return asset_path in self._asset_paths
+
+    def __len__(self):
+        return len(self._asset_paths)
+
+    def age(self):
+        '''Return the number of seconds since the snapshot was listed'''
+        return time.time() - self._created
+
+    def add(self, asset_path):
+        '''Add *asset_path* to the snapshot.'''
+        if asset_path not in self._asset_paths:
+            self._asset_paths.add(asset_path)
+            self._package_names.add(_package_name(asset_path))
+            self._sorted_asset_paths = None
+
+    def discard(self, asset_path):
+        '''Remove *asset_path* from the snapshot.'''
+        if asset_path in self._asset_paths:
+            self._asset_paths.discard(asset_path)
+            self._package_names.discard(_package_name(asset_path))
+            self._sorted_asset_paths = None
+
+    def exists(self, name, prefix=False):
+        '''
+        Return True if *name* is the object path or package name of an asset
+        in the snapshot, or the beginning of an asset path if *prefix* is
+        True.
+        '''
+        if prefix:
+            return len(self.starting_with(name, first=True)) > 0
+        return name in self._asset_paths or name in self._package_names
+
+    def starting_with(self, prefix, first=False):
+        '''
+        Return the asset paths starting with *prefix*, only the first one if
+        *first* is True.
+        '''
+        if self._sorted_asset_paths is None:
+            self._sorted_asset_paths = sorted(self._asset_paths)
+        result = []
+        index = bisect.bisect_left(self._sorted_asset_paths, prefix)
+        while index < len(self._sorted_asset_paths):
+            asset_path = self._sorted_asset_paths[index]
+            if not asset_path.startswith(prefix):
+                break
+            result.append(asset_path)
+            if first:
+                break
+            index += 1
+        return result
+
+
+def _asset_data_object_path(asset_data):
+    '''Return the object path of the asset registry *asset_data*'''
+    package_name = getattr(asset_data, 'package_name', None)
+    asset_name = getattr(asset_data, 'asset_name', None)
+    if package_name and asset_name:
+        return '{}.{}'.format(package_name, asset_name)
+    return str(asset_data.object_path)
+
+
+def _on_registry_event(delegate_name, asset_data, *args):
+    '''
+    Apply the asset registry event *delegate_name* about *asset_data* to the
+    project asset snapshot, incrementally when possible.
+    '''
+    event = delegate_name[len('on_asset_') :]
+    try:
+        asset_path = _asset_data_object_path(asset_data)
+        old_asset_path = str(args[0]) if event == 'renamed' else None
+    except Exception as error:
+        logger.debug(
+            'Could not read asset registry event {} ({}), project assets '
+            'are listed again'.format(delegate_name, error)
+        )
+        invalidate_project_assets()
+        return
+    apply_registry_event(event, asset_path, old_asset_path=old_asset_path)
+
+
+def _registry_event_callback(delegate_name):
+    '''Return the callback bound to the asset registry *delegate_name*'''
+
+    def callback(*args):
+        _on_registry_event(delegate_name, *args)
+
+    return callback
+
+
+def apply_registry_event(event, asset_path, old_asset_path=None):
+    '''
+    Apply the asset registry *event*, "added", "removed", "renamed" (from
+    *old_asset_path*) or "updated", of *asset_path* to the current project
+    asset snapshot and notify the registry listeners.
+    '''
+    global _generation
+    if not asset_path.startswith(unreal_constants.GAME_ROOT_PATH + '/'):
+        return
+    if event != 'updated':
+        snapshot = _project_asset_snapshot
+        current = snapshot is not None and snapshot.generation == _generation
+        _generation += 1
+        if current:
+            # Carry the snapshot over to the new generation
+            if event == 'removed':
+                snapshot.discard(asset_path)
+            elif event == 'renamed':
+                snapshot.discard(old_asset_path)
+                snapshot.add(asset_path)
+            else:
+                snapshot.add(asset_path)
+            snapshot._generation = _generation
+    for listener in list(_registry_listeners):
+        try:
+            listener(event, asset_path, old_asset_path)
+        except Exception:
+            logger.exception(
+                'Asset registry listener {} failed'.format(listener)
+            )
+
+
+def add_registry_listener(callback):
+    '''
+    Call *callback* with the event name, asset path and old asset path (if
+    renamed) on each asset registry change, see :func:`apply_registry_event`.
+    '''
+    if callback not in _registry_listeners:
+        _registry_listeners.append(callback)
+
+
+def remove_registry_listener(callback):
+    '''Stop calling *callback* on asset registry changes.'''
+    if callback in _registry_listeners:
+        _registry_listeners.remove(callback)
+
+
+def _bind_registry_callbacks():
+    '''
+    Subscribe to the asset registry delegates available in this Unreal
+    version, return True if any could be bound.
+    '''
+    global _registry_callbacks_bound
+    if _registry_callbacks_bound is not None:
+        return _registry_callbacks_bound
+    _registry_callbacks_bound = False
+    asset_registry = unreal.AssetRegistryHelpers.get_asset_registry()
+    for delegate_name in REGISTRY_DELEGATES:
+        delegate = getattr(asset_registry, delegate_name, None)
+        if delegate is None or not hasattr(delegate, 'add_callable'):
+            continue
+        delegate.add_callable(_registry_event_callback(delegate_name))
+        _registry_callbacks_bound = True
+    if not _registry_callbacks_bound:
+        logger.debug(
+            'Asset registry delegates not available, project asset snapshot '
+            'expires after {}s'.format(SNAPSHOT_MAX_AGE)
+        )
+    return _registry_callbacks_bound
+
+
+def is_registry_monitored():
+    '''
+    Return True if changes to the asset registry are followed through its
+    delegates, otherwise cached project assets expire after
+    :const:`SNAPSHOT_MAX_AGE`.
+    '''
+    return _bind_registry_callbacks()
+
+
+def get_registry_generation():
+    '''Return the current generation of the project assets'''
+    return _generation
+
+
+def is_registry_cache_current(generation, created):
+    '''
+    Return True if a cache of the asset registry made at *generation*, at
+    time *created*, is still current.
+    '''
+    if generation != _generation:
+        return False
+    if not _bind_registry_callbacks():
+        return time.time() - created <= SNAPSHOT_MAX_AGE
+    return True
+
+
+def invalidate_project_assets():
+    '''
+    Mark the project assets as changed, the next snapshot request will list
+    the project again.
+    '''
+    global _generation
+    _generation += 1
+
+
+def update_project_assets(added=None, removed=None):
+    '''
+    Apply asset paths *added* and *removed* by the integration to the current
+    project asset snapshot, if any.
+    '''
+    if _project_asset_snapshot is None:
+        return
+    for asset_path in removed or []:
+        _project_asset_snapshot.discard(asset_path)
+    for asset_path in added or []:
+        _project_asset_snapshot.add(asset_path)
+
+
+def get_project_asset_snapshot():
+    '''
+    Return the shared :class:`ProjectAssetSnapshot` of the project assets
+    below :const:`~ftrack_connect_pipeline_unreal.constants.GAME_ROOT_PATH`,
+    listing the project only when it has changed.
+    '''
+    global _project_asset_snapshot
+    callbacks_bound = _bind_registry_callbacks()
+    snapshot = _project_asset_snapshot
+    if (
+        snapshot is None
+        or snapshot.generation != _generation
+        or (not callbacks_bound and snapshot.age() > SNAPSHOT_MAX_AGE)
+    ):
+        if snapshot is not None and snapshot.generation == _generation:
+            # Expired, make sure dependent caches are refreshed too
+            invalidate_project_assets()
+        # Return the list of all the assets found in the DirectoryPath.
+        # https://docs.unrealengine.com/5.1/en-US/PythonAPI/class/EditorAssetLibrary.html?highlight=editorassetlibrary#unreal.EditorAssetLibrary
+        with span('registry.list_assets'):
+            snapshot = ProjectAssetSnapshot(
+                unreal.EditorAssetLibrary.list_assets(
+                    unreal_constants.GAME_ROOT_PATH, recursive=True
+                ),
+                _generation,
+            )
+        _project_asset_snapshot = snapshot
+    return snapshot
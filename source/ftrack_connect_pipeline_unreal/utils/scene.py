@@ -0,0 +1,87 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import logging
+
+from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+from ftrack_connect_pipeline_unreal.utils.store import get_ftrack_node_store
+from ftrack_connect_pipeline_unreal.utils.registry import (
+    get_project_asset_snapshot,
+    invalidate_project_assets,
+    is_registry_monitored,
+)
+from ftrack_connect_pipeline_unreal.utils.node import (
+    get_asset_metadata_index,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FtrackSceneModel(object):
+    '''
+    Model of the ftrack nodes of the project and the Unreal assets connected
+    to them, kept up to date incrementally.
+
+    Nodes are read from the ftrack node store, which only reads what has
+    been appended to its journal in the project ftrack folder since last
+    read. Connected assets come from the asset metadata index, which follows
+    the asset registry added, removed, renamed and updated events.
+    '''
+
+    @property
+    def node_store(self):
+        '''Return the :class:`~.store.FtrackNodeStore` of the project'''
+        return get_ftrack_node_store()
+
+    @property
+    def metadata_index(self):
+        '''Return the :class:`~.node.AssetMetadataIndex` of the project'''
+        return get_asset_metadata_index()
+
+    def refresh(self):
+        '''
+        Make sure the model reflects the project. Only needed when the asset
+        registry events are not available, the project is then listed again.
+        '''
+        if not is_registry_monitored():
+            invalidate_project_assets()
+
+    def names(self):
+        '''Return the names of all ftrack nodes'''
+        return self.node_store.names()
+
+    def items(self):
+        '''Return a list of (name, data) for all ftrack nodes'''
+        return self.node_store.items()
+
+    def get(self, name):
+        '''Return the data of ftrack node *name*, None if it does not exist'''
+        return self.node_store.get(name)
+
+    def find(self, asset_info_id):
+        '''Return the name of the ftrack node of *asset_info_id*, or None'''
+        return self.node_store.find(asset_info_id)
+
+    def get_connected_nodes(self, name):
+        '''
+        Return the asset paths connected to the ftrack node *name*, None if
+        the node does not exist.
+        '''
+        data = self.node_store.get(name)
+        if data is None:
+            return None
+        id_value = data.get(asset_const.ASSET_INFO_ID)
+        if not id_value:
+            return []
+        self.metadata_index.sync(get_project_asset_snapshot())
+        return self.metadata_index.get_nodes(id_value)
+
+
+_ftrack_scene_model = None
+
+
+def get_ftrack_scene_model():
+    '''Return the shared :class:`FtrackSceneModel`.'''
+    global _ftrack_scene_model
+    if _ftrack_scene_model is None:
+        _ftrack_scene_model = FtrackSceneModel()
+    return _ftrack_scene_model
@@ -0,0 +1,186 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import atexit
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from ftrack_connect_pipeline_unreal.checksum import checksum_file
+
+logger = logging.getLogger(__name__)
+
+# Staging of files to publish
+
+STAGING_FOLDER_NAME = 'ftrack_unreal_staging'
+'''Name of the folder within the system temp folder holding staged files'''
+
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+'''Number of bytes read and written at a time when copying'''
+
+CHECKSUM_ALGORITHM = 'blake2b'
+'''hashlib algorithm of the checksum of staged files'''
+
+STALE_STAGED_FILE_AGE = 24 * 60 * 60
+'''Seconds after which staged files left by earlier sessions are removed'''
+
+_FICLONE = 0x40049409
+'''Linux ioctl cloning a file on copy-on-write filesystems'''
+
+_staged_paths = []
+_cleanup_registered = False
+
+
+def get_staging_folder():
+    '''Return the folder holding staged files, created if needed.'''
+    staging_folder = os.path.join(tempfile.gettempdir(), STAGING_FOLDER_NAME)
+    if not os.path.exists(staging_folder):
+        os.makedirs(staging_folder)
+    return staging_folder
+
+
+def _reflink(source_path, destination_path):
+    '''
+    Clone *source_path* to *destination_path* sharing the data blocks, return
+    True on success. Only supported on Linux copy-on-write filesystems.
+    '''
+    if not sys.platform.startswith('linux'):
+        return False
+    import fcntl
+
+    try:
+        with open(source_path, 'rb') as source_file:
+            with open(destination_path, 'wb') as destination_file:
+                fcntl.ioctl(
+                    destination_file.fileno(), _FICLONE, source_file.fileno()
+                )
+        return True
+    except (IOError, OSError):
+        if os.path.exists(destination_path):
+            os.remove(destination_path)
+        return False
+
+
+def copy_file(
+    source_path,
+    destination_path,
+    progress_callback=None,
+    algorithm=CHECKSUM_ALGORITHM,
+):
+    '''
+    Copy *source_path* to *destination_path* in chunks, calling
+    *progress_callback* with the number of bytes copied and the total number
+    of bytes after each chunk. Returns the hex checksum of the data using the
+    hashlib *algorithm*, computed while copying.
+    '''
+    checksum = hashlib.new(algorithm)
+    total_bytes = os.path.getsize(source_path)
+    copied_bytes = 0
+    with open(source_path, 'rb') as source_file:
+        with open(destination_path, 'wb') as destination_file:
+            while True:
+                chunk = source_file.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                destination_file.write(chunk)
+                checksum.update(chunk)
+                copied_bytes += len(chunk)
+                if progress_callback:
+                    progress_callback(copied_bytes, total_bytes)
+    return checksum.hexdigest()
+
+
+def remove_stale_staged_files():
+    '''
+    Remove the files older than :data:`STALE_STAGED_FILE_AGE` from the
+    staging folder, left behind by editor sessions which did not exit
+    cleanly.
+    '''
+    staging_folder = get_staging_folder()
+    now = time.time()
+    for filename in os.listdir(staging_folder):
+        staged_path = os.path.join(staging_folder, filename)
+        try:
+            if now - os.path.getmtime(staged_path) > STALE_STAGED_FILE_AGE:
+                os.remove(staged_path)
+        except OSError:
+            pass
+
+
+def new_staged_path(suffix=''):
+    '''
+    Return the path to a new empty file with *suffix* in the staging folder,
+    removed by :func:`cleanup_staged_files`.
+    '''
+    global _cleanup_registered
+    if not _cleanup_registered:
+        _cleanup_registered = True
+        atexit.register(cleanup_staged_files)
+        remove_stale_staged_files()
+    file_descriptor, staged_path = tempfile.mkstemp(
+        suffix=suffix, dir=get_staging_folder()
+    )
+    os.close(file_descriptor)
+    _staged_paths.append(staged_path)
+    return staged_path
+
+
+def stage_file(
+    source_path, progress_callback=None, algorithm=CHECKSUM_ALGORITHM
+):
+    '''
+    Stage *source_path* in the staging folder for publish without altering
+    it, return a tuple of the staged path and the hex checksum of the staged
+    data using the hashlib *algorithm*.
+
+    On the same filesystem as the staging folder, the file is cloned if the
+    filesystem supports it, otherwise hard linked, and the checksum read from
+    the staged file. The file is copied as a last resort, with the checksum
+    computed while copying, see :func:`copy_file` for *progress_callback*.
+    Staged files are removed by :func:`cleanup_staged_files`.
+    '''
+    staged_path = new_staged_path(os.path.splitext(source_path)[1])
+    staging_folder = os.path.dirname(staged_path)
+
+    # Cloning and hard linking only work within a filesystem
+    if os.stat(source_path).st_dev == os.stat(staging_folder).st_dev:
+        if _reflink(source_path, staged_path):
+            logger.debug('Cloned {} to {}'.format(source_path, staged_path))
+            return staged_path, checksum_file(staged_path, algorithm)
+        if os.path.exists(staged_path):
+            os.remove(staged_path)
+        try:
+            os.link(source_path, staged_path)
+            logger.debug(
+                'Hard linked {} to {}'.format(source_path, staged_path)
+            )
+            return staged_path, checksum_file(staged_path, algorithm)
+        except OSError as error:
+            logger.debug(
+                'Could not hard link {}: {}'.format(source_path, error)
+            )
+    checksum = copy_file(
+        source_path,
+        staged_path,
+        progress_callback=progress_callback,
+        algorithm=algorithm,
+    )
+    logger.debug('Copied {} to {}'.format(source_path, staged_path))
+    return staged_path, checksum
+
+
+def cleanup_staged_files():
+    '''Remove all files staged by :func:`stage_file`.'''
+    while _staged_paths:
+        staged_path = _staged_paths.pop()
+        try:
+            if os.path.exists(staged_path):
+                os.remove(staged_path)
+        except OSError as error:
+            logger.warning(
+                'Could not remove staged file {}: {}'.format(
+                    staged_path, error
+                )
+            )
@@ -0,0 +1,272 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import logging
+import os
+import json
+
+import ftrack_connect_pipeline_unreal.constants as unreal_constants
+from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+from ftrack_connect_pipeline_unreal.lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+
+class FtrackNodeStore(object):
+    '''
+    Consolidated storage of the ftrack nodes (dcc objects) of the Unreal
+    project, kept as a JSON lines journal within the project ftrack folder.
+
+    Each line holds the full data of one node or a deletion marker, the last
+    line written for a node wins. The journal is read in bulk and cached
+    until it changes on disk, then only the appended lines are read. An
+    index of asset info id to node name is kept alongside. Appends and
+    compaction hold a file lock shared with other editor instances.
+    '''
+
+    COMPACT_THRESHOLD = 1000
+    '''Number of superseded journal lines tolerated before compacting'''
+
+    LOCK_TIMEOUT = 10.0
+    '''Seconds to wait for the journal file lock'''
+
+    @property
+    def root_path(self):
+        '''Return the folder holding the journal'''
+        return self._root_path
+
+    @property
+    def path(self):
+        '''Return the path to the journal file'''
+        return os.path.join(
+            self._root_path, unreal_constants.FTRACK_NODE_STORE_FILE_NAME
+        )
+
+    def __init__(self, root_path):
+        '''Initialise the store located in *root_path*'''
+        self._root_path = root_path
+        self._nodes = {}
+        self._names_by_id = {}
+        self._stat = None
+        self._offset = 0
+        self._garbage = 0
+        self._migrated = False
+
+    def _reset(self):
+        self._nodes = {}
+        self._names_by_id = {}
+        self._stat = None
+        self._offset = 0
+        self._garbage = 0
+
+    def _replay(self, line):
+        '''Apply the journal *line* to the in-memory nodes.'''
+        try:
+            record = json.loads(line)
+            name = record['name']
+        except (ValueError, KeyError, TypeError):
+            logger.warning(
+                'Skipping corrupt ftrack node store entry: {}'.format(line)
+            )
+            return
+        previous_data = self._nodes.get(name)
+        if previous_data is not None:
+            self._garbage += 1
+            previous_id = previous_data.get(asset_const.ASSET_INFO_ID)
+            if self._names_by_id.get(previous_id) == name:
+                del self._names_by_id[previous_id]
+        if record.get('deleted'):
+            self._nodes.pop(name, None)
+            self._garbage += 1
+        else:
+            data = record.get('data') or {}
+            self._nodes[name] = data
+            if data.get(asset_const.ASSET_INFO_ID):
+                self._names_by_id[data[asset_const.ASSET_INFO_ID]] = name
+
+    def _refresh(self):
+        '''Read changes made to the journal since last read.'''
+        if not self._migrated:
+            self._migrated = True
+            self._migrate_legacy_files()
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self._reset()
+            return
+        if self._stat is not None:
+            if (
+                stat.st_ino == self._stat.st_ino
+                and stat.st_size == self._stat.st_size
+                and stat.st_mtime == self._stat.st_mtime
+            ):
+                return
+            if stat.st_ino != self._stat.st_ino or stat.st_size < self._offset:
+                # Replaced by compaction, read it all again
+                self._reset()
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        # An unterminated last line is still being written, leave it for
+        # the next read
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._replay(line.decode('utf-8'))
+        self._offset += end
+        self._stat = stat
+
+    def _ensure_root(self):
+        if not os.path.exists(self._root_path):
+            logger.warning(
+                'Creating project ftrack folder: {}'.format(self._root_path)
+            )
+            os.makedirs(self._root_path)
+
+    def _file_lock(self):
+        '''Hold the lock of the journal, shared between processes.'''
+        self._ensure_root()
+        return file_lock(self.path, timeout=self.LOCK_TIMEOUT)
+
+    def _append(self, records):
+        '''Append *records* to the journal in a single write.'''
+        lines = ''.join(
+            '{}\n'.format(json.dumps(record)) for record in records
+        ).encode('utf-8')
+        with self._file_lock():
+            with open(self.path, 'a+b') as f:
+                if f.tell() > 0:
+                    # Never continue on a torn line left by an interrupted
+                    # write
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        lines = b'\n' + lines
+                f.write(lines)
+        self._refresh()
+        if self._garbage > self.COMPACT_THRESHOLD and self._garbage > len(
+            self._nodes
+        ):
+            self.compact()
+
+    def _migrate_legacy_files(self):
+        '''
+        Move nodes stored as one "<name>.json" file each, as written by
+        earlier versions of the integration, into the journal.
+        '''
+        if not os.path.isdir(self._root_path):
+            return
+        legacy_paths = {}
+        for item_name in os.listdir(self._root_path):
+            if 'ftrackdata' not in item_name or not item_name.endswith(
+                '.json'
+            ):
+                continue
+            legacy_paths[os.path.splitext(item_name)[0]] = os.path.join(
+                self._root_path, item_name
+            )
+        if not legacy_paths:
+            return
+        records = []
+        for name, legacy_path in sorted(legacy_paths.items()):
+            try:
+                with open(legacy_path, 'r') as openfile:
+                    param_dict = json.load(openfile)
+                records.append({'name': name, 'data': param_dict})
+            except (IOError, ValueError) as error:
+                logger.warning(
+                    'Could not migrate ftrack node {}: {}'.format(
+                        legacy_path, error
+                    )
+                )
+                legacy_paths.pop(name)
+        if records:
+            self._append(records)
+        for legacy_path in legacy_paths.values():
+            os.remove(legacy_path)
+        logger.info(
+            'Migrated {} ftrack node(s) to: {}'.format(len(records), self.path)
+        )
+
+    def names(self):
+        '''Return the names of all nodes'''
+        self._refresh()
+        return list(self._nodes)
+
+    def items(self):
+        '''Return a list of (name, data) for all nodes'''
+        self._refresh()
+        return [(name, dict(data)) for name, data in self._nodes.items()]
+
+    def exists(self, name):
+        '''Return True if node *name* exists'''
+        self._refresh()
+        return name in self._nodes
+
+    def find(self, asset_info_id):
+        '''Return the name of the node holding *asset_info_id*, or None'''
+        self._refresh()
+        return self._names_by_id.get(asset_info_id)
+
+    def get(self, name):
+        '''Return the data of node *name*, None if it does not exist'''
+        self._refresh()
+        data = self._nodes.get(name)
+        return dict(data) if data is not None else None
+
+    def put(self, name, data):
+        '''
+        Store the dictionary *data* as node *name*, return False if it was
+        already stored and nothing was written.
+        '''
+        data = dict(data)
+        self._refresh()
+        if self._nodes.get(name) == data:
+            return False
+        self._append([{'name': name, 'data': data}])
+        return True
+
+    def delete(self, name):
+        '''Delete node *name*, return True if it existed'''
+        return len(self.delete_many([name])) > 0
+
+    def delete_many(self, names):
+        '''Delete the nodes *names* in one write, return the deleted names'''
+        self._refresh()
+        deleted = [name for name in names if name in self._nodes]
+        if deleted:
+            self._append([{'name': name, 'deleted': True} for name in deleted])
+        return deleted
+
+    def compact(self):
+        '''
+        Rewrite the journal with one line per node, atomically. The journal
+        is read again under the file lock so lines appended meanwhile by
+        other editor instances are kept.
+        '''
+        # Migrate legacy files first, it appends under the lock
+        self._refresh()
+        with self._file_lock():
+            self._refresh()
+            temp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+            with open(temp_path, 'wb') as f:
+                for name, data in self._nodes.items():
+                    f.write(
+                        '{}\n'.format(
+                            json.dumps({'name': name, 'data': data})
+                        ).encode('utf-8')
+                    )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        self._reset()
+        self._refresh()
+
+
+_ftrack_node_stores = {}
+
+
+def get_ftrack_node_store():
+    '''Return the :class:`FtrackNodeStore` of the current Unreal project.'''
+    root_path = unreal_constants.FTRACK_ROOT_PATH
+    if root_path not in _ftrack_node_stores:
+        _ftrack_node_stores[root_path] = FtrackNodeStore(root_path)
+    return _ftrack_node_stores[root_path]
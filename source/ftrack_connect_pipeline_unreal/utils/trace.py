@@ -0,0 +1,288 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import json
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+import ftrack_connect_pipeline_unreal.constants as unreal_constants
+
+logger = logging.getLogger(__name__)
+
+# Timing of the hot paths of the integration, enabled by setting the
+# FTRACK_UNREAL_TRACE environment variable to 1
+
+MAX_TRACE_FILES = 50
+'''Maximum number of trace files kept in the traces folder'''
+
+
+class Span(object):
+    '''
+    Timed section *name* of *category*, with *args* exported along. Use as a
+    context manager, spans opened within are nested. When the outermost span
+    of a thread exits, :attr:`trace` holds the list of all spans recorded
+    within, as Chrome trace events, written to a trace file if *export* is
+    True.
+    '''
+
+    __slots__ = (
+        'name',
+        'category',
+        'args',
+        'export',
+        'start',
+        'duration',
+        'trace',
+    )
+
+    def __init__(self, name, category, args, export=False):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.export = export
+        self.start = None
+        self.duration = None
+        self.trace = None
+
+    def __enter__(self):
+        _tracer.begin(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _tracer.end(self)
+        return False
+
+
+class _NullSpan(object):
+    '''Span used when tracing is disabled, does nothing.'''
+
+    name = None
+    trace = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer(object):
+    '''
+    Records nested :class:`Span` per thread. Each finished outermost span is
+    passed to the listeners. The traces of outermost spans opened to be
+    exported, engine methods and plugin runs, are also written to a Chrome
+    trace file in the traces folder, see :func:`export_trace`.
+    '''
+
+    @property
+    def enabled(self):
+        '''Return True if spans are recorded'''
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        self._enabled = bool(value)
+
+    def __init__(self):
+        self._enabled = os.environ.get(
+            unreal_constants.TRACE_ENV, ''
+        ).lower() in ('1', 'true', 'yes', 'on')
+        self._local = threading.local()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        '''Call *callback* with each finished outermost span.'''
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        '''Stop calling *callback* on finished spans.'''
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def begin(self, span):
+        '''Open *span* in the current thread.'''
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        if not stack:
+            self._local.events = []
+        stack.append(span)
+        span.start = time.perf_counter()
+
+    def end(self, span):
+        '''Close *span*, the last span opened in the current thread.'''
+        span.duration = time.perf_counter() - span.start
+        stack = self._local.stack
+        stack.pop()
+        event = {
+            'name': span.name,
+            'cat': span.category,
+            'ph': 'X',
+            'ts': span.start * 1000000.0,
+            'dur': span.duration * 1000000.0,
+            'pid': os.getpid(),
+            'tid': threading.current_thread().ident,
+        }
+        if span.args:
+            event['args'] = dict(
+                (key, str(value)) for key, value in span.args.items()
+            )
+        self._local.events.append(event)
+        if stack:
+            return
+        span.trace = self._local.events
+        self._local.events = []
+        if not span.export:
+            for listener in list(self._listeners):
+                listener(span)
+            return
+        try:
+            export_trace(span.trace, span.name)
+        except Exception as error:
+            logger.warning('Could not export trace: {}'.format(error))
+        logger.debug(
+            'Trace of {}:\n{}'.format(
+                span.name, format_trace_summary(summarize_trace(span.trace))
+            )
+        )
+        for listener in list(self._listeners):
+            listener(span)
+
+
+_tracer = Tracer()
+
+
+def is_tracing_enabled():
+    '''Return True if spans are recorded.'''
+    return _tracer.enabled
+
+
+def enable_tracing(enabled=True):
+    '''Enable recording of spans if *enabled*, otherwise disable it.'''
+    _tracer.enabled = enabled
+
+
+def add_trace_listener(callback):
+    '''Call *callback* with each finished outermost :class:`Span`.'''
+    _tracer.add_listener(callback)
+
+
+def remove_trace_listener(callback):
+    '''Stop calling *callback* on finished spans.'''
+    _tracer.remove_listener(callback)
+
+
+def span(name, category='unreal', export=False, **args):
+    '''
+    Return a :class:`Span` context manager timing *name*, with *args*
+    recorded along. The trace is written to a file if *export* is True and
+    the span is the outermost one. Returns a shared no-op span when tracing
+    is disabled.
+    '''
+    if not _tracer.enabled:
+        return _NULL_SPAN
+    return Span(name, category, args, export=export)
+
+
+def traced(name=None, category='unreal'):
+    '''
+    Decorator timing the decorated function in a span named *name*, the
+    function qualified name if not given.
+    '''
+
+    def decorator(f):
+        span_name = name or '{}.{}'.format(
+            f.__module__.rsplit('.', 1)[-1], f.__name__
+        )
+
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not _tracer.enabled:
+                return f(*args, **kwargs)
+            with Span(span_name, category, None):
+                return f(*args, **kwargs)
+
+        return decorated
+
+    return decorator
+
+
+def get_traces_folder():
+    '''Return the folder holding trace files, created if needed.'''
+    traces_folder = os.path.join(
+        unreal_constants.FTRACK_ROOT_PATH,
+        unreal_constants.FTRACK_TRACES_FOLDER_NAME,
+    )
+    if not os.path.exists(traces_folder):
+        os.makedirs(traces_folder)
+    return traces_folder
+
+
+def export_trace(trace, name='trace', traces_folder=None):
+    '''
+    Write the span events of *trace* to a Chrome trace JSON file named after
+    *name* in *traces_folder*, the project traces folder if not given. Only
+    the last :data:`MAX_TRACE_FILES` files are kept. Returns the file path.
+    '''
+    if traces_folder is None:
+        traces_folder = get_traces_folder()
+    now = time.time()
+    trace_path = os.path.join(
+        traces_folder,
+        '{}.{:03d}_{}.json'.format(
+            time.strftime('%Y%m%d_%H%M%S', time.localtime(now)),
+            int(now * 1000) % 1000,
+            ''.join(c if c.isalnum() or c in '._-' else '_' for c in name),
+        ),
+    )
+    with open(trace_path, 'w') as trace_file:
+        json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, trace_file)
+    trace_filenames = sorted(
+        filename
+        for filename in os.listdir(traces_folder)
+        if filename.endswith('.json')
+    )
+    for filename in trace_filenames[:-MAX_TRACE_FILES]:
+        try:
+            os.remove(os.path.join(traces_folder, filename))
+        except OSError:
+            pass
+    return trace_path
+
+
+def summarize_trace(trace):
+    '''
+    Return a list of per span name dictionaries, with the number of calls,
+    total and maximum time in milliseconds, by decreasing total time.
+    '''
+    summary = {}
+    for event in trace:
+        item = summary.get(event['name'])
+        if item is None:
+            item = summary[event['name']] = {
+                'name': event['name'],
+                'count': 0,
+                'total': 0.0,
+                'max': 0.0,
+            }
+        duration = event['dur'] / 1000.0
+        item['count'] += 1
+        item['total'] += duration
+        item['max'] = max(item['max'], duration)
+    return sorted(summary.values(), key=lambda item: -item['total'])
+
+
+def format_trace_summary(summary):
+    '''Return the trace *summary* as text, one span name per line.'''
+    return '\n'.join(
+        '{}: {} call(s), {:.1f} ms total, {:.1f} ms max'.format(
+            item['name'], item['count'], item['total'], item['max']
+        )
+        for item in summary
+    )
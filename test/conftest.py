@@ -0,0 +1,38 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import os
+import sys
+import types
+
+import pytest
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_PATH = os.path.join(ROOT_PATH, 'source')
+FAKE_UNREAL_PATH = os.path.join(ROOT_PATH, 'benchmark', 'fake_unreal')
+
+# Tests run outside of the editor, against the in-memory stand-in of the
+# Unreal Python API shared with the benchmarks
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, FAKE_UNREAL_PATH)
+
+if not os.path.exists(
+    os.path.join(SOURCE_PATH, 'ftrack_connect_pipeline_unreal', '_version.py')
+):
+    # Not installed, the version module has not been generated
+    version_module = types.ModuleType(
+        'ftrack_connect_pipeline_unreal._version'
+    )
+    version_module.__version__ = '0.0.0'
+    sys.modules[version_module.__name__] = version_module
+
+
+@pytest.fixture()
+def unreal_project():
+    '''Return the fake unreal module, with an empty project.'''
+    import unreal
+
+    unreal.clear_assets()
+    unreal.set_latency()
+    unreal.reset_call_counts()
+    yield unreal
+    unreal.clear_assets()
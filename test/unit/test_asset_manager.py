@@ -0,0 +1,334 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import re
+import uuid
+
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline import constants as core_constants
+from ftrack_connect_pipeline.host.engine import AssetManagerEngine
+
+from ftrack_connect_pipeline_unreal import utils as unreal_utils
+from ftrack_connect_pipeline_unreal.cache import FtrackCache
+from ftrack_connect_pipeline_unreal.asset.dcc_object import UnrealDccObject
+from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+from ftrack_connect_pipeline_unreal.host.engine.asset_manager import (
+    UnrealAssetManagerEngine,
+)
+
+BROKEN_VERSION_ID = 'broken'
+
+
+class FakeEventManager(object):
+    session = None
+
+
+class FakeQueryResult(object):
+    def __init__(self, entities):
+        self._entities = entities
+
+    def all(self):
+        return list(self._entities)
+
+
+class FakeLocation(dict):
+    def get_filesystem_path(self, component):
+        if component['path'] is None:
+            raise Exception('Component not in location')
+        return component['path']
+
+
+class FakeSession(object):
+    '''Session resolving the asset versions in *versions* by id'''
+
+    server_url = 'https://ftrack.example.com'
+
+    def __init__(self, versions):
+        self.versions = versions
+        self.queries = []
+        self.offline = False
+        self.closed = False
+
+    def pick_location(self):
+        return FakeLocation(name='test.location')
+
+    def close(self):
+        self.closed = True
+
+    def query(self, expression):
+        if self.offline:
+            raise Exception('Server unreachable')
+        self.queries.append(expression)
+        ids = re.search(r'where id in \((.*)\)', expression).group(1)
+        return FakeQueryResult(
+            self.versions[version_id]
+            for version_id in re.findall(r'"([^"]+)"', ids)
+            if version_id in self.versions
+        )
+
+
+@pytest.fixture()
+def session(monkeypatch, tmpdir):
+    '''
+    Return a session resolving versions with a main component on disk,
+    used by the engine with an empty project ftrack cache.
+    '''
+    component_path = tmpdir.join('chair.fbx')
+    component_path.write('')
+    versions = dict(
+        (
+            version_id,
+            {
+                'id': version_id,
+                'components': [
+                    {'name': 'main', 'path': str(component_path)},
+                    {'name': 'proxy', 'path': None},
+                ],
+            },
+        )
+        for version_id in ['v{}'.format(index) for index in range(25)]
+    )
+    session = FakeSession(versions)
+    monkeypatch.setattr(FakeEventManager, 'session', session)
+    ftrack_cache = FtrackCache(str(tmpdir.join('cache')), session.server_url)
+    monkeypatch.setattr(
+        unreal_utils, 'get_project_ftrack_cache', lambda url: ftrack_cache
+    )
+    return session
+
+
+@pytest.fixture()
+def engine(unreal_project, session, monkeypatch):
+    '''Return an asset manager engine loading versions in the fake project.'''
+    # Assets added to the fake project are not broadcasted
+    unreal_utils.get_asset_metadata_index().clear()
+    engine = UnrealAssetManagerEngine(FakeEventManager(), ['unreal'], 'host')
+    engine.notified = []
+    monkeypatch.setattr(
+        engine,
+        '_notify_client',
+        lambda plugin, data: engine.notified.append(data),
+    )
+    monkeypatch.setattr(
+        engine,
+        '_check_new_version',
+        lambda asset_info, version_id, component_paths=None: None,
+    )
+
+    def change_version(self, asset_info, options, plugin=None):
+        # Remove the dcc object and load the new version, as the framework
+        unreal_utils.delete_ftrack_node(self.dcc_object.name)
+        if options['new_version_id'] == BROKEN_VERSION_ID:
+            return core_constants.ERROR_STATUS, {}
+        dcc_object = UnrealDccObject(name=self.dcc_object.name)
+        dcc_object.update(dict(asset_info, **{asset_const.VERSION_ID: 'new'}))
+        task = unreal_project.AssetImportTask()
+        task.destination_path, task.destination_name = asset_info[
+            'package_name'
+        ].rsplit('/', 1)
+        unreal_project.AssetToolsHelpers.get_asset_tools().import_asset_tasks(
+            [task]
+        )
+        dcc_object.connect_objects(task.imported_object_paths)
+        return core_constants.SUCCESS_STATUS, {}
+
+    monkeypatch.setattr(AssetManagerEngine, 'change_version', change_version)
+    return engine
+
+
+def create_asset(unreal_project, name):
+    '''Return the asset info of a loaded asset called *name*.'''
+    asset_info_id = uuid.uuid4().hex
+    asset_info = {
+        asset_const.ASSET_INFO_ID: asset_info_id,
+        asset_const.VERSION_ID: 'old',
+        'package_name': '/Game/Props/{}'.format(name),
+    }
+    unreal_project.add_asset(
+        asset_info['package_name'],
+        metadata={asset_const.NODE_METADATA_TAG: asset_info_id},
+    )
+    dcc_object = UnrealDccObject(
+        name='{}_ftrackdata_{}'.format(name, asset_info_id[:8])
+    )
+    dcc_object.update(asset_info)
+    return asset_info
+
+
+def test_partially_failing_batch(engine, unreal_project):
+    assets = [
+        create_asset(unreal_project, name)
+        for name in ('Chair', 'Table', 'Lamp')
+    ]
+    unreal_utils.invalidate_project_assets()
+    new_version_ids = {
+        assets[0][asset_const.ASSET_INFO_ID]: 'v2',
+        assets[1][asset_const.ASSET_INFO_ID]: BROKEN_VERSION_ID,
+        assets[2][asset_const.ASSET_INFO_ID]: 'v2',
+    }
+
+    statuses, unused_results = engine.change_versions(
+        assets, {'new_version_ids': new_version_ids}
+    )
+
+    assert [
+        statuses[asset[asset_const.ASSET_INFO_ID]] for asset in assets
+    ] == [
+        core_constants.SUCCESS_STATUS,
+        core_constants.ERROR_STATUS,
+        core_constants.SUCCESS_STATUS,
+    ]
+    # No previous version left renamed
+    assert sorted(unreal_project.EditorAssetLibrary.list_assets('/Game')) == [
+        '/Game/Props/Chair.Chair',
+        '/Game/Props/Lamp.Lamp',
+        '/Game/Props/Table.Table',
+    ]
+    for asset_info in assets:
+        asset_info_id = asset_info[asset_const.ASSET_INFO_ID]
+        dcc_object = UnrealDccObject(from_id=asset_info_id)
+        assert dcc_object.name is not None
+        assert unreal_utils.get_connected_nodes_from_dcc_object(
+            dcc_object.name
+        ) == [
+            '{}.{}'.format(
+                asset_info['package_name'],
+                asset_info['package_name'].rsplit('/', 1)[-1],
+            )
+        ]
+        version_id = UnrealDccObject.dictionary_from_object(dcc_object.name)[
+            asset_const.VERSION_ID
+        ]
+        if new_version_ids[asset_info_id] == BROKEN_VERSION_ID:
+            # The current version is left in place, connected
+            assert version_id == 'old'
+        else:
+            assert version_id == 'new'
+
+
+def test_new_versions_prefetched(engine, session, monkeypatch):
+    monkeypatch.delattr(engine, '_check_new_version')
+    monkeypatch.setattr(UnrealAssetManagerEngine, 'QUERY_CHUNK_SIZE', 10)
+    version_ids = ['v{}'.format(index) for index in range(25)]
+    engine._prefetch_component_paths(version_ids + ['v0', None, 'deleted'])
+    assert len(session.queries) == 3
+
+    asset_info = {asset_const.COMPONENT_NAME: 'main'}
+    for version_id in version_ids:
+        assert engine._check_new_version(asset_info, version_id) is None
+    assert len(session.queries) == 3
+
+    # Cached versions are not queried again
+    engine._prefetch_component_paths(version_ids)
+    assert len(session.queries) == 3
+
+
+def test_check_new_version(engine, session, monkeypatch):
+    monkeypatch.delattr(engine, '_check_new_version')
+    assert (
+        engine._check_new_version({asset_const.COMPONENT_NAME: 'main'}, 'v1')
+        is None
+    )
+    assert 'does not exist' in engine._check_new_version(
+        {asset_const.COMPONENT_NAME: 'main'}, 'deleted'
+    )
+    assert 'has no cache component' in engine._check_new_version(
+        {asset_const.COMPONENT_NAME: 'cache'}, 'v1'
+    )
+    assert 'not on disk' in engine._check_new_version(
+        {asset_const.COMPONENT_NAME: 'proxy'}, 'v1'
+    )
+
+
+def test_expired_cache_skipped(engine, session, unreal_project, monkeypatch):
+    monkeypatch.delattr(engine, '_check_new_version')
+    asset_info = create_asset(unreal_project, 'Chair')
+    asset_info[asset_const.COMPONENT_NAME] = 'main'
+    unreal_utils.invalidate_project_assets()
+    engine._prefetch_component_paths(['v1'])
+    monkeypatch.setattr(FtrackCache, 'TTLS', {FtrackCache.ASSET_VERSION: -1})
+    session.offline = True
+
+    asset_info_id = asset_info[asset_const.ASSET_INFO_ID]
+    statuses, unused_results = engine.change_versions(
+        [asset_info], {'new_version_ids': {asset_info_id: 'v1'}}
+    )
+
+    assert statuses[asset_info_id] == core_constants.ERROR_STATUS
+    assert 'expired' in engine.notified[-1]['message']
+    # The current version is left untouched
+    assert unreal_project.EditorAssetLibrary.list_assets('/Game') == [
+        '/Game/Props/Chair.Chair'
+    ]
+    dcc_object = UnrealDccObject(from_id=asset_info_id)
+    assert (
+        UnrealDccObject.dictionary_from_object(dcc_object.name)[
+            asset_const.VERSION_ID
+        ]
+        == 'old'
+    )
+
+
+def test_change_version_jobs(engine, session, unreal_project, monkeypatch):
+    monkeypatch.delattr(engine, '_check_new_version')
+    job_sessions = []
+
+    def create_session():
+        job_session = FakeSession(session.versions)
+        job_sessions.append(job_session)
+        return job_session
+
+    monkeypatch.setattr(
+        engine, '_create_job_session_factory', lambda: create_session
+    )
+    assets = [
+        create_asset(unreal_project, name) for name in ('Chair', 'Table')
+    ]
+    for asset_info in assets:
+        asset_info[asset_const.COMPONENT_NAME] = 'main'
+    unreal_utils.invalidate_project_assets()
+    new_version_ids = {
+        assets[0][asset_const.ASSET_INFO_ID]: 'v1',
+        assets[1][asset_const.ASSET_INFO_ID]: 'deleted',
+    }
+
+    statuses, results = engine.submit_jobs(
+        assets,
+        {'method': 'change_version', 'new_version_ids': new_version_ids},
+    )
+
+    # Without a running dispatcher, the jobs have run already
+    asset_info_ids = [asset[asset_const.ASSET_INFO_ID] for asset in assets]
+    assert [results[id_value]['state'] for id_value in asset_info_ids] == [
+        'done',
+        'failed',
+    ]
+    assert 'does not exist' in results[asset_info_ids[1]]['message']
+    assert results[asset_info_ids[1]]['progress'] == 1.0
+    # Versions are resolved by the job sessions only, then closed
+    assert session.queries == []
+    assert len(job_sessions) >= 1
+    assert all(job_session.closed for job_session in job_sessions)
+    assert sum(len(job_session.queries) for job_session in job_sessions) == 2
+    version_id = UnrealDccObject.dictionary_from_object(
+        UnrealDccObject(from_id=asset_info_ids[0]).name
+    )[asset_const.VERSION_ID]
+    assert version_id == 'new'
+    # Job changes are reported with the batch progress
+    progress = [
+        data['result']['progress']
+        for data in engine.notified
+        if data['method'] == 'submit_jobs'
+    ]
+    assert progress[-1] == 1.0
+
+    statuses, results = engine.get_jobs(assets[:1])
+    assert list(results) == asset_info_ids[:1]
+    assert engine.cancel_jobs() == ({}, {})
+
+
+def test_job_method_checked(engine):
+    with pytest.raises(Exception, match='cannot run as a job'):
+        engine.submit_jobs([], {'method': 'discover_assets'})
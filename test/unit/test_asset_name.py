@@ -0,0 +1,75 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import threading
+
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline_unreal import utils as unreal_utils
+
+DESTINATION_PATH = '/Game/Props'
+
+
+@pytest.fixture()
+def content_dir(unreal_project, tmpdir):
+    '''Return the content folder on disk, with an empty Props folder.'''
+    tmpdir.mkdir('Props')
+    unreal_utils.invalidate_project_assets()
+    return str(tmpdir)
+
+
+def allocate(base_name, content_dir):
+    return unreal_utils.allocate_asset_name(
+        DESTINATION_PATH, base_name, root_content_dir=content_dir
+    )
+
+
+def test_free_base_name(content_dir):
+    assert allocate('Chair', content_dir) == 'Chair'
+
+
+def test_first_free_index(unreal_project, content_dir):
+    unreal_project.add_asset('/Game/Props/Chair')
+    unreal_project.add_asset('/Game/Props/chair_3')
+    unreal_utils.invalidate_project_assets()
+    assert allocate('Chair', content_dir) == 'Chair_2'
+
+
+def test_other_names_and_folders_ignored(unreal_project, content_dir):
+    unreal_project.add_asset('/Game/Props/ChairLeg')
+    unreal_project.add_asset('/Game/Props/Chair_Old')
+    unreal_project.add_asset('/Game/Props/Sub/Chair')
+    unreal_utils.invalidate_project_assets()
+    assert allocate('Chair', content_dir) == 'Chair'
+
+
+def test_files_on_disk_not_in_registry(content_dir, tmpdir):
+    tmpdir.join('Props', 'Chair.uasset').write('')
+    tmpdir.join('Props', 'Chair_2.uasset').write('')
+    assert allocate('Chair', content_dir) == 'Chair_3'
+
+
+def test_reserved_within_batch(content_dir):
+    with unreal_utils.batch_import():
+        assert allocate('Chair', content_dir) == 'Chair'
+        assert allocate('Chair', content_dir) == 'Chair_2'
+    # Released when the batch ends
+    assert allocate('Chair', content_dir) == 'Chair'
+    assert allocate('Chair', content_dir) == 'Chair'
+
+
+def test_unique_between_threads(content_dir):
+    names = []
+
+    def allocate_names():
+        for _ in range(50):
+            names.append(allocate('Chair', content_dir))
+
+    with unreal_utils.batch_import():
+        threads = [threading.Thread(target=allocate_names) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(set(names)) == 200
@@ -0,0 +1,170 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import json
+import os
+import threading
+
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline_unreal import cache as ftrack_cache
+from ftrack_connect_pipeline_unreal.cache import FtrackCache
+
+SERVER_URL = 'https://ftrack.example.com/'
+
+
+class Clock(object):
+    '''Clock moved forward by the tests'''
+
+    def __init__(self):
+        self.now = 1000000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ftrack_cache.time, 'time', clock.time)
+    return clock
+
+
+def create_cache(tmpdir):
+    return FtrackCache(str(tmpdir.join('cache')), SERVER_URL)
+
+
+def read_file(cache, kind):
+    with open(os.path.join(cache.path, '{}.json'.format(kind)), 'r') as f:
+        return json.load(f)
+
+
+def test_per_server_folder(tmpdir):
+    cache = create_cache(tmpdir)
+    other_cache = FtrackCache(
+        str(tmpdir.join('cache')), 'https://other.example.com'
+    )
+    assert cache.server_url == 'https://ftrack.example.com'
+    assert cache.path != other_cache.path
+    cache.set(FtrackCache.CONTEXT, 'id', {'fps': 24})
+    assert other_cache.get(FtrackCache.CONTEXT, 'id') is None
+
+
+def test_time_to_live(tmpdir, clock):
+    cache = create_cache(tmpdir)
+    cache.set(FtrackCache.CONTEXT, 'id', {'fps': 24})
+    cache.set(FtrackCache.ASSET_VERSION, 'id', {'main': '/path'})
+    clock.now += FtrackCache.TTLS[FtrackCache.CONTEXT] + 1
+    assert cache.get(FtrackCache.CONTEXT, 'id') is None
+    assert cache.get(FtrackCache.ASSET_VERSION, 'id') == {'main': '/path'}
+    clock.now += FtrackCache.TTLS[FtrackCache.ASSET_VERSION]
+    assert cache.get(FtrackCache.ASSET_VERSION, 'id') is None
+
+
+def test_stale(tmpdir, clock):
+    cache = create_cache(tmpdir)
+    cache.set(FtrackCache.CONTEXT, 'id', {'fps': 24})
+    clock.now += FtrackCache.TTLS[FtrackCache.CONTEXT] + 1
+    assert cache.get(FtrackCache.CONTEXT, 'id', stale=True) == {'fps': 24}
+    assert cache.get(FtrackCache.CONTEXT, 'other', stale=True) is None
+
+
+def test_shared_between_sessions(tmpdir):
+    cache = create_cache(tmpdir)
+    cache.set(FtrackCache.ASSET_VERSION, 'a', 1)
+    # Another editor session, writing meanwhile
+    other_cache = create_cache(tmpdir)
+    assert other_cache.get(FtrackCache.ASSET_VERSION, 'a') == 1
+    other_cache.set(FtrackCache.ASSET_VERSION, 'b', 2)
+    cache.update(FtrackCache.ASSET_VERSION, {'c': 3, 'd': 4})
+    assert cache.get(FtrackCache.ASSET_VERSION, 'b') == 2
+    assert sorted(read_file(cache, FtrackCache.ASSET_VERSION)) == [
+        'a',
+        'b',
+        'c',
+        'd',
+    ]
+
+
+def test_kept_in_memory_if_not_written(tmpdir, monkeypatch):
+    cache = create_cache(tmpdir)
+
+    def fail(kind, entries):
+        raise IOError('Read-only file system')
+
+    monkeypatch.setattr(cache, '_write', fail)
+    cache.set(FtrackCache.CONTEXT, 'id', {'fps': 24})
+    assert cache.get(FtrackCache.CONTEXT, 'id') == {'fps': 24}
+    assert create_cache(tmpdir).get(FtrackCache.CONTEXT, 'id') is None
+
+
+def test_invalidate(tmpdir):
+    cache = create_cache(tmpdir)
+    cache.update(FtrackCache.ASSET_VERSION, {'a': 1, 'b': 2})
+    cache.set(FtrackCache.CONTEXT, 'id', {'fps': 24})
+    schema_path = os.path.join(
+        cache.schema_cache_path, ftrack_cache.SCHEMA_CACHE_FILE_NAME
+    )
+    with open(schema_path, 'w') as f:
+        f.write('[]')
+
+    cache.invalidate(FtrackCache.ASSET_VERSION, 'a')
+    assert cache.get(FtrackCache.ASSET_VERSION, 'a') is None
+    assert cache.get(FtrackCache.ASSET_VERSION, 'b') == 2
+    assert list(read_file(cache, FtrackCache.ASSET_VERSION)) == ['b']
+
+    cache.invalidate(FtrackCache.ASSET_VERSION)
+    assert cache.get(FtrackCache.ASSET_VERSION, 'b') is None
+    assert cache.get(FtrackCache.CONTEXT, 'id') == {'fps': 24}
+
+    cache.invalidate(FtrackCache.SCHEMA)
+    assert not os.path.exists(schema_path)
+    assert cache.get(FtrackCache.CONTEXT, 'id') == {'fps': 24}
+
+    cache.invalidate()
+    assert not os.path.exists(cache.path)
+    assert cache.get(FtrackCache.CONTEXT, 'id') is None
+
+
+def test_unreadable_file_discarded(tmpdir):
+    cache = create_cache(tmpdir)
+    cache.set(FtrackCache.CONTEXT, 'id', {'fps': 24})
+    with open(os.path.join(cache.path, 'context.json'), 'w') as f:
+        f.write('{')
+    other_cache = create_cache(tmpdir)
+    assert other_cache.get(FtrackCache.CONTEXT, 'id') is None
+    other_cache.set(FtrackCache.CONTEXT, 'other', {'fps': 25})
+    assert list(read_file(other_cache, FtrackCache.CONTEXT)) == ['other']
+
+
+def test_concurrent_updates(tmpdir):
+    cache = create_cache(tmpdir)
+
+    def set_values(thread_index):
+        for index in range(20):
+            cache.set(
+                FtrackCache.ASSET_VERSION,
+                '{}_{}'.format(thread_index, index),
+                index,
+            )
+
+    threads = [
+        threading.Thread(target=set_values, args=(thread_index,))
+        for thread_index in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(read_file(cache, FtrackCache.ASSET_VERSION)) == 80
+
+
+def test_shared_instances(tmpdir):
+    root_path = str(tmpdir.join('cache'))
+    cache = ftrack_cache.get_ftrack_cache(root_path, SERVER_URL)
+    assert ftrack_cache.get_ftrack_cache(root_path, SERVER_URL) is cache
+    assert (
+        ftrack_cache.get_ftrack_cache(root_path, SERVER_URL.rstrip('/'))
+        is cache
+    )
@@ -0,0 +1,83 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import uuid
+
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline_unreal import utils as unreal_utils
+from ftrack_connect_pipeline_unreal.asset.dcc_object import UnrealDccObject
+from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+from ftrack_connect_pipeline_unreal.utils.store import FtrackNodeStore
+
+
+@pytest.fixture()
+def appends(monkeypatch):
+    '''Return the list of record batches written to the node store.'''
+    written = []
+    append = FtrackNodeStore._append
+
+    def counting_append(store, records):
+        written.append(records)
+        return append(store, records)
+
+    monkeypatch.setattr(FtrackNodeStore, '_append', counting_append)
+    return written
+
+
+def create_dcc_object():
+    return UnrealDccObject(
+        name='Asset_ftrackdata_{}'.format(uuid.uuid4().hex[:8])
+    )
+
+
+def test_setitem_writes_at_once(unreal_project, appends):
+    dcc_object = create_dcc_object()
+    del appends[:]
+    dcc_object[asset_const.ASSET_INFO_ID] = 'id'
+    assert len(appends) == 1
+    assert unreal_utils.get_ftrack_node_store().get(dcc_object.name) == {
+        asset_const.ASSET_INFO_ID: 'id'
+    }
+
+
+def test_batch_update_writes_once(unreal_project, appends):
+    dcc_object = create_dcc_object()
+    del appends[:]
+    with dcc_object.batch_update():
+        dcc_object[asset_const.ASSET_INFO_ID] = 'id'
+        with dcc_object.batch_update():
+            dcc_object[asset_const.VERSION_ID] = 'version'
+        assert appends == []
+        dcc_object[asset_const.ASSET_NAME] = 'name'
+    assert len(appends) == 1
+    assert unreal_utils.get_ftrack_node_store().get(dcc_object.name) == {
+        asset_const.ASSET_INFO_ID: 'id',
+        asset_const.VERSION_ID: 'version',
+        asset_const.ASSET_NAME: 'name',
+    }
+
+
+def test_update_writes_once(unreal_project, appends):
+    dcc_object = create_dcc_object()
+    del appends[:]
+    dcc_object.update(
+        {asset_const.ASSET_INFO_ID: 'id', asset_const.VERSION_ID: 'version'}
+    )
+    assert len(appends) == 1
+
+
+def test_unchanged_data_is_not_written(unreal_project, appends):
+    dcc_object = create_dcc_object()
+    dcc_object[asset_const.ASSET_INFO_ID] = 'id'
+    del appends[:]
+    dcc_object[asset_const.ASSET_INFO_ID] = 'id'
+    assert appends == []
+
+
+def test_from_id_finds_written_object(unreal_project):
+    dcc_object = create_dcc_object()
+    asset_info_id = uuid.uuid4().hex
+    dcc_object[asset_const.ASSET_INFO_ID] = asset_info_id
+    assert UnrealDccObject(from_id=asset_info_id).name == dcc_object.name
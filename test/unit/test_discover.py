@@ -0,0 +1,134 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import importlib.util
+import os
+import threading
+
+import pytest
+
+pytest.importorskip('ftrack_api')
+
+from ftrack_connect_pipeline_unreal.cache import FtrackCache, get_ftrack_cache
+
+HOOK_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'hook',
+    'discover_unreal.py',
+)
+
+CONTEXT_ID = 'context'
+
+
+class FakeEntity(dict):
+    entity_type = 'Task'
+
+
+class FakeConnectSession(object):
+    '''The Connect session, must not be queried from another thread'''
+
+    server_url = 'https://ftrack.example.com'
+    api_key = 'key'
+    api_user = 'user'
+
+    def get(self, entity_type, entity_id):
+        raise AssertionError('Connect session queried')
+
+
+class FakeSession(object):
+    '''Session of the hook worker, created with *kwargs*'''
+
+    sessions = []
+    error = None
+    release = None
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = False
+        self.thread = None
+        self.sessions.append(self)
+
+    def get(self, entity_type, entity_id):
+        self.thread = threading.current_thread()
+        if self.release is not None:
+            self.release.wait(5.0)
+        if self.error is not None:
+            raise self.error
+        entity = FakeEntity()
+        entity['parent'] = {
+            'custom_attributes': {'fstart': 1001, 'fend': 1100, 'fps': 25}
+        }
+        return entity
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture()
+def hook(monkeypatch, tmpdir):
+    '''Return the launch hook module, caching in a temporary folder.'''
+    spec = importlib.util.spec_from_file_location('discover_unreal', HOOK_PATH)
+    hook = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(hook)
+    monkeypatch.setattr(hook, 'cache_root_path', str(tmpdir))
+    monkeypatch.setattr(hook.ftrack_api, 'Session', FakeSession)
+    monkeypatch.setattr(FakeSession, 'sessions', [])
+    return hook
+
+
+def get_cache(hook):
+    return get_ftrack_cache(
+        hook.cache_root_path, FakeConnectSession.server_url
+    )
+
+
+def test_queried_with_own_session(hook):
+    context_data = hook.get_context_data(FakeConnectSession(), CONTEXT_ID)
+    assert context_data == {
+        'entity_type': 'Task',
+        'fstart': '1001',
+        'fend': '1100',
+        'fps': '25',
+    }
+    (session,) = FakeSession.sessions
+    assert session.closed
+    assert session.thread is not threading.current_thread()
+    assert session.kwargs['server_url'] == FakeConnectSession.server_url
+    assert session.kwargs['api_user'] == FakeConnectSession.api_user
+    assert session.kwargs['auto_connect_event_hub'] is False
+    assert session.kwargs['schema_cache_path'] == (
+        get_cache(hook).schema_cache_path
+    )
+    assert get_cache(hook).get(FtrackCache.CONTEXT, CONTEXT_ID) == (
+        context_data
+    )
+
+
+def test_cached_data_on_failure(hook, monkeypatch):
+    context_data = hook.get_context_data(FakeConnectSession(), CONTEXT_ID)
+    monkeypatch.setattr(FakeSession, 'error', Exception('Server error'))
+    monkeypatch.setattr(FtrackCache, 'TTLS', {FtrackCache.CONTEXT: -1})
+    assert (
+        hook.get_context_data(FakeConnectSession(), CONTEXT_ID) == context_data
+    )
+    assert all(session.closed for session in FakeSession.sessions)
+
+
+def test_cached_data_on_timeout(hook, monkeypatch):
+    context_data = hook.get_context_data(FakeConnectSession(), CONTEXT_ID)
+    release = threading.Event()
+    monkeypatch.setattr(FakeSession, 'release', release)
+    monkeypatch.setattr(hook, 'context_query_timeout', 0.05)
+    try:
+        assert (
+            hook.get_context_data(FakeConnectSession(), CONTEXT_ID)
+            == context_data
+        )
+    finally:
+        release.set()
+
+
+def test_nothing_cached(hook, monkeypatch):
+    monkeypatch.setattr(FakeSession, 'error', Exception('Server error'))
+    with pytest.raises(Exception, match='Server error'):
+        hook.get_context_data(FakeConnectSession(), CONTEXT_ID)
+    assert get_cache(hook).get(FtrackCache.CONTEXT, CONTEXT_ID) is None
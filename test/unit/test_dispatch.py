@@ -0,0 +1,114 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline_unreal.utils import dispatch
+
+
+@pytest.fixture()
+def dispatcher(unreal_project, monkeypatch):
+    '''Return a started dispatcher, shared by run_in_main_thread.'''
+    dispatcher = dispatch.MainThreadDispatcher()
+    monkeypatch.setattr(dispatch, '_main_thread_dispatcher', dispatcher)
+    dispatcher.start()
+    yield dispatcher
+    dispatcher.stop()
+
+
+def run_in_thread(function):
+    '''Run *function* in a thread, return the thread and its result.'''
+    result = {}
+
+    def target():
+        try:
+            result['value'] = function()
+        except Exception as error:
+            result['error'] = error
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, result
+
+
+def tick_until(unreal, condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        unreal.tick()
+        time.sleep(0.001)
+
+
+def test_main_thread_runs_inline(dispatcher):
+    future = dispatcher.submit(threading.current_thread)
+    assert future.result(timeout=0) is threading.main_thread()
+    assert dispatcher.pending == 0
+
+
+def test_worker_calls_run_on_tick(dispatcher, unreal_project):
+    thread, result = run_in_thread(
+        lambda: dispatch.run_in_main_thread(threading.current_thread)()
+    )
+    tick_until(unreal_project, lambda: not thread.is_alive())
+    assert result == {'value': threading.main_thread()}
+
+
+def test_exception_is_raised_in_worker(dispatcher, unreal_project):
+    def fail():
+        raise ValueError('failed')
+
+    thread, result = run_in_thread(dispatch.run_in_main_thread(fail))
+    tick_until(unreal_project, lambda: not thread.is_alive())
+    assert isinstance(result['error'], ValueError)
+
+
+def test_stop_resolves_all_submitted(dispatcher):
+    futures = []
+
+    def submit():
+        for index in range(500):
+            futures.append(dispatcher.submit(lambda value=index: value))
+
+    threads = [threading.Thread(target=submit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.001)
+    dispatcher.stop()
+    for thread in threads:
+        thread.join()
+    # Queued before the stop are drained by it, after run in the worker
+    assert len(futures) == 2000
+    assert all(future.done() for future in futures)
+    assert dispatcher.pending == 0
+
+
+def test_timeout_cancels_queued_call(dispatcher, unreal_project, monkeypatch):
+    monkeypatch.setattr(dispatch, 'MAIN_THREAD_TIMEOUT', 0.05)
+    calls = []
+    thread, result = run_in_thread(
+        dispatch.run_in_main_thread(lambda: calls.append(True))
+    )
+    # The editor does not tick
+    thread.join(5.0)
+    assert not thread.is_alive()
+    assert 'Timed out' in str(result['error'])
+    unreal_project.tick()
+    assert calls == []
+
+
+def test_running_call_is_waited_for(dispatcher, unreal_project, monkeypatch):
+    monkeypatch.setattr(dispatch, 'MAIN_THREAD_TIMEOUT', 0.1)
+
+    def slow():
+        time.sleep(0.4)
+        return 'done'
+
+    thread, result = run_in_thread(dispatch.run_in_main_thread(slow))
+    tick_until(unreal_project, lambda: dispatcher.pending > 0)
+    unreal_project.tick()
+    thread.join(5.0)
+    assert result == {'value': 'done'}
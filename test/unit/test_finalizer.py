@@ -0,0 +1,102 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import logging
+import re
+
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline_unreal import utils as unreal_utils
+from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+from ftrack_connect_pipeline_unreal.plugin.publish.finalizer import (
+    UnrealPublisherFinalizerPlugin,
+)
+from ftrack_connect_pipeline_unreal.utils.store import FtrackNodeStore
+
+
+class FakeQueryResult(object):
+    def __init__(self, entities):
+        self._entities = entities
+
+    def all(self):
+        return list(self._entities)
+
+
+class FakeSession(object):
+    '''Session resolving asset versions of the known *version_ids*'''
+
+    def __init__(self, version_ids):
+        self.version_ids = set(version_ids)
+        self.queries = []
+
+    def query(self, expression):
+        self.queries.append(expression)
+        ids = re.search(r'where id in \((.*)\)', expression).group(1)
+        return FakeQueryResult(
+            {'id': version_id}
+            for version_id in re.findall(r'"([^"]+)"', ids)
+            if version_id in self.version_ids
+        )
+
+
+@pytest.fixture()
+def node_store(unreal_project, monkeypatch, tmpdir):
+    '''Return an empty ftrack node store, used by the finalizer.'''
+    node_store = FtrackNodeStore(str(tmpdir.join('ftrack')))
+    monkeypatch.setattr(
+        unreal_utils, 'get_ftrack_node_store', lambda: node_store
+    )
+    return node_store
+
+
+def create_finalizer(monkeypatch, session):
+    monkeypatch.setattr(
+        UnrealPublisherFinalizerPlugin, 'session', session, raising=False
+    )
+    finalizer = UnrealPublisherFinalizerPlugin.__new__(
+        UnrealPublisherFinalizerPlugin
+    )
+    finalizer.logger = logging.getLogger(__name__)
+    return finalizer
+
+
+def test_unique_versions_in_order(node_store, monkeypatch):
+    for index, version_id in enumerate(['b', 'a', 'b', 'c', 'a']):
+        node_store.put(
+            'node_{}'.format(index), {asset_const.VERSION_ID: version_id}
+        )
+    node_store.put('node_unversioned', {asset_const.ASSET_INFO_ID: 'id'})
+    session = FakeSession(['a', 'b', 'c'])
+    finalizer = create_finalizer(monkeypatch, session)
+    dependencies = finalizer.collect_version_dependencies()
+    assert [version['id'] for version in dependencies] == ['b', 'a', 'c']
+    assert len(session.queries) == 1
+
+
+def test_chunked_queries(node_store, monkeypatch):
+    monkeypatch.setattr(UnrealPublisherFinalizerPlugin, 'QUERY_CHUNK_SIZE', 10)
+    version_ids = ['v{}'.format(index) for index in range(25)]
+    for version_id in version_ids:
+        node_store.put(version_id, {asset_const.VERSION_ID: version_id})
+    session = FakeSession(version_ids)
+    finalizer = create_finalizer(monkeypatch, session)
+    dependencies = finalizer.collect_version_dependencies()
+    assert [version['id'] for version in dependencies] == version_ids
+    assert len(session.queries) == 3
+
+
+def test_missing_versions_skipped(node_store, monkeypatch):
+    node_store.put('node_a', {asset_const.VERSION_ID: 'a'})
+    node_store.put('node_deleted', {asset_const.VERSION_ID: 'deleted'})
+    session = FakeSession(['a'])
+    finalizer = create_finalizer(monkeypatch, session)
+    dependencies = finalizer.collect_version_dependencies()
+    assert [version['id'] for version in dependencies] == ['a']
+
+
+def test_no_dependencies_no_query(node_store, monkeypatch):
+    session = FakeSession([])
+    finalizer = create_finalizer(monkeypatch, session)
+    assert finalizer.collect_version_dependencies() == []
+    assert session.queries == []
@@ -0,0 +1,143 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import struct
+
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline_unreal.utils import media
+
+
+def exr_data(width=8, height=4, comment_size=0, truncate=False):
+    '''Return a flat scan line OpenEXR image, uncompressed.'''
+
+    def attribute(name, type_name, value):
+        return (
+            name.encode()
+            + b'\0'
+            + type_name.encode()
+            + b'\0'
+            + struct.pack('<i', len(value))
+            + value
+        )
+
+    channels = b''.join(
+        name + b'\0' + struct.pack('<iB3xii', 1, 0, 1, 1)
+        for name in (b'B', b'G', b'R')
+    )
+    header = b'\x76\x2f\x31\x01' + struct.pack('<I', 2)
+    header += attribute('channels', 'chlist', channels + b'\0')
+    header += attribute('compression', 'compression', b'\0')
+    header += attribute(
+        'dataWindow', 'box2i', struct.pack('<4i', 0, 0, width - 1, height - 1)
+    )
+    if comment_size:
+        header += attribute('comments', 'string', b'x' * comment_size)
+    header += b'\0'
+    chunk_size = 8 + width * 3 * 2
+    first_offset = len(header) + 8 * height
+    offsets = struct.pack(
+        '<{}Q'.format(height),
+        *[first_offset + line * chunk_size for line in range(height)]
+    )
+    data = header + offsets + b'\0' * chunk_size * height
+    if truncate:
+        data = data[: first_offset + chunk_size]
+    return data
+
+
+def jpeg_data(width=16, height=8, padding=0, truncate=False):
+    '''Return a JPEG image, with *padding* bytes of APP segments first.'''
+    data = b'\xff\xd8'
+    while padding > 0:
+        size = min(padding, 60000)
+        data += b'\xff\xe1' + struct.pack('>H', size + 2) + b'\0' * size
+        padding -= size
+    data += (
+        b'\xff\xc0'
+        + struct.pack('>HBHHB', 17, 8, height, width, 3)
+        + b'\0' * 9
+    )
+    data += b'\xff\xda' + struct.pack('>H', 12) + b'\0' * 10 + b'\x55' * 64
+    if not truncate:
+        data += b'\xff\xd9'
+    return data
+
+
+def png_data(width=4, height=2):
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + struct.pack('>I', len(ihdr))
+        + b'IHDR'
+        + ihdr
+        + b'\0' * 4
+        + struct.pack('>I', 0)
+        + b'IEND'
+        + b'\0' * 4
+    )
+
+
+def write(tmpdir, name, data):
+    path = tmpdir.join(name)
+    path.write_binary(data)
+    return str(path)
+
+
+def test_exr_header(tmpdir):
+    path = write(tmpdir, 'image.exr', exr_data())
+    assert media.read_image_header(path) == (8, 4, 'B:half,G:half,R:half')
+
+
+def test_exr_large_header(tmpdir):
+    data = exr_data(comment_size=3 * media.HEADER_READ_SIZE)
+    path = write(tmpdir, 'image.exr', data)
+    assert media.read_image_header(path) == (8, 4, 'B:half,G:half,R:half')
+
+
+def test_exr_truncated(tmpdir):
+    path = write(tmpdir, 'image.exr', exr_data(truncate=True))
+    with pytest.raises(Exception, match='Truncated'):
+        media.read_image_header(path)
+
+
+def test_jpeg_header(tmpdir):
+    path = write(tmpdir, 'image.jpg', jpeg_data())
+    assert media.read_image_header(path) == (16, 8, '3:8')
+
+
+def test_jpeg_large_header(tmpdir):
+    data = jpeg_data(padding=2 * media.HEADER_READ_SIZE)
+    path = write(tmpdir, 'image.jpeg', data)
+    assert media.read_image_header(path) == (16, 8, '3:8')
+
+
+def test_jpeg_truncated(tmpdir):
+    path = write(tmpdir, 'image.jpg', jpeg_data(truncate=True))
+    with pytest.raises(Exception, match='Truncated'):
+        media.read_image_header(path)
+
+
+def test_png_header(tmpdir):
+    path = write(tmpdir, 'image.png', png_data())
+    assert media.read_image_header(path) == (4, 2, '6:8')
+
+
+def test_empty_and_unsupported(tmpdir):
+    with pytest.raises(Exception, match='Empty'):
+        media.read_image_header(write(tmpdir, 'image.exr', b''))
+    assert media.read_image_header(write(tmpdir, 'image.tga', b'\0')) is None
+
+
+def test_check_image_sequence(tmpdir):
+    for frame in (1, 2, 4):
+        write(tmpdir, 'shot.{:04d}.exr'.format(frame), exr_data())
+    write(tmpdir, 'shot.0005.exr', exr_data(truncate=True))
+    sequence = '{} [1-2, 4-5]'.format(tmpdir.join('shot.%04d.exr'))
+    results = list(media.check_image_sequence(sequence, max_workers=2))
+    assert [frame for frame, _, _, _ in results] == [1, 2, 3, 4, 5]
+    errors = dict((frame, error) for frame, _, _, error in results)
+    assert errors[1] is None and errors[2] is None and errors[4] is None
+    assert errors[3] == 'Missing frame'
+    assert 'Truncated' in errors[5]
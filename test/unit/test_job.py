@@ -0,0 +1,193 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline import constants as core_constants
+
+from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+from ftrack_connect_pipeline_unreal.host.engine.job import (
+    AssetJob,
+    AssetJobRunner,
+)
+from ftrack_connect_pipeline_unreal.utils import dispatch
+
+
+class FakeSession(object):
+    '''Session of a job worker thread'''
+
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture()
+def dispatcher(unreal_project, monkeypatch):
+    '''Return a started dispatcher, run by the fake editor ticks.'''
+    dispatcher = dispatch.MainThreadDispatcher()
+    monkeypatch.setattr(dispatch, '_main_thread_dispatcher', dispatcher)
+    dispatcher.start()
+    yield dispatcher
+    dispatcher.stop()
+
+
+def create_job(name, execute=None, prepare=None):
+    def default_execute(prepared):
+        return core_constants.SUCCESS_STATUS, {'prepared': prepared}
+
+    return AssetJob(
+        'select_asset',
+        {asset_const.ASSET_INFO_ID: name},
+        {},
+        execute or default_execute,
+        prepare,
+    )
+
+
+def run_jobs(runner, unreal, timeout=5.0):
+    '''Start *runner* and tick the editor until all jobs have finished.'''
+    runner.start()
+    deadline = time.time() + timeout
+    while not runner.wait(0.001):
+        assert time.time() < deadline
+        unreal.tick()
+
+
+def test_states_and_progress(dispatcher, unreal_project):
+    changes = []
+
+    def fail(prepared):
+        raise Exception('Failed')
+
+    jobs = [
+        create_job('a'),
+        create_job('b', execute=fail),
+        create_job(
+            'c',
+            execute=lambda prepared: (core_constants.ERROR_STATUS, {}),
+        ),
+    ]
+    runner = AssetJobRunner(
+        jobs,
+        on_job_changed=lambda job, progress: changes.append(
+            (job.asset_info_id, job.state, progress)
+        ),
+    )
+    run_jobs(runner, unreal_project)
+    assert [job.state for job in jobs] == [
+        AssetJob.DONE,
+        AssetJob.FAILED,
+        AssetJob.FAILED,
+    ]
+    assert 'Failed' in jobs[1].message
+    assert jobs[1].status == core_constants.ERROR_STATUS
+    assert changes[3:] == [
+        ('a', AssetJob.RUNNING, 0.0),
+        ('a', AssetJob.DONE, 1.0 / 3),
+        ('b', AssetJob.RUNNING, 1.0 / 3),
+        ('b', AssetJob.FAILED, 2.0 / 3),
+        ('c', AssetJob.RUNNING, 2.0 / 3),
+        ('c', AssetJob.FAILED, 1.0),
+    ]
+    assert runner.finished
+
+
+def test_prepared_on_workers_executed_on_main_thread(
+    dispatcher, unreal_project
+):
+    prepare_threads = []
+    execute_threads = []
+
+    def prepare(name, session):
+        prepare_threads.append(threading.current_thread())
+        assert session.thread is threading.current_thread()
+        return name.upper(), session
+
+    def execute(prepared):
+        execute_threads.append(threading.current_thread())
+        return core_constants.SUCCESS_STATUS, prepared
+
+    jobs = [
+        create_job(
+            name,
+            execute=execute,
+            prepare=lambda session, name=name: prepare(name, session),
+        )
+        for name in ('a', 'b', 'c', 'd', 'e', 'f')
+    ]
+    runner = AssetJobRunner(jobs, session_factory=FakeSession)
+    run_jobs(runner, unreal_project)
+
+    assert [job.result[0] for job in jobs] == ['A', 'B', 'C', 'D', 'E', 'F']
+    assert threading.main_thread() not in prepare_threads
+    assert set(execute_threads) == set([threading.main_thread()])
+    # One session per worker thread, closed at the end
+    sessions = set(job.result[1] for job in jobs)
+    assert len(sessions) <= AssetJobRunner.MAX_PREPARE_WORKERS
+    assert len(set(session.thread for session in sessions)) == len(sessions)
+    assert all(session.closed for session in sessions)
+
+
+def test_failed_prepare(dispatcher, unreal_project):
+    executed = []
+
+    def prepare(session):
+        raise Exception('Version deleted')
+
+    job = create_job(
+        'a', execute=lambda prepared: executed.append(True), prepare=prepare
+    )
+    run_jobs(AssetJobRunner([job]), unreal_project)
+    assert job.state == AssetJob.FAILED
+    assert 'Version deleted' in job.message
+    assert executed == []
+
+
+def test_cancel_queued(dispatcher, unreal_project):
+    release = threading.Event()
+
+    def prepare(name, session):
+        if name == 'a':
+            release.wait(5.0)
+        return name
+
+    jobs = [
+        create_job(
+            name, prepare=lambda session, name=name: prepare(name, session)
+        )
+        for name in ('a', 'b', 'c')
+    ]
+    runner = AssetJobRunner(jobs)
+    runner.start()
+    # The first job waits for its prepare part, the others are queued
+    deadline = time.time() + 5.0
+    while jobs[0].state != AssetJob.RUNNING:
+        assert time.time() < deadline
+        time.sleep(0.001)
+    cancelled = runner.cancel(set([jobs[1].id, jobs[2].id]))
+    assert cancelled == jobs[1:]
+    assert not jobs[0].cancel()
+    release.set()
+    run_jobs(runner, unreal_project)
+    assert [job.state for job in jobs] == [
+        AssetJob.DONE,
+        AssetJob.CANCELLED,
+        AssetJob.CANCELLED,
+    ]
+    assert runner.cancel() == []
+    assert runner.progress == 1.0
+
+
+def test_synchronous_without_dispatcher(unreal_project):
+    job = create_job('a', prepare=lambda session: 'prepared')
+    runner = AssetJobRunner([job])
+    runner.start()
+    assert runner.finished
+    assert job.result == {'prepared': 'prepared'}
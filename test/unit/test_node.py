@@ -0,0 +1,74 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline_unreal import utils as unreal_utils
+from ftrack_connect_pipeline_unreal.utils import registry
+
+
+@pytest.fixture()
+def project(unreal_project):
+    '''Return the fake unreal module, with a few assets in the project.'''
+    unreal_project.add_asset('/Game/Meshes/Chair')
+    unreal_project.add_asset('/Game/Meshes/Chair_LOD1')
+    unreal_project.add_asset('/Game/Rigs/Character', 'Skeleton')
+    # Assets added to the fake project are not broadcasted
+    registry.invalidate_project_assets()
+    return unreal_project
+
+
+def test_exact_object_path_and_package_name(project):
+    assert unreal_utils.node_exists('/Game/Meshes/Chair.Chair')
+    assert unreal_utils.node_exists('/Game/Meshes/Chair')
+    assert unreal_utils.node_exists('/Game/Rigs/Character')
+
+
+def test_no_substring_match(project):
+    assert not unreal_utils.node_exists('/Game/Meshes/Cha')
+    assert not unreal_utils.node_exists('Chair')
+    assert not unreal_utils.node_exists('/Game/Meshes')
+    assert not unreal_utils.node_exists('/Game/Meshes/Chair.Chair_LOD1')
+
+
+def test_prefix(project):
+    assert unreal_utils.node_exists('/Game/Meshes/Cha', prefix=True)
+    assert unreal_utils.node_exists('/Game/Rigs/', prefix=True)
+    assert not unreal_utils.node_exists('/Game/Props/', prefix=True)
+
+
+def test_nodes_exist(project):
+    assert unreal_utils.nodes_exist(
+        ['/Game/Meshes/Chair', '/Game/Meshes/Table']
+    ) == {'/Game/Meshes/Chair': True, '/Game/Meshes/Table': False}
+
+
+def test_project_listed_once(project):
+    project.reset_call_counts()
+    for _ in range(10):
+        unreal_utils.node_exists('/Game/Meshes/Chair')
+    assert project.CALL_COUNTS.get('EditorAssetLibrary.list_assets', 0) <= 1
+
+
+def test_follows_registry_events(project):
+    assert unreal_utils.node_exists('/Game/Meshes/Chair')
+    project.reset_call_counts()
+
+    project.EditorAssetLibrary.rename_asset(
+        '/Game/Meshes/Chair', '/Game/Meshes/Stool'
+    )
+    assert not unreal_utils.node_exists('/Game/Meshes/Chair')
+    assert unreal_utils.node_exists('/Game/Meshes/Stool.Stool')
+
+    project.EditorAssetLibrary.delete_asset('/Game/Meshes/Stool')
+    assert not unreal_utils.node_exists('/Game/Meshes/Stool')
+
+    task = project.AssetImportTask()
+    task.destination_path = '/Game/Meshes'
+    task.destination_name = 'Table'
+    project.AssetToolsHelpers.get_asset_tools().import_asset_tasks([task])
+    assert unreal_utils.node_exists('/Game/Meshes/Table')
+
+    # Applied incrementally, the project is not listed again
+    assert 'EditorAssetLibrary.list_assets' not in project.CALL_COUNTS
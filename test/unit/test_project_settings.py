@@ -0,0 +1,119 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import json
+import os
+
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline_unreal.utils.project import ProjectSettingsStore
+
+
+@pytest.fixture()
+def root_path(unreal_project, tmpdir):
+    '''Return a project ftrack folder, not created yet.'''
+    return str(tmpdir.join('ftrack'))
+
+
+def create_store(root_path, monkeypatch, delay=60.0):
+    '''Return a store which does not write updates by itself.'''
+    monkeypatch.setattr(ProjectSettingsStore, 'DEBOUNCE_DELAY', delay)
+    return ProjectSettingsStore(root_path)
+
+
+def read_file(store):
+    with open(store.path, 'r') as f:
+        return json.load(f)
+
+
+def test_no_settings(root_path, monkeypatch):
+    store = create_store(root_path, monkeypatch)
+    assert store.get() == {}
+    store.flush()
+    assert not os.path.exists(store.path)
+
+
+def test_updates_held_until_flush(root_path, monkeypatch):
+    store = create_store(root_path, monkeypatch)
+    store.update({'a': 1})
+    store.update({'b': 2, 'a': 3})
+    assert not os.path.exists(store.path)
+    assert store.get() == {'a': 3, 'b': 2}
+    store.flush()
+    assert read_file(store) == {'a': 3, 'b': 2}
+
+
+def test_updates_written_after_delay(root_path, monkeypatch):
+    store = create_store(root_path, monkeypatch, delay=0.01)
+    store.update({'a': 1})
+    timer = store._timer
+    timer.join(5.0)
+    assert read_file(store) == {'a': 1}
+    assert store._timer is None
+
+
+def test_updates_merged_with_disk(root_path, monkeypatch):
+    store = create_store(root_path, monkeypatch)
+    other_store = create_store(root_path, monkeypatch)
+    store.update({'a': 1})
+    other_store.update({'b': 2})
+    other_store.flush()
+    store.flush()
+    assert read_file(store) == {'a': 1, 'b': 2}
+    assert other_store.get() == {'a': 1, 'b': 2}
+
+
+def test_update_copied(root_path, monkeypatch):
+    store = create_store(root_path, monkeypatch)
+    settings = {'paths': ['a']}
+    store.update(settings)
+    settings['paths'].append('b')
+    store.get()['paths'].append('c')
+    assert store.get() == {'paths': ['a']}
+
+
+def test_save_replaces_settings(root_path, monkeypatch):
+    store = create_store(root_path, monkeypatch)
+    store.update({'a': 1})
+    store.flush()
+    store.update({'b': 2})
+    store.save({'c': 3})
+    assert read_file(store) == {'c': 3}
+    assert store.get() == {'c': 3}
+    assert store._timer is None
+
+
+def test_save_atomic(root_path, monkeypatch):
+    store = create_store(root_path, monkeypatch)
+    store.save({'a': 1})
+
+    def fail(settings, f):
+        f.write('{"a"')
+        raise IOError('Disk full')
+
+    monkeypatch.setattr(json, 'dump', fail)
+    with pytest.raises(IOError):
+        store.save({'a': 2})
+    monkeypatch.undo()
+    assert read_file(store) == {'a': 1}
+
+
+def test_read_again_when_changed(root_path, monkeypatch):
+    store = create_store(root_path, monkeypatch)
+    store.save({'a': 1})
+    assert store.get() == {'a': 1}
+    with open(store.path, 'w') as f:
+        json.dump({'a': 1, 'bb': 2}, f)
+    assert store.get() == {'a': 1, 'bb': 2}
+
+
+def test_invalid_file(root_path, monkeypatch):
+    store = create_store(root_path, monkeypatch)
+    os.makedirs(root_path)
+    with open(store.path, 'w') as f:
+        f.write('{')
+    assert store.get() == {}
+    store.update({'a': 1})
+    store.flush()
+    assert read_file(store) == {'a': 1}
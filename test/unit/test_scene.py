@@ -0,0 +1,135 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+from ftrack_connect_pipeline_unreal.utils import registry
+from ftrack_connect_pipeline_unreal.utils import scene
+from ftrack_connect_pipeline_unreal.utils.node import (
+    get_asset_metadata_index,
+)
+from ftrack_connect_pipeline_unreal.utils.store import FtrackNodeStore
+
+
+def tag(asset_info_id):
+    return {asset_const.NODE_METADATA_TAG: asset_info_id}
+
+
+@pytest.fixture()
+def model(unreal_project, monkeypatch, tmpdir):
+    '''
+    Return a scene model of a project with a chair and a table tracked by
+    ftrack, and an untracked lamp.
+    '''
+    node_store = FtrackNodeStore(str(tmpdir.join('ftrack')))
+    node_store.put('Chair_ftrackdata', {asset_const.ASSET_INFO_ID: 'chair'})
+    node_store.put('Table_ftrackdata', {asset_const.ASSET_INFO_ID: 'table'})
+    monkeypatch.setattr(scene, 'get_ftrack_node_store', lambda: node_store)
+    unreal_project.add_asset('/Game/Props/Chair', metadata=tag('chair'))
+    unreal_project.add_asset('/Game/Props/Chair_Mat', metadata=tag('chair'))
+    unreal_project.add_asset('/Game/Props/Table', metadata=tag('table'))
+    unreal_project.add_asset('/Game/Props/Lamp')
+    # Assets added to the fake project are not broadcasted
+    registry.invalidate_project_assets()
+    get_asset_metadata_index().clear()
+    yield scene.FtrackSceneModel()
+    get_asset_metadata_index().clear()
+
+
+def test_nodes(model):
+    assert model.names() == ['Chair_ftrackdata', 'Table_ftrackdata']
+    assert model.find('table') == 'Table_ftrackdata'
+    assert model.find('lamp') is None
+    assert model.get('Chair_ftrackdata') == {
+        asset_const.ASSET_INFO_ID: 'chair'
+    }
+    assert model.get('Lamp_ftrackdata') is None
+
+
+def test_connected_nodes(model):
+    assert model.get_connected_nodes('Chair_ftrackdata') == [
+        '/Game/Props/Chair.Chair',
+        '/Game/Props/Chair_Mat.Chair_Mat',
+    ]
+    assert model.get_connected_nodes('Table_ftrackdata') == [
+        '/Game/Props/Table.Table'
+    ]
+    assert model.get_connected_nodes('Lamp_ftrackdata') is None
+
+
+def test_follows_registry_events(model, unreal_project):
+    model.get_connected_nodes('Chair_ftrackdata')
+    unreal_project.reset_call_counts()
+    library = unreal_project.EditorAssetLibrary
+
+    # Renamed
+    library.rename_asset('/Game/Props/Chair', '/Game/Props/Stool')
+    assert model.get_connected_nodes('Chair_ftrackdata') == [
+        '/Game/Props/Chair_Mat.Chair_Mat',
+        '/Game/Props/Stool.Stool',
+    ]
+
+    # Removed
+    library.delete_asset('/Game/Props/Chair_Mat')
+    assert model.get_connected_nodes('Chair_ftrackdata') == [
+        '/Game/Props/Stool.Stool'
+    ]
+
+    # Added, then tagged and saved
+    task = unreal_project.AssetImportTask()
+    task.destination_path = '/Game/Props'
+    task.destination_name = 'Table_Mat'
+    unreal_project.AssetToolsHelpers.get_asset_tools().import_asset_tasks(
+        [task]
+    )
+    assert model.get_connected_nodes('Table_ftrackdata') == [
+        '/Game/Props/Table.Table'
+    ]
+    asset = library.load_asset('/Game/Props/Table_Mat')
+    library.set_metadata_tag(asset, asset_const.NODE_METADATA_TAG, 'table')
+    library.save_asset('/Game/Props/Table_Mat')
+    assert model.get_connected_nodes('Table_ftrackdata') == [
+        '/Game/Props/Table.Table',
+        '/Game/Props/Table_Mat.Table_Mat',
+    ]
+
+    # Untagged and saved
+    asset = library.load_asset('/Game/Props/Table')
+    library.remove_metadata_tag(asset, asset_const.NODE_METADATA_TAG)
+    library.save_asset('/Game/Props/Table')
+    assert model.get_connected_nodes('Table_ftrackdata') == [
+        '/Game/Props/Table_Mat.Table_Mat'
+    ]
+
+    # Applied incrementally, the project is not listed again and only the
+    # changed assets are read
+    assert 'EditorAssetLibrary.list_assets' not in unreal_project.CALL_COUNTS
+    assert (
+        unreal_project.CALL_COUNTS['EditorAssetLibrary.get_metadata_tag'] <= 3
+    )
+
+
+def test_refresh(model, unreal_project, monkeypatch):
+    model.get_connected_nodes('Chair_ftrackdata')
+    unreal_project.add_asset('/Game/Props/Chair_LOD1', metadata=tag('chair'))
+    unreal_project.reset_call_counts()
+
+    # Followed through the registry events, nothing to do
+    model.refresh()
+    assert model.get_connected_nodes('Chair_ftrackdata') == [
+        '/Game/Props/Chair.Chair',
+        '/Game/Props/Chair_Mat.Chair_Mat',
+    ]
+    assert 'EditorAssetLibrary.list_assets' not in unreal_project.CALL_COUNTS
+
+    # Not followed, the project is listed again
+    monkeypatch.setattr(scene, 'is_registry_monitored', lambda: False)
+    model.refresh()
+    assert model.get_connected_nodes('Chair_ftrackdata') == [
+        '/Game/Props/Chair.Chair',
+        '/Game/Props/Chair_LOD1.Chair_LOD1',
+        '/Game/Props/Chair_Mat.Chair_Mat',
+    ]
+    assert unreal_project.CALL_COUNTS['EditorAssetLibrary.list_assets'] == 1
@@ -0,0 +1,68 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import hashlib
+import os
+
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline_unreal.utils import staging
+
+DATA = os.urandom(3 * 1024 + 17)
+
+
+@pytest.fixture()
+def source_path(tmpdir, monkeypatch):
+    '''Return the path to a movie, staged in a temporary staging folder.'''
+    monkeypatch.setattr(staging.tempfile, 'tempdir', str(tmpdir))
+    monkeypatch.setattr(staging, 'COPY_CHUNK_SIZE', 1024)
+    path = tmpdir.join('movie.mov')
+    path.write_binary(DATA)
+    yield str(path)
+    staging.cleanup_staged_files()
+
+
+def expected_checksum():
+    return hashlib.new(staging.CHECKSUM_ALGORITHM, DATA).hexdigest()
+
+
+def test_copy_checksum_and_progress(source_path, tmpdir):
+    progress = []
+    checksum = staging.copy_file(
+        source_path,
+        str(tmpdir.join('copy.mov')),
+        progress_callback=lambda copied, total: progress.append(copied),
+    )
+    assert checksum == expected_checksum()
+    assert tmpdir.join('copy.mov').read_binary() == DATA
+    assert progress == [1024, 2048, 3072, len(DATA)]
+
+
+def test_linked_staging_checksum(source_path):
+    staged_path, checksum = staging.stage_file(source_path)
+    assert os.path.dirname(staged_path) == staging.get_staging_folder()
+    assert staged_path.endswith('.mov')
+    assert checksum == expected_checksum()
+    with open(staged_path, 'rb') as f:
+        assert f.read() == DATA
+
+
+def test_copied_staging_checksum(source_path, monkeypatch):
+    # Not on the filesystem of the staging folder
+    monkeypatch.setattr(staging, '_reflink', lambda source, target: False)
+
+    def link(source, target):
+        raise OSError('Invalid cross-device link')
+
+    monkeypatch.setattr(staging.os, 'link', link)
+    staged_path, checksum = staging.stage_file(source_path)
+    assert checksum == expected_checksum()
+    assert not os.path.samefile(staged_path, source_path)
+
+
+def test_cleanup_keeps_source(source_path):
+    staged_path, unused_checksum = staging.stage_file(source_path)
+    staging.cleanup_staged_files()
+    assert not os.path.exists(staged_path)
+    assert os.path.exists(source_path)
@@ -0,0 +1,97 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2014-2023 ftrack
+import json
+import os
+import threading
+
+import pytest
+
+pytest.importorskip('ftrack_connect_pipeline')
+
+from ftrack_connect_pipeline_unreal.constants import asset as asset_const
+from ftrack_connect_pipeline_unreal.utils.store import FtrackNodeStore
+
+
+@pytest.fixture()
+def store_path(tmpdir):
+    return str(tmpdir.join('ftrack'))
+
+
+def test_put_get_find(store_path):
+    store = FtrackNodeStore(store_path)
+    assert store.put('node_a', {asset_const.ASSET_INFO_ID: 'id_a'})
+    assert not store.put('node_a', {asset_const.ASSET_INFO_ID: 'id_a'})
+    assert store.get('node_a') == {asset_const.ASSET_INFO_ID: 'id_a'}
+    assert store.find('id_a') == 'node_a'
+    assert store.exists('node_a')
+    assert store.delete('node_a')
+    assert not store.exists('node_a')
+    assert store.find('id_a') is None
+
+
+def test_changes_seen_by_other_instance(store_path):
+    first = FtrackNodeStore(store_path)
+    second = FtrackNodeStore(store_path)
+    first.put('node_a', {asset_const.ASSET_INFO_ID: 'id_a'})
+    assert second.find('id_a') == 'node_a'
+    second.put('node_a', {asset_const.ASSET_INFO_ID: 'id_b'})
+    assert first.find('id_a') is None
+    assert first.find('id_b') == 'node_a'
+    second.delete_many(['node_a'])
+    assert first.names() == []
+
+
+def test_torn_last_line_is_skipped(store_path):
+    store = FtrackNodeStore(store_path)
+    store.put('node_a', {'value': 1})
+    with open(store.path, 'ab') as f:
+        f.write(b'{"name": "node_b", "da')
+    assert FtrackNodeStore(store_path).names() == ['node_a']
+    store.put('node_c', {'value': 3})
+    assert sorted(FtrackNodeStore(store_path).names()) == [
+        'node_a',
+        'node_c',
+    ]
+
+
+def test_compact_keeps_latest_data(store_path):
+    store = FtrackNodeStore(store_path)
+    for value in range(10):
+        store.put('node_a', {'value': value})
+    store.put('node_b', {'value': 0})
+    store.delete('node_b')
+    store.compact()
+    with open(store.path) as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [{'name': 'node_a', 'data': {'value': 9}}]
+    assert FtrackNodeStore(store_path).get('node_a') == {'value': 9}
+
+
+def test_compact_keeps_concurrent_appends(store_path):
+    compacting = FtrackNodeStore(store_path)
+    compacting.put('node', {'value': 0})
+    names = ['other_{}'.format(index) for index in range(200)]
+
+    def append():
+        appending = FtrackNodeStore(store_path)
+        for name in names:
+            appending.put(name, {'value': name})
+
+    thread = threading.Thread(target=append)
+    thread.start()
+    while thread.is_alive():
+        compacting.put('node', {'value': os.urandom(4).hex()})
+        compacting.compact()
+    thread.join()
+    assert set(names) <= set(FtrackNodeStore(store_path).names())
+
+
+def test_migrates_legacy_files(store_path):
+    os.makedirs(store_path)
+    with open(os.path.join(store_path, 'Asset_ftrackdata_1.json'), 'w') as f:
+        json.dump({asset_const.ASSET_INFO_ID: 'id_1'}, f)
+    store = FtrackNodeStore(store_path)
+    assert store.find('id_1') == 'Asset_ftrackdata_1'
+    assert not os.path.exists(
+        os.path.join(store_path, 'Asset_ftrackdata_1.json')
+    )